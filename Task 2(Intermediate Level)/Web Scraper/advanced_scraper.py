@@ -16,20 +16,43 @@ Advanced Web Scraping Tool with Multi-Threading and Deep Crawling
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import json
 import csv
 import time
 import logging
 from datetime import datetime
-from urllib.parse import urljoin, urlparse, urlunparse
-from typing import Dict, List, Optional, Set, Any
+from urllib.parse import urlparse
+from typing import Dict, Iterable, List, Optional, Any
 from pathlib import Path
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import deque
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
 import re
 
+from canonical import DEFAULT_SKIP_EXTENSIONS, DEFAULT_STRIP_PARAMS, URLCanonicalizer
+from change_tracker import ChangeTracker
+from charset import CharsetResolver
+from crawl_state import CrawlStats, ResultSink, VisitedSet
+from frontier import create_frontier
+from near_duplicates import NearDuplicateIndex
+from metrics import CrawlMetrics, MetricsServer, instrument_session
+from checkpoint import CrawlCheckpoint, checkpoint_path
+from columnar_writer import ColumnarWriter, columnar_path, page_record_schema
+from extraction import LinksField, PageExtractor, page_data_fields
+from extraction_schema import LINKS_FIELD, load_schema
+from priority import FRONTIER_ORDERS, PatternScore, create_priority_frontier, default_scorer
+from rate_limiter import HostRateLimiter, PoliteFrontier, parse_retry_after
+from retry_policy import CircuitBreaker, RetryLater, RetryPolicy
+from http_cache import CachingHTTPAdapter, HTTPCache
+from fetch_limits import FetchLimits, ResponseRejected
+from parse_stage import ParseStage
+from robots import RobotsCache
+from sitemap import SitemapState, iter_sitemaps
+from parsers import parse_html, resolve_backend, soup_backend
+from result_writer import NDJSONWriter, StreamingResultSink, ndjson_path, write_json_envelope
+
 
 class Colors:
     """ANSI color codes for terminal output."""
@@ -58,9 +81,74 @@ class AdvancedScraperConfig:
     
     DEFAULT_TIMEOUT = 15
     DEFAULT_DELAY = 1
-    MAX_RETRIES = 3
+    MAX_RETRIES = 3  # attempts per URL; failed fetches are re-queued with backoff in between
+    RETRY_BASE_DELAY = 1.0  # backoff ceiling of the first retry, doubled per attempt (full jitter)
+    RETRY_MAX_DELAY = 60
+    CIRCUIT_BREAKER = True  # hold a host's URLs after consecutive failures instead of retrying into it
+    BREAKER_FAILURE_THRESHOLD = 5  # consecutive server errors/timeouts that open a host
+    BREAKER_COOLDOWN = 30  # seconds an open host gets no requests (doubled while its probes fail)
+    BREAKER_MAX_COOLDOWN = 600
     MAX_DEPTH = 3
     MAX_THREADS = 4
+    BURST_SIZE = 1
+    ADAPTIVE_DELAY = True
+    MAX_DELAY = 60
+    MAX_PARKED_PER_HOST = 1000  # URLs of a throttled host held in memory; the rest stay in the frontier
+    ASYNC_CONCURRENCY = 200
+    ASYNC_MAX_CONNECTIONS = 100
+    PROGRESS_INTERVAL = 10
+    METRICS = True  # per-stage latency histograms (DNS, connect, TTFB, download, parse, extract)
+    METRICS_PORT = 0  # serve Prometheus metrics at http://127.0.0.1:PORT/metrics (0 disables)
+    FRONTIER_BACKEND = 'memory'
+    BLOOM_CAPACITY = 1_000_000
+    BLOOM_ERROR_RATE = 0.001
+    FRONTIER_MEMORY_LIMIT = 100_000
+    FRONTIER_ORDER = 'priority'  # 'priority' (best-first by URL score) or 'fifo' (breadth-first)
+    MAX_PAGES = 0  # page budget: stop after this many fetches (0 for no limit)
+    PRIORITY_PATTERNS = {'contact': 3.0, 'about': 3.0, 'service': 2.0, 'product': 2.0, 'blog': 1.0}
+    PRIORITY_WEIGHTS = {'pattern': 1.0, 'depth': 1.0, 'inlinks': 1.0, 'freshness': 2.0}
+    INLINK_SKETCH_WIDTH = 1 << 20  # counters per row of the in-link sketch (4 rows x 2 bytes)
+    URL_KEEP_PARAMS = None  # glob patterns of query parameters kept (None keeps all that are not stripped)
+    URL_STRIP_PARAMS = DEFAULT_STRIP_PARAMS  # tracking and session parameters removed from every URL
+    URL_ALLOW_PATTERNS = ()  # regexes; when set, only matching URLs are crawled
+    URL_DENY_PATTERNS = ()  # regexes of URLs that are never crawled
+    URL_SKIP_EXTENSIONS = DEFAULT_SKIP_EXTENSIONS
+    URL_LOWERCASE_PATH = False  # treat paths as case-insensitive
+    CHECKPOINT_INTERVAL = 60
+    STREAM_RESULTS = True
+    RESULT_COMPRESSION = None  # None, 'gzip' or 'zstd'
+    RESULT_BUFFER_SIZE = 1000
+    RESULT_FSYNC = 'interval'  # 'never', 'interval' or 'always'
+    RESULT_FSYNC_INTERVAL = 5
+    WRITE_JSON_ENVELOPE = True
+    COLUMNAR_FORMAT = None  # 'parquet' or 'arrow': also write the results as a columnar file (needs pyarrow)
+    COLUMNAR_COMPRESSION = 'zstd'  # parquet: 'zstd', 'snappy', 'gzip', 'lz4', 'brotli' or None; arrow: 'zstd', 'lz4' or None
+    COLUMNAR_ROW_GROUP_SIZE = 1000  # page records per row group
+    HTTP_CACHE = True
+    HTTP_CACHE_TTL = 0  # seconds served without revalidation (0 always revalidates)
+    HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    PARSER_BACKEND = 'auto'  # 'auto', 'selectolax', 'lxml' or 'html.parser'
+    EXTRACTION_SCHEMA = None  # JSON/YAML schema of the fields to extract (None extracts the built-in page fields)
+    PARSE_PROCESSES = 0  # worker processes for parsing (0 parses on the fetching thread)
+    PARSE_BACKLOG = 64  # fetched pages waiting for a parse process before fetchers block
+    MAX_BODY_BYTES = 10 * 1024 * 1024  # larger pages are abandoned mid-download (0 disables)
+    ALLOWED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+    HEAD_BEFORE_GET = False  # check type and size with a HEAD request before each GET
+    ROBOTS_TXT = True  # obey robots.txt rules and Crawl-delay
+    ROBOTS_USER_AGENT = 'ShadowFoxBot'  # token matched against robots.txt User-agent lines
+    ROBOTS_CACHE_TTL = 24 * 60 * 60
+    SITEMAP_SEED = True  # queue the target's sitemap URLs before crawling
+    SITEMAP_MAX_URLS = 1_000_000
+    SITEMAP_SKIP_UNCHANGED = True  # skip pages whose sitemap lastmod is unchanged since they were crawled
+    INCREMENTAL = False  # only extract and export pages that changed since the last run, and write a delta file
+    INCREMENTAL_SIMHASH = True  # pages within SIMHASH_MAX_DISTANCE bits of the last version count as unchanged
+    SIMHASH_MAX_DISTANCE = 3
+    NEAR_DUPLICATES = True  # do not expand the links of pages whose text duplicates an earlier page
+    NEAR_DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard similarity of paragraph shingles
+    NEAR_DUPLICATE_MIN_SHINGLES = 30  # pages with less text are never treated as duplicates
+    DISTRIBUTED_WORKERS = 0  # worker processes of a DistributedCrawler (0 for one per core)
+    DISTRIBUTED_HOSTS_PER_WORKER = 4  # hosts each worker crawls at the same time
+    DISTRIBUTED_BATCH_SIZE = 100  # page records per message from a worker to the coordinator
     OUTPUT_DIR = Path('scraped_data')
     
     SHADOWFOX_URL = "https://www.shadowfox.org.in/"
@@ -85,6 +173,199 @@ def print_banner():
     print(banner)
 
 
+def create_columnar_writer(base: Path) -> Optional[ColumnarWriter]:
+    """Columnar writer for crawl records at base.parquet/.arrow, or None if COLUMNAR_FORMAT is off."""
+    if not AdvancedScraperConfig.COLUMNAR_FORMAT:
+        return None
+    # Extraction schema records have no fixed shape; their columns come from the first row group
+    schema = None if AdvancedScraperConfig.EXTRACTION_SCHEMA else page_record_schema()
+    return ColumnarWriter(
+        columnar_path(base, AdvancedScraperConfig.COLUMNAR_FORMAT),
+        format=AdvancedScraperConfig.COLUMNAR_FORMAT,
+        schema=schema,
+        compression=AdvancedScraperConfig.COLUMNAR_COMPRESSION,
+        row_group_size=AdvancedScraperConfig.COLUMNAR_ROW_GROUP_SIZE,
+        max_pending=AdvancedScraperConfig.RESULT_BUFFER_SIZE
+    )
+
+
+class CrawlScheduler:
+    """
+    Long-lived crawl scheduler with a persistent worker pool.
+    
+    Every worker pulls the next URL from the scraper's shared frontier as
+    soon as it finishes its current page, so a single slow page never holds
+    up the rest of the pool and no executor is rebuilt between pages.
+    URLs whose host is rate limited (or whose circuit breaker is open) are
+    parked rather than slept on, and failed fetches go back to the frontier
+    until their retry backoff has passed. The crawl ends once the frontier is empty and no page is in flight.
+    """
+    
+    def __init__(self, scraper: 'AdvancedWebScraper', num_workers: int,
+                 progress_interval: Optional[float] = None, parse_stage: Optional[ParseStage] = None):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            scraper: Scraper whose frontier, visited set and crawl_url are used
+            num_workers: Number of persistent worker threads
+            progress_interval: Seconds between progress lines (0 disables them)
+            parse_stage: Process pool for parsing; workers then only fetch
+        """
+        self.scraper = scraper
+        self.num_workers = max(1, num_workers)
+        self.parse_stage = parse_stage
+        self.progress_interval = (AdvancedScraperConfig.PROGRESS_INTERVAL
+                                  if progress_interval is None else progress_interval)
+        
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._stopped = False
+        self._polite = PoliteFrontier(scraper.to_visit, scraper.rate_limiter,
+                                      max_parked_per_host=AdvancedScraperConfig.MAX_PARKED_PER_HOST)
+        scraper.watch_scheduler(self, parse_stage)
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of pages currently being fetched or parsed."""
+        return self._in_flight
+    
+    @property
+    def queued(self) -> int:
+        """Number of URLs waiting in the frontier (including rate-limited ones)."""
+        return len(self._polite)
+    
+    def stop(self):
+        """Ask all workers to exit after finishing their current page."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+    
+    def _next_url(self):
+        """Block until a URL is available; return None when the crawl is over."""
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None
+                
+                # Without budget only retries go out: their pages are already counted.
+                # Pages in flight may still be skipped (robots.txt, depth) and free budget.
+                item, wait = self._polite.pop_ready(fresh=self.scraper.budget_left(self._in_flight))
+                if item is not None:
+                    self._in_flight += 1
+                    return item
+                
+                if wait is None and self._in_flight == 0:
+                    # Nothing queued and nothing running: wake the others so they exit too
+                    self._condition.notify_all()
+                    return None
+                
+                # Sleep until new links arrive or the earliest throttled host frees up
+                self._condition.wait(timeout=wait)
+    
+    def _finish_url(self, url: str, depth: int, new_links: List[str], retry_delay: Optional[float] = None):
+        """
+        Queue links discovered at the given depth and release the in-flight slot.
+        With a retry_delay the fetch failed: the URL is queued again instead.
+        """
+        with self._condition:
+            if retry_delay is not None:
+                self._polite.defer((url, depth), retry_delay)
+            else:
+                if depth < self.scraper.max_depth:
+                    for link in new_links:
+                        # The frontier drops links it has already seen
+                        self.scraper.enqueue(link, depth + 1)
+                self.scraper.finish_url(url)
+            
+            self._in_flight -= 1
+            self._condition.notify_all()
+    
+    def _worker(self):
+        """Worker loop: crawl URLs until the frontier is drained or stop() is called."""
+        while True:
+            item = self._next_url()
+            if item is None:
+                return
+            
+            url, depth = item
+            if self.parse_stage:
+                self._fetch_for_parse_stage(url, depth)
+                continue
+            
+            new_links = []
+            retry_delay = None
+            try:
+                new_links = self.scraper.crawl_url(url, depth)
+            except RetryLater as e:
+                retry_delay = e.delay
+            except Exception as e:
+                self.scraper.logger.error(f"Error processing {url}: {e}")
+            finally:
+                self._finish_url(url, depth, new_links, retry_delay)
+            
+            self.scraper.maybe_checkpoint()
+    
+    def _fetch_for_parse_stage(self, url: str, depth: int):
+        """Fetch a page and hand it to the parse processes; the page stays in flight until parsed."""
+        html = None
+        try:
+            html = self.scraper.fetch_url(url, depth)
+            links = None if html is None else self.scraper.unchanged_links(url, html)
+            if links is not None:
+                self._finish_url(url, depth, links)
+                self.scraper.maybe_checkpoint()
+                return
+            if html is not None:
+                self.parse_stage.submit(html, lambda fields, error: self._parsed(url, depth, fields, error), url)
+                return
+        except RetryLater as e:
+            self._finish_url(url, depth, [], e.delay)
+            return
+        except Exception as e:
+            self.scraper.logger.error(f"Error processing {url}: {e}")
+        
+        # Nothing (more) to parse: release the page right away
+        self._finish_url(url, depth, [])
+        self.scraper.maybe_checkpoint()
+    
+    def _parsed(self, url: str, depth: int, fields: Optional[Dict[str, Any]], error: Optional[BaseException]):
+        """Parse-stage callback: store the record, queue its links and release the page."""
+        new_links = []
+        try:
+            if error is not None:
+                self.scraper.stats.increment('errors')
+                self.scraper.logger.error(f"Error parsing {url}: {error}")
+            else:
+                new_links = self.scraper.store_page(self.scraper.page_record(url, fields))
+        except Exception as e:
+            self.scraper.logger.error(f"Error processing {url}: {e}")
+        finally:
+            self._finish_url(url, depth, new_links)
+        
+        self.scraper.maybe_checkpoint()
+    
+    def run(self):
+        """Run the crawl to completion, printing periodic progress lines."""
+        timeout = self.progress_interval if self.progress_interval > 0 else None
+        
+        with ThreadPoolExecutor(max_workers=self.num_workers,
+                                thread_name_prefix='crawler') as executor:
+            futures = [executor.submit(self._worker) for _ in range(self.num_workers)]
+            
+            try:
+                pending = futures
+                while pending:
+                    done, pending = wait(pending, timeout=timeout, return_when=FIRST_EXCEPTION)
+                    for future in done:
+                        future.result()
+                    if pending:
+                        self.scraper.print_progress(self)
+            except BaseException:
+                self.stop()
+                raise
+
+
 class AdvancedWebScraper:
     """
     Advanced web scraper with deep crawling and multi-threading capabilities.
@@ -97,7 +378,11 @@ class AdvancedWebScraper:
     - Progress tracking
     """
     
-    def __init__(self, target_url: str, max_depth: int = 2, max_threads: int = 4):
+    def __init__(self, target_url: str, max_depth: int = 2, max_threads: int = 4,
+                 frontier_backend: Optional[str] = None, resume: bool = False,
+                 parse_processes: Optional[int] = None, max_pages: Optional[int] = None,
+                 frontier_order: Optional[str] = None, incremental: Optional[bool] = None,
+                 result_sink=None):
         """
         Initialize the advanced scraper.
         
@@ -105,33 +390,248 @@ class AdvancedWebScraper:
             target_url: Target website URL
             max_depth: Maximum crawling depth
             max_threads: Number of concurrent threads
+            frontier_backend: Seen-set/queue backend ('memory', 'bloom' or 'sqlite')
+            resume: Continue from the last checkpoint of this target, if any
+            parse_processes: Worker processes for parsing (0 parses on the fetching threads)
+            max_pages: Page budget; the crawl stops after this many fetches (0 for no limit)
+            frontier_order: 'priority' (best-first) or 'fifo' (breadth-first)
+            incremental: Skip extraction and export of pages unchanged since the last run
+            result_sink: Receives the page records instead of the default NDJSON stream
         """
         self.target_url = target_url
         self.base_domain = urlparse(target_url).netloc
+        self.canonicalizer = URLCanonicalizer(
+            target_url,
+            allow=AdvancedScraperConfig.URL_ALLOW_PATTERNS,
+            deny=AdvancedScraperConfig.URL_DENY_PATTERNS,
+            keep_params=AdvancedScraperConfig.URL_KEEP_PARAMS,
+            strip_params=AdvancedScraperConfig.URL_STRIP_PARAMS,
+            skip_extensions=AdvancedScraperConfig.URL_SKIP_EXTENSIONS,
+            lowercase_path=AdvancedScraperConfig.URL_LOWERCASE_PATH
+        )
         self.max_depth = max_depth
         self.max_threads = max_threads
+        self.parse_processes = (AdvancedScraperConfig.PARSE_PROCESSES
+                                if parse_processes is None else parse_processes)
+        self.max_pages = AdvancedScraperConfig.MAX_PAGES if max_pages is None else max_pages
+        
+        # Walks each page once; register extra fields with page_extractor.register() (not with a schema)
+        self.parser_backend = resolve_backend(AdvancedScraperConfig.PARSER_BACKEND)
+        self.schema = None
+        if AdvancedScraperConfig.EXTRACTION_SCHEMA:
+            # Only the schema's fields are computed, plus the anchors the crawl follows
+            self.schema = load_schema(AdvancedScraperConfig.EXTRACTION_SCHEMA).with_field('links', LINKS_FIELD)
+            self.page_extractor = self.schema
+        else:
+            self.page_extractor = PageExtractor(page_data_fields())
+        self.link_extractor = PageExtractor({'links': LinksField()})
+        self.charset_resolver = CharsetResolver()
         
         self.session = requests.Session()
         self.session.headers.update(AdvancedScraperConfig.DEFAULT_HEADERS)
         
-        self.visited_urls: Set[str] = set()
-        self.to_visit: deque = deque([(target_url, 0)])
-        self.found_data: List[Dict] = []
-        
-        self.stats = {
-            'urls_crawled': 0,
-            'urls_found': 0,
-            'data_extracted': 0,
-            'errors': 0,
-            'start_time': None,
-            'end_time': None
-        }
-        
         # Create output directory
         AdvancedScraperConfig.OUTPUT_DIR.mkdir(exist_ok=True)
         
+        # Conditional-request cache shared across runs
+        self.http_cache = None
+        if AdvancedScraperConfig.HTTP_CACHE:
+            self.http_cache = HTTPCache(
+                AdvancedScraperConfig.OUTPUT_DIR / 'http_cache',
+                ttl=AdvancedScraperConfig.HTTP_CACHE_TTL,
+                max_bytes=AdvancedScraperConfig.HTTP_CACHE_MAX_BYTES
+            )
+        
+        # One pooled connection per worker so concurrent fetches don't discard sockets
+        pool_size = max(max_threads, 10)
+        if self.http_cache:
+            adapter = CachingHTTPAdapter(self.http_cache, pool_maxsize=pool_size)
+        else:
+            adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Per-stage latency histograms; new connections of the session are timed as 'connect'
+        self.metrics = None
+        if AdvancedScraperConfig.METRICS:
+            self.metrics = CrawlMetrics()
+            instrument_session(self.session, self.metrics)
+        
+        # Bodies are streamed so non-HTML and oversized responses are dropped before download
+        self.fetch_limits = FetchLimits(
+            max_bytes=AdvancedScraperConfig.MAX_BODY_BYTES,
+            allowed_types=AdvancedScraperConfig.ALLOWED_CONTENT_TYPES,
+            head_first=AdvancedScraperConfig.HEAD_BEFORE_GET
+        )
+        
+        # Failed fetches are retried later; a host that keeps failing is held for a cooldown
+        self.retry_policy = RetryPolicy(
+            max_attempts=AdvancedScraperConfig.MAX_RETRIES,
+            base_delay=AdvancedScraperConfig.RETRY_BASE_DELAY,
+            max_delay=AdvancedScraperConfig.RETRY_MAX_DELAY
+        )
+        self.retry_attempts: Dict[str, int] = {}
+        self.circuit_breaker = None
+        if AdvancedScraperConfig.CIRCUIT_BREAKER:
+            self.circuit_breaker = CircuitBreaker(
+                failure_threshold=AdvancedScraperConfig.BREAKER_FAILURE_THRESHOLD,
+                cooldown=AdvancedScraperConfig.BREAKER_COOLDOWN,
+                max_cooldown=AdvancedScraperConfig.BREAKER_MAX_COOLDOWN
+            )
+        
+        self.rate_limiter = HostRateLimiter(
+            delay=AdvancedScraperConfig.DEFAULT_DELAY,
+            burst=AdvancedScraperConfig.BURST_SIZE,
+            adaptive=AdvancedScraperConfig.ADAPTIVE_DELAY,
+            max_delay=AdvancedScraperConfig.MAX_DELAY,
+            breaker=self.circuit_breaker
+        )
+        
+        # Parsed once per host; Crawl-delay raises that host's minimum delay
+        self.robots = None
+        if AdvancedScraperConfig.ROBOTS_TXT:
+            self.robots = RobotsCache(
+                self.session,
+                AdvancedScraperConfig.ROBOTS_USER_AGENT,
+                ttl=AdvancedScraperConfig.ROBOTS_CACHE_TTL,
+                timeout=AdvancedScraperConfig.DEFAULT_TIMEOUT,
+                rate_limiter=self.rate_limiter
+            )
+        
+        # Shared between worker threads: atomic claims, striped counters, append-only results.
+        # URLs are claimed in the seen-set when queued, so visited_urls covers the whole frontier.
+        self.frontier_backend = frontier_backend or AdvancedScraperConfig.FRONTIER_BACKEND
+        self.frontier_order = frontier_order or AdvancedScraperConfig.FRONTIER_ORDER
+        self.url_patterns = PatternScore(AdvancedScraperConfig.PRIORITY_PATTERNS)
+        if self.frontier_order == 'priority':
+            # Best-first: register extra components with to_visit.scorer.register()
+            self.to_visit = create_priority_frontier(
+                self.frontier_backend,
+                scorer=default_scorer(AdvancedScraperConfig.PRIORITY_PATTERNS,
+                                      AdvancedScraperConfig.PRIORITY_WEIGHTS),
+                bloom_capacity=AdvancedScraperConfig.BLOOM_CAPACITY,
+                bloom_error_rate=AdvancedScraperConfig.BLOOM_ERROR_RATE,
+                memory_limit=AdvancedScraperConfig.FRONTIER_MEMORY_LIMIT,
+                sketch_width=AdvancedScraperConfig.INLINK_SKETCH_WIDTH
+            )
+        elif self.frontier_order == 'fifo':
+            self.to_visit = create_frontier(
+                self.frontier_backend,
+                bloom_capacity=AdvancedScraperConfig.BLOOM_CAPACITY,
+                bloom_error_rate=AdvancedScraperConfig.BLOOM_ERROR_RATE,
+                memory_limit=AdvancedScraperConfig.FRONTIER_MEMORY_LIMIT
+            )
+        else:
+            raise ValueError(f"Unknown frontier order '{self.frontier_order}', expected one of {FRONTIER_ORDERS}")
+        self.visited_urls = self.to_visit.seen
+        
+        self.stats = CrawlStats(
+            ['urls_crawled', 'urls_found', 'data_extracted', 'errors', 'urls_rejected', 'bytes_downloaded', 'retries'],
+            {'start_time': None, 'end_time': None}
+        )
+        self.prior_duration = 0.0
+        
         # Setup logging
         self._setup_logging()
+        
+        # Checkpoint journal (a fresh one unless resuming)
+        self.checkpoint = None
+        if AdvancedScraperConfig.CHECKPOINT_INTERVAL > 0 or resume:
+            self.checkpoint = CrawlCheckpoint(
+                checkpoint_path(AdvancedScraperConfig.OUTPUT_DIR / 'checkpoints', target_url),
+                interval=AdvancedScraperConfig.CHECKPOINT_INTERVAL,
+                fresh=not resume
+            )
+        
+        # Page records are streamed to disk as they are produced (or kept in memory)
+        self.run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.found_data = result_sink if result_sink is not None else self._create_result_sink()
+        
+        # Sitemap lastmod values of crawled pages, for skipping unchanged pages next time
+        self.sitemap_state = None
+        if AdvancedScraperConfig.SITEMAP_SEED:
+            self.sitemap_state = SitemapState(
+                checkpoint_path(AdvancedScraperConfig.OUTPUT_DIR / 'sitemaps', target_url)
+            )
+        self.sitemap_stats = {'seeded': 0, 'unchanged': 0}
+        
+        self.resumed = resume and self.checkpoint.exists
+        
+        # Pages of this crawl whose text was seen under another URL; kept in memory only
+        self.near_duplicates = None
+        if AdvancedScraperConfig.NEAR_DUPLICATES:
+            self.near_duplicates = NearDuplicateIndex(
+                threshold=AdvancedScraperConfig.NEAR_DUPLICATE_THRESHOLD,
+                min_shingles=AdvancedScraperConfig.NEAR_DUPLICATE_MIN_SHINGLES
+            )
+        
+        # Page fingerprints of earlier runs; a resumed crawl continues the same run
+        self.incremental = AdvancedScraperConfig.INCREMENTAL if incremental is None else incremental
+        self.change_tracker = None
+        if self.incremental:
+            self.change_tracker = ChangeTracker(
+                checkpoint_path(AdvancedScraperConfig.OUTPUT_DIR / 'fingerprints', target_url),
+                use_simhash=AdvancedScraperConfig.INCREMENTAL_SIMHASH,
+                max_distance=AdvancedScraperConfig.SIMHASH_MAX_DISTANCE,
+                resume=self.resumed
+            )
+        
+        self.metrics_server = None
+        if self.metrics:
+            self.register_metrics()
+            if AdvancedScraperConfig.METRICS_PORT:
+                self.metrics_server = MetricsServer(self.metrics, AdvancedScraperConfig.METRICS_PORT).start()
+        
+        if self.resumed:
+            self.restore_checkpoint()
+        else:
+            self.enqueue(self.canonicalizer.normalize(target_url), 0)
+    
+    def register_metrics(self):
+        """Expose the crawl counters and queue depths through self.metrics."""
+        counters = {
+            'pages_crawled': ('urls_crawled', 'Pages fetched'),
+            'pages_extracted': ('data_extracted', 'Pages whose fields were extracted'),
+            'urls_discovered': ('urls_found', 'New links queued'),
+            'errors': ('errors', 'Fetch and parse errors'),
+            'urls_rejected': ('urls_rejected', 'Responses rejected for their type or size'),
+            'bytes_downloaded': ('bytes_downloaded', 'Response body bytes downloaded')
+        }
+        for name, (key, help_text) in counters.items():
+            self.metrics.counter(name, help_text, lambda key=key: self.stats[key])
+        self.metrics.gauge('frontier_queued', 'URLs waiting in the frontier', lambda: len(self.to_visit))
+        self.metrics.gauge('pages_per_second', 'Average crawl throughput', self.pages_per_second)
+        if isinstance(self.found_data, StreamingResultSink):
+            self.metrics.gauge('result_queue', 'Page records waiting for the NDJSON writer',
+                               lambda: self.found_data.writer.pending)
+    
+    def watch_scheduler(self, scheduler, parse_stage: Optional[ParseStage] = None):
+        """Report a running scheduler's queue depths through self.metrics."""
+        if not self.metrics:
+            return
+        self.metrics.gauge('frontier_queued', 'URLs waiting in the frontier, rate-limited ones included',
+                           lambda: scheduler.queued)
+        self.metrics.gauge('in_flight', 'Pages being fetched or parsed', lambda: scheduler.in_flight)
+        if parse_stage:
+            self.metrics.gauge('parse_backlog', 'Pages queued for or in a parse process',
+                               lambda: parse_stage.pending)
+    
+    def _create_result_sink(self):
+        """Return the NDJSON streaming sink, or an in-memory ResultSink if streaming is off."""
+        if not AdvancedScraperConfig.STREAM_RESULTS:
+            return ResultSink()
+        
+        writer = NDJSONWriter(
+            ndjson_path(AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{self.run_timestamp}',
+                        AdvancedScraperConfig.RESULT_COMPRESSION),
+            compression=AdvancedScraperConfig.RESULT_COMPRESSION,
+            max_pending=AdvancedScraperConfig.RESULT_BUFFER_SIZE,
+            fsync=AdvancedScraperConfig.RESULT_FSYNC,
+            fsync_interval=AdvancedScraperConfig.RESULT_FSYNC_INTERVAL
+        )
+        columnar = create_columnar_writer(AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{self.run_timestamp}')
+        # Records are held back only until the checkpoint journal has stored them
+        return StreamingResultSink(writer, retain=self.checkpoint is not None, columnar=columnar)
     
     def _setup_logging(self):
         """Setup logging configuration."""
@@ -161,163 +661,385 @@ class AdvancedWebScraper:
             print(f"{Colors.BLUE}[!]{Colors.RESET} {message}")
     
     def normalize_url(self, url: str) -> str:
-        """Normalize URL by removing fragments and query parameters."""
-        parsed = urlparse(url)
-        return urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
+        """Canonical form of a URL (see canonical.py): no fragment, tracking parameters or default port."""
+        return self.canonicalizer.normalize(url)
     
     def is_valid_url(self, url: str) -> bool:
-        """Check if URL is valid and belongs to target domain."""
-        try:
-            parsed = urlparse(url)
-            return (
-                parsed.scheme in ['http', 'https'] and
-                parsed.netloc == self.base_domain and
-                not any(ext in parsed.path.lower() for ext in ['.pdf', '.jpg', '.png', '.gif', '.zip', '.exe'])
-            )
-        except:
-            return False
+        """Check if URL is on the target host and allowed by the URL rules."""
+        return self.canonicalizer.canonicalize(url) is not None
     
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch and parse a webpage."""
+        """Fetch a webpage and parse it into a BeautifulSoup tree (lxml or html.parser)."""
+        html = self.fetch_html(url)
+        if html is None:
+            return None
+        return self.parse_page(html, url, soup_backend(self.parser_backend))
+    
+    def parse_page(self, html: str, url: str, backend: Optional[str] = None):
+        """
+        Parse fetched HTML with backend (PARSER_BACKEND if omitted). With
+        selectolax the tree is a SelectolaxDocument, for the extraction path only.
+        """
+        try:
+            started = time.perf_counter()
+            tree = parse_html(html, backend or self.parser_backend)
+            if self.metrics:
+                self.metrics.observe('parse', time.perf_counter() - started)
+            return tree
+        except Exception as e:
+            self.stats.increment('errors')
+            self.logger.error(f"Error parsing {url}: {e}")
+            return None
+    
+    def fetch_html(self, url: str) -> Optional[str]:
+        """
+        Download a webpage and return its decoded HTML (None if it failed or was rejected).
+        Raises RetryLater when the failure is worth another attempt.
+        """
+        metrics = self.metrics
+        if metrics:
+            metrics.take_connect()
         try:
-            response = self.session.get(
+            with self.fetch_limits.get(
+                self.session,
                 url,
                 timeout=AdvancedScraperConfig.DEFAULT_TIMEOUT,
                 allow_redirects=True
-            )
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
+            ) as response:
+                fetched = getattr(response, 'cache_status', None) != 'hit'
+                if fetched:
+                    # Fresh cache hits never reached the host
+                    self.rate_limiter.record_response(
+                        url,
+                        response.status_code,
+                        response.elapsed.total_seconds(),
+                        response.headers.get('Retry-After')
+                    )
+                    if metrics:
+                        # elapsed runs until the headers arrived, including any new connection
+                        metrics.observe('ttfb', max(0.0, response.elapsed.total_seconds() - metrics.take_connect()))
+                response.raise_for_status()
+                started = time.perf_counter()
+                body = self.fetch_limits.read_body(response)
+                if metrics and fetched:
+                    metrics.observe('download', time.perf_counter() - started)
+            self.stats.increment('bytes_downloaded', len(body))
+            self.host_answered(url)
             
-            return BeautifulSoup(response.text, 'html.parser')
+            # Declared charsets first; the detector only runs on undeclared, non-UTF-8 pages
+            return self.charset_resolver.decode(body, response.headers.get('Content-Type'))
             
+        except ResponseRejected as e:
+            self.host_answered(url)
+            self.stats.increment('urls_rejected')
+            self.logger.info(f"Skipped {url}: {e.detail}")
+            return None
+        except requests.exceptions.HTTPError as e:
+            self.fetch_failed(url, e, e.response.status_code, e.response.headers.get('Retry-After'))
+            return None
         except requests.exceptions.RequestException as e:
-            self.stats['errors'] += 1
-            self.logger.error(f"Error fetching {url}: {e}")
+            self.fetch_failed(url, e)
             return None
         except Exception as e:
-            self.stats['errors'] += 1
+            self.stats.increment('errors')
             self.logger.error(f"Unexpected error: {e}")
             return None
     
+    def host_answered(self, url: str):
+        """The host responded: close its circuit breaker and forget the URL's failed attempts."""
+        self.retry_attempts.pop(url, None)
+        if self.circuit_breaker:
+            self.circuit_breaker.record_success(url)
+    
+    def fetch_failed(self, url: str, error: BaseException, status_code: Optional[int] = None,
+                     retry_after: Optional[str] = None):
+        """
+        Count a failed fetch against the URL and its host.
+        
+        Args:
+            url: URL whose fetch failed
+            error: Exception the fetch raised
+            status_code: HTTP status of an error response (None for transport errors)
+            retry_after: Raw Retry-After header of the response, if any
+        
+        Raises:
+            RetryLater: If the retry policy allows another attempt
+        """
+        if not self.retry_policy.is_retryable(status_code, error):
+            # The host is fine; the page itself is missing or forbidden
+            self.host_answered(url)
+            self.stats.increment('errors')
+            self.logger.error(f"Error fetching {url}: {error}")
+            return
+        
+        # 429 is the rate limiter's business, not a sign the host is down
+        if self.circuit_breaker and status_code != 429:
+            cooldown = self.circuit_breaker.record_failure(url)
+            if cooldown:
+                self.logger.warning(f"{urlparse(url).netloc} keeps failing, holding its URLs for {cooldown:.1f}s")
+        
+        attempt = self.retry_attempts.pop(url, 0) + 1
+        if attempt < self.retry_policy.max_attempts:
+            self.retry_attempts[url] = attempt
+            self.stats.increment('retries')
+            delay = self.retry_policy.backoff(attempt, parse_retry_after(retry_after))
+            self.logger.info(f"Attempt {attempt} of {url} failed ({error}), retrying in {delay:.1f}s")
+            raise RetryLater(url, delay, attempt)
+        
+        self.stats.increment('errors')
+        self.logger.error(f"Error fetching {url} after {attempt} attempts: {error}")
+    
     def extract_links(self, soup: BeautifulSoup, current_url: str) -> List[str]:
         """Extract all valid links from a page."""
+        links = self.link_extractor.extract(soup)['links']
+        return self.resolve_links((link['href'] for link in links), current_url)
+    
+    def resolve_links(self, hrefs: Iterable[str], current_url: str, unseen_only: bool = True) -> List[str]:
+        """Turn raw href values into canonical, crawlable (and by default not yet seen) URLs."""
         links = []
+        # The page URL is split once; each link is split once while it is resolved
+        base = self.canonicalizer.split_base(current_url)
+        resolve = self.canonicalizer.resolve
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            absolute_url = urljoin(current_url, href)
-            normalized_url = self.normalize_url(absolute_url)
-            
-            if self.is_valid_url(normalized_url) and normalized_url not in self.visited_urls:
-                links.append(normalized_url)
+        for href in hrefs:
+            url = resolve(href, base)
+            if url is not None and not (unseen_only and url in self.visited_urls):
+                links.append(url)
         
         return links
     
     def extract_page_data(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
         """Extract comprehensive data from a page."""
-        data = {
-            'url': url,
-            'title': None,
-            'headings': [],
-            'paragraphs': [],
-            'links': [],
-            'images': [],
-            'forms': [],
-            'scripts': [],
-            'meta': {},
-            'timestamp': datetime.now().isoformat()
-        }
-        
+        fields = None
         try:
-            # Title
-            if soup.title:
-                data['title'] = soup.title.get_text(strip=True)
-            
-            # Headings
-            for tag in ['h1', 'h2', 'h3']:
-                for heading in soup.find_all(tag):
-                    text = heading.get_text(strip=True)
-                    if text:
-                        data['headings'].append({'level': tag, 'text': text})
-            
-            # Paragraphs
-            for p in soup.find_all('p'):
-                text = p.get_text(strip=True)
-                if len(text) > 20:
-                    data['paragraphs'].append(text)
-            
-            # Links
-            for link in soup.find_all('a', href=True):
-                data['links'].append({
-                    'text': link.get_text(strip=True),
-                    'href': link['href']
-                })
-            
-            # Images
-            for img in soup.find_all('img'):
-                data['images'].append({
-                    'src': img.get('src', ''),
-                    'alt': img.get('alt', '')
-                })
-            
-            # Forms
-            for form in soup.find_all('form'):
-                data['forms'].append({
-                    'action': form.get('action', ''),
-                    'method': form.get('method', 'get')
-                })
-            
-            # Scripts
-            for script in soup.find_all('script', src=True):
-                data['scripts'].append(script['src'])
-            
-            # Meta tags
-            for meta in soup.find_all('meta'):
-                name = meta.get('name') or meta.get('property')
-                content = meta.get('content')
-                if name and content:
-                    data['meta'][name] = content
-            
-            self.stats['data_extracted'] += 1
-            
+            # Title, headings, paragraphs, links, images, forms, scripts and meta in one walk
+            # (or one query per field of the extraction schema)
+            started = time.perf_counter()
+            fields = self.page_extractor.extract(soup, url)
+            if self.metrics:
+                self.metrics.observe('extract', time.perf_counter() - started)
         except Exception as e:
             self.logger.error(f"Error extracting data from {url}: {e}")
         
+        return self.page_record(url, fields)
+    
+    def page_record(self, url: str, fields: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a page record from extracted fields (None if extraction failed)."""
+        if self.schema:
+            data = {'url': url, **self.schema.empty_record()}
+        else:
+            data = {
+                'url': url,
+                'title': None,
+                'headings': [],
+                'paragraphs': [],
+                'links': [],
+                'images': [],
+                'forms': [],
+                'scripts': [],
+                'meta': {}
+            }
+        data['timestamp'] = datetime.now().isoformat()
+        
+        if fields is not None:
+            data.update(fields)
+            self.stats.increment('data_extracted')
+        
         return data
     
+    def enqueue(self, url: str, depth: int, lastmod: Optional[str] = None) -> bool:
+        """Add a URL to the frontier (journaling it) unless it was seen before."""
+        if not self.to_visit.push(url, depth, lastmod):
+            return False
+        if self.checkpoint:
+            self.checkpoint.record_push(url, depth)
+        return True
+    
+    def budget_left(self, in_flight: int) -> bool:
+        """True if another page may start; pages in flight count against max_pages."""
+        return not self.max_pages or self.stats['urls_crawled'] + in_flight < self.max_pages
+    
+    def finish_url(self, url: str):
+        """Record that a URL's crawl is complete, so a resumed crawl skips it."""
+        if self.checkpoint:
+            self.checkpoint.record_done(url)
+    
+    def maybe_checkpoint(self, force: bool = False, completed: bool = False):
+        """
+        Flush the checkpoint journal if the interval has elapsed.
+        
+        Args:
+            force: Flush now, waiting for any flush already in progress
+            completed: Mark the crawl as finished in the checkpoint
+        """
+        if not self.checkpoint or not (force or self.checkpoint.due()):
+            return
+        
+        try:
+            self.checkpoint.flush(
+                self.stats.copy(),
+                self.found_data,
+                meta={
+                    'target': self.target_url,
+                    'max_depth': self.max_depth,
+                    'elapsed': self.crawl_duration(),
+                    'completed': completed
+                },
+                blocking=force
+            )
+        except Exception as e:
+            self.logger.error(f"Error writing checkpoint: {e}")
+    
+    def seed_frontier(self):
+        """
+        Queue the target's sitemap pages before the crawl starts.
+        
+        Sitemaps come from the robots.txt Sitemap lines, or /sitemap.xml if
+        there are none. Pages whose lastmod has not changed since they were
+        last crawled are marked as seen so neither the sitemap nor links
+        queue them again. A resumed crawl keeps its restored frontier.
+        """
+        if not self.sitemap_state or self.resumed:
+            return
+        
+        sitemaps = self.robots.rules_for(self.target_url).sitemaps if self.robots else []
+        if not sitemaps:
+            parsed = urlparse(self.target_url)
+            sitemaps = [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"]
+        
+        skip_unchanged = AdvancedScraperConfig.SITEMAP_SKIP_UNCHANGED
+        for entry in iter_sitemaps(self.session, sitemaps, timeout=AdvancedScraperConfig.DEFAULT_TIMEOUT,
+                                   max_urls=AdvancedScraperConfig.SITEMAP_MAX_URLS, logger=self.logger):
+            url = self.canonicalizer.canonicalize(entry.url)
+            if url is None:
+                continue
+            
+            if skip_unchanged and self.sitemap_state.unchanged(url, entry.lastmod):
+                if self.visited_urls.claim(url):
+                    self.sitemap_stats['unchanged'] += 1
+                continue
+            
+            self.sitemap_state.record_seen(url, entry.lastmod)
+            if self.enqueue(url, 0, entry.lastmod):
+                self.sitemap_stats['seeded'] += 1
+        
+        self.sitemap_state.flush()
+        if self.sitemap_stats['seeded'] or self.sitemap_stats['unchanged']:
+            self.print_status(
+                f"Sitemap: {self.sitemap_stats['seeded']} URLs queued, "
+                f"{self.sitemap_stats['unchanged']} unchanged since the last crawl",
+                'success'
+            )
+    
+    def restore_checkpoint(self):
+        """Rebuild the seen-set, frontier, stats and results from the checkpoint."""
+        meta = self.checkpoint.load_meta()
+        
+        for url, _ in self.checkpoint.iter_pushed():
+            self.visited_urls.claim(url)
+        for item in self.checkpoint.iter_pending():
+            # Already claimed above, so bypass the frontier's dedupe
+            self.to_visit.requeue(item)
+        for record in self.checkpoint.iter_pages():
+            self.found_data.append(record)
+        
+        saved_stats = meta.get('stats', {})
+        for key in ('urls_crawled', 'urls_found', 'data_extracted', 'errors', 'urls_rejected', 'bytes_downloaded',
+                    'retries'):
+            self.stats[key] = saved_stats.get(key, 0)
+        self.prior_duration = meta.get('elapsed', 0.0)
+        
+        self.print_status(
+            f"Resumed from checkpoint: {len(self.found_data)} pages extracted, "
+            f"{len(self.to_visit)} URLs pending ({self.checkpoint.path})",
+            'success'
+        )
+    
+    def process_page(self, soup: BeautifulSoup, url: str) -> List[str]:
+        """Extract data from a fetched page and return its new links."""
+        return self.store_page(self.extract_page_data(soup, url))
+    
+    def store_page(self, page_data: Dict[str, Any]) -> List[str]:
+        """Keep an extracted page record and return its new links."""
+        url = page_data['url']
+        duplicate_of = None
+        paragraphs = page_data.get('paragraphs')
+        if self.near_duplicates and isinstance(paragraphs, list):
+            # Schema records are compared only if the schema collects a 'paragraphs' list
+            duplicate_of = self.near_duplicates.check(url, paragraphs)
+            if duplicate_of:
+                page_data['duplicate_of'] = duplicate_of
+        self.found_data.append(page_data)
+        if self.sitemap_state:
+            self.sitemap_state.mark_crawled(url)
+        
+        # Pattern matching: the same keywords the priority frontier scores
+        pattern = self.url_patterns.match(url)
+        if pattern:
+            self.print_status(f"['{pattern}']", 'matched')
+        
+        # New links come from the anchors already collected, not another walk of the tree
+        hrefs = (link['href'] if isinstance(link, dict) else link for link in page_data['links'])
+        links = self.resolve_links(hrefs, url, unseen_only=False)
+        if self.change_tracker:
+            # All links are stored: an unchanged page queues them again on the next run
+            self.change_tracker.record(url, links)
+        new_links = [link for link in links if link not in self.visited_urls]
+        if duplicate_of:
+            # A copy's links lead to more copies; the original's links are expanded instead
+            self.near_duplicates.drop_links(new_links)
+            return []
+        self.stats.increment('urls_found', len(new_links))
+        
+        return new_links
+    
     def crawl_url(self, url: str, depth: int) -> List[str]:
         """Crawl a single URL and return discovered links."""
-        if url in self.visited_urls or depth > self.max_depth:
+        html = self.fetch_url(url, depth)
+        if html is None:
             return []
         
-        self.visited_urls.add(url)
-        self.stats['urls_crawled'] += 1
+        links = self.unchanged_links(url, html)
+        if links is not None:
+            return links
         
-        self.print_status(url, 'crawling')
-        
-        soup = self.fetch_page(url)
+        soup = self.parse_page(html, url)
         if not soup:
             return []
         
-        # Extract data
-        page_data = self.extract_page_data(soup, url)
-        self.found_data.append(page_data)
-        
-        # Pattern matching (example: looking for specific keywords)
-        patterns = ['contact', 'about', 'service', 'product', 'blog']
-        for pattern in patterns:
-            if pattern in url.lower():
-                self.print_status(f"['{pattern}']", 'matched')
-                break
+        return self.process_page(soup, url)
+    
+    def unchanged_links(self, url: str, html: str) -> Optional[List[str]]:
+        """
+        In incremental mode, the links to queue for a page that has not changed
+        since the last run. None means the page is new or changed and has to be
+        extracted.
+        """
+        if not self.change_tracker:
+            return None
+        links = self.change_tracker.check(url, html)
+        if links is None:
+            return None
+        if self.sitemap_state:
+            self.sitemap_state.mark_crawled(url)
+        return [link for link in links if link not in self.visited_urls]
+    
+    def fetch_url(self, url: str, depth: int) -> Optional[str]:
+        """Network half of crawl_url: count the URL and download it (None if skipped or failed)."""
+        # The frontier hands out each URL once, so no visited check is needed here
+        if depth > self.max_depth:
+            return None
+        if self.robots and not self.robots.allowed(url):
+            self.logger.info(f"Disallowed by robots.txt: {url}")
+            return None
         
-        # Extract new links
-        new_links = self.extract_links(soup, url)
-        self.stats['urls_found'] += len(new_links)
+        if url not in self.retry_attempts:
+            # A retry is counted in 'retries'; the page itself counts once
+            self.stats.increment('urls_crawled')
         
-        # Add delay to be respectful
-        time.sleep(AdvancedScraperConfig.DEFAULT_DELAY)
+        self.print_status(url, 'crawling')
         
-        return new_links
+        return self.fetch_html(url)
     
     def start_crawling(self):
         """Start the crawling process with multi-threading."""
@@ -326,43 +1048,19 @@ class AdvancedWebScraper:
         print(f"\n{Colors.MAGENTA}TARGET:{Colors.RESET} {self.target_url}")
         print(f"\n{Colors.BLUE}[!] Initializing Crawler...{Colors.RESET}")
         print(f"{Colors.BLUE}[!] Max Depth: {self.max_depth}{Colors.RESET}")
-        print(f"{Colors.BLUE}[!] Max Threads: {self.max_threads}{Colors.RESET}")
-        print(f"{Colors.GREEN}[✓] Preparing Crawler (Utilizing {self.max_threads} threads){Colors.RESET}\n")
+        print(f"{Colors.BLUE}[!] Frontier Order: {self.frontier_order}{Colors.RESET}")
+        if self.max_pages:
+            print(f"{Colors.BLUE}[!] Page Budget: {self.max_pages}{Colors.RESET}")
+        self.print_engine_info()
         
         self.stats['start_time'] = datetime.now()
+        completed = False
         
         try:
-            while self.to_visit:
-                current_batch = []
-                
-                # Collect URLs for current batch
-                while self.to_visit and len(current_batch) < self.max_threads:
-                    url, depth = self.to_visit.popleft()
-                    if url not in self.visited_urls:
-                        current_batch.append((url, depth))
-                
-                if not current_batch:
-                    break
-                
-                # Process batch with threading
-                with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
-                    future_to_url = {
-                        executor.submit(self.crawl_url, url, depth): (url, depth)
-                        for url, depth in current_batch
-                    }
-                    
-                    for future in as_completed(future_to_url):
-                        url, depth = future_to_url[future]
-                        try:
-                            new_links = future.result()
-                            # Add new links to queue
-                            for link in new_links:
-                                if link not in self.visited_urls:
-                                    self.to_visit.append((link, depth + 1))
-                        except Exception as e:
-                            self.logger.error(f"Error processing {url}: {e}")
+            self.run_crawl()
             
             self.stats['end_time'] = datetime.now()
+            completed = True
             
             print(f"\n{Colors.GREEN}Crawling finished.{Colors.RESET}\n")
             
@@ -371,14 +1069,99 @@ class AdvancedWebScraper:
             
             # Print statistics
             self.print_statistics()
-            
+        
         except KeyboardInterrupt:
+            self.stats['end_time'] = datetime.now()
             print(f"\n{Colors.YELLOW}[!] Crawling interrupted by user{Colors.RESET}")
-            self.export_results()
+            self.export_results(completed=False)
             self.print_statistics()
+        
+        finally:
+            # Final checkpoint, also on crashes, so a restart with resume=True loses nothing
+            self.maybe_checkpoint(force=True, completed=completed)
+            self.close()
+    
+    def close(self):
+        """Release the frontier, checkpoint and result stream."""
+        if isinstance(self.found_data, StreamingResultSink):
+            self.found_data.close()
+        self.to_visit.close()
+        if self.checkpoint:
+            self.checkpoint.close()
+        if self.http_cache:
+            self.http_cache.close()
+        if self.sitemap_state:
+            self.sitemap_state.close()
+        if self.change_tracker:
+            self.change_tracker.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+    
+    def print_engine_info(self):
+        """Print the concurrency settings of the crawl engine."""
+        print(f"{Colors.BLUE}[!] Max Threads: {self.max_threads}{Colors.RESET}")
+        print(f"{Colors.BLUE}[!] HTML Parser: {self.parser_backend}{Colors.RESET}")
+        if self.schema:
+            print(f"{Colors.BLUE}[!] Extraction: {self.schema.summary()}{Colors.RESET}")
+        if self.parse_processes > 0:
+            print(f"{Colors.BLUE}[!] Parse Processes: {self.parse_processes}{Colors.RESET}")
+        if self.metrics_server:
+            print(f"{Colors.BLUE}[!] Metrics: {self.metrics_server.url}{Colors.RESET}")
+        print(f"{Colors.GREEN}[✓] Preparing Crawler (Utilizing {self.max_threads} threads){Colors.RESET}\n")
+    
+    def create_parse_stage(self) -> Optional[ParseStage]:
+        """Start the parse process pool, if parse_processes is set."""
+        if self.parse_processes <= 0:
+            return None
+        return ParseStage(self.parse_processes, AdvancedScraperConfig.PARSE_BACKLOG,
+                          self.parser_backend, self.page_extractor, metrics=self.metrics)
+    
+    def run_crawl(self):
+        """Drive the crawl until the frontier drains (engines override this)."""
+        # One persistent pool pulls from the shared frontier until it drains;
+        # with a parse stage its threads only fetch and processes do the parsing
+        self.seed_frontier()
+        parse_stage = self.create_parse_stage()
+        try:
+            CrawlScheduler(self, self.max_threads, parse_stage=parse_stage).run()
+        finally:
+            if parse_stage:
+                parse_stage.shutdown()
     
-    def export_results(self):
-        """Export crawling results to files."""
+    def crawl_duration(self) -> float:
+        """Seconds spent crawling, including sessions before a resume."""
+        if not self.stats['start_time']:
+            return self.prior_duration
+        end_time = self.stats['end_time'] or datetime.now()
+        return self.prior_duration + (end_time - self.stats['start_time']).total_seconds()
+    
+    def pages_per_second(self) -> float:
+        """Crawl throughput used by both the progress line and the final statistics."""
+        duration = self.crawl_duration()
+        return self.stats['urls_crawled'] / duration if duration > 0 else 0.0
+    
+    def bytes_per_second(self) -> float:
+        """Average download rate of the crawl."""
+        duration = self.crawl_duration()
+        return self.stats['bytes_downloaded'] / duration if duration > 0 else 0.0
+    
+    def print_progress(self, scheduler: CrawlScheduler):
+        """Print a one-line progress report for a running crawl."""
+        timings = f" | {self.metrics.progress_summary()}" if self.metrics else ''
+        print(f"{Colors.CYAN}[~] Progress:{Colors.RESET} "
+              f"{self.stats['urls_crawled']} crawled, "
+              f"{scheduler.queued} queued, "
+              f"{scheduler.in_flight} in flight, "
+              f"{self.pages_per_second():.2f} pages/second, "
+              f"{self.bytes_per_second() / 1024:,.1f} KiB/second{timings}")
+    
+    def export_results(self, completed: bool = True):
+        """
+        Export crawling results to files.
+        
+        Args:
+            completed: The crawl ran to the end (pages not found again count as removed)
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Prepare stats for JSON export
@@ -388,16 +1171,41 @@ class AdvancedWebScraper:
         if stats_export['end_time']:
             stats_export['end_time'] = stats_export['end_time'].isoformat()
         
-        # Export to JSON
-        json_file = AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{timestamp}.json'
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'target': self.target_url,
-                'stats': stats_export,
-                'data': self.found_data
-            }, f, indent=2, ensure_ascii=False)
+        if isinstance(self.found_data, StreamingResultSink):
+            # Records are already on disk; finish the stream and optionally wrap it as JSON
+            self.found_data.close()
+            stream_file = self.found_data.writer.path
+            print(f"{Colors.GREEN}[✓] Results streamed to: {stream_file}{Colors.RESET}")
+            
+            if AdvancedScraperConfig.WRITE_JSON_ENVELOPE:
+                json_file = AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{self.run_timestamp}.json'
+                write_json_envelope(stream_file, json_file,
+                                    {'target': self.target_url, 'stats': stats_export})
+                print(f"{Colors.GREEN}[✓] Results exported to: {json_file}{Colors.RESET}")
+            columnar = self.found_data.columnar
+        else:
+            # Export to JSON
+            json_file = AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{timestamp}.json'
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'target': self.target_url,
+                    'stats': stats_export,
+                    'data': self.found_data.snapshot()
+                }, f, indent=2, ensure_ascii=False)
+            
+            print(f"{Colors.GREEN}[✓] Results exported to: {json_file}{Colors.RESET}")
+            
+            columnar = create_columnar_writer(AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{timestamp}')
+            if columnar:
+                for record in self.found_data.snapshot():
+                    columnar.write(record)
+                columnar.close()
         
-        print(f"{Colors.GREEN}[✓] Results exported to: {json_file}{Colors.RESET}")
+        if columnar:
+            if columnar.error:
+                print(f"{Colors.RED}[✗] Columnar export failed: {columnar.error}{Colors.RESET}")
+            else:
+                print(f"{Colors.GREEN}[✓] Columnar results exported to: {columnar.path}{Colors.RESET}")
         
         # Export URLs to text file
         urls_file = AdvancedScraperConfig.OUTPUT_DIR / f'discovered_urls_{timestamp}.txt'
@@ -405,14 +1213,28 @@ class AdvancedWebScraper:
             f.write(f"Discovered URLs from: {self.target_url}\n")
             f.write(f"Total URLs: {len(self.visited_urls)}\n")
             f.write("=" * 80 + "\n\n")
-            for url in sorted(self.visited_urls):
-                f.write(f"{url}\n")
+            if isinstance(self.visited_urls, VisitedSet):
+                for url in sorted(self.visited_urls):
+                    f.write(f"{url}\n")
+            elif self.frontier_backend == 'sqlite':
+                # Stream from disk instead of sorting millions of URLs in memory
+                for url in self.visited_urls:
+                    f.write(f"{url}\n")
+            else:
+                f.write("(URL list not available: the Bloom filter backend only stores hashes)\n")
         
         print(f"{Colors.GREEN}[✓] URLs exported to: {urls_file}{Colors.RESET}")
+        
+        if self.change_tracker:
+            # Pages not found again only count as removed when nothing stopped the crawl early
+            budget_hit = self.max_pages and self.stats['urls_crawled'] >= self.max_pages
+            delta_file = AdvancedScraperConfig.OUTPUT_DIR / f'delta_{timestamp}.ndjson'
+            lines = self.change_tracker.write_delta(delta_file, removals=completed and not budget_hit)
+            print(f"{Colors.GREEN}[✓] Changes ({lines}) exported to: {delta_file}{Colors.RESET}")
     
     def print_statistics(self):
         """Print crawling statistics."""
-        duration = (self.stats['end_time'] - self.stats['start_time']).total_seconds() if self.stats['end_time'] else 0
+        duration = self.crawl_duration()
         
         print(f"\n{Colors.CYAN}{'=' * 80}{Colors.RESET}")
         print(f"{Colors.BOLD}CRAWLING STATISTICS{Colors.RESET}")
@@ -422,8 +1244,47 @@ class AdvancedWebScraper:
         print(f"URLs Discovered:      {self.stats['urls_found']}")
         print(f"Pages Extracted:      {self.stats['data_extracted']}")
         print(f"Errors Encountered:   {self.stats['errors']}")
+        print(f"URLs Rejected:        {self.stats['urls_rejected']} ({self.fetch_limits.summary()})")
+        print(f"Throttled Responses:  {self.rate_limiter.stats['throttled_responses']}")
+        print(f"Retried Fetches:      {self.stats['retries']}")
+        if self.circuit_breaker:
+            print(f"Circuit Breaker:      {self.circuit_breaker.summary()}")
+        print(f"Frontier Memory:      {self.to_visit.memory_bytes():,} bytes "
+              f"({self.to_visit.bytes_per_url():.1f} bytes/URL, {self.frontier_backend})")
+        if self.frontier_order == 'priority':
+            print(f"Frontier Order:       best-first ({self.to_visit.scorer.describe()}; "
+                  f"{self.to_visit.stats['improved']} URLs moved up)")
+        if self.max_pages:
+            print(f"Page Budget:          {self.stats['urls_crawled']} of {self.max_pages} used, "
+                  f"{len(self.to_visit)} URLs left in the frontier")
+        if isinstance(self.found_data, StreamingResultSink):
+            writer = self.found_data.writer
+            print(f"Results Streamed:     {writer.records_written} records "
+                  f"({writer.bytes_written:,} bytes, {writer.compression or 'uncompressed'})")
+            if self.found_data.columnar:
+                print(f"Columnar Export:      {self.found_data.columnar.summary()}")
+        if self.http_cache:
+            print(f"HTTP Cache:           {self.http_cache.summary()}")
+        print(f"Page Encodings:       {self.charset_resolver.summary()}")
+        if self.robots:
+            print(f"robots.txt:           {self.robots.summary()}")
+        if self.sitemap_state:
+            print(f"Sitemap Seeds:        {self.sitemap_stats['seeded']} queued, "
+                  f"{self.sitemap_stats['unchanged']} unchanged skipped")
+        if self.change_tracker:
+            print(f"Page Changes:         {self.change_tracker.summary()}")
+        if self.near_duplicates:
+            bytes_per_page = self.stats['bytes_downloaded'] / max(1, self.stats['urls_crawled'])
+            print(f"Near-Duplicates:      {self.near_duplicates.summary(self.visited_urls, bytes_per_page)}")
         print(f"Duration:             {duration:.2f} seconds")
-        print(f"Average Speed:        {self.stats['urls_crawled']/max(duration, 1):.2f} pages/second")
+        print(f"Average Speed:        {self.pages_per_second():.2f} pages/second")
+        print(f"Download Rate:        {self.bytes_per_second() / 1024:,.1f} KiB/second "
+              f"({self.stats['bytes_downloaded']:,} bytes)")
+        if self.metrics:
+            lines = self.metrics.stage_lines() or ['no samples']
+            print(f"Stage Latency:        {lines[0]}")
+            for line in lines[1:]:
+                print(f"{'':22}{line}")
         print(f"{Colors.CYAN}{'=' * 80}{Colors.RESET}\n")
 
 
@@ -12,16 +12,31 @@ Version: 2.0
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import json
-import csv
 import time
 import logging
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
 from pathlib import Path
 import sys
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from charset import CharsetResolver
+from columnar_writer import COLUMNAR_FORMATS, write_columnar
+from crawl_state import CrawlStats
+from csv_export import iter_link_rows, write_csv
+from extraction import PageExtractor, content_fields, metadata_fields
+from extraction_schema import ExtractionSchema, load_schema
+from http_cache import CachingHTTPAdapter, HTTPCache
+from fetch_limits import FetchLimits, ResponseRejected
+from metrics import CrawlMetrics, MetricsServer, instrument_session
+from parsers import parse_html, resolve_backend, soup_backend
+from rate_limiter import HostRateLimiter, PoliteFrontier, parse_retry_after
+from retry_policy import CircuitBreaker, RetryLater, RetryPolicy
 
 
 def print_shadowfox_banner():
@@ -54,7 +69,29 @@ class ScraperConfig:
     
     DEFAULT_TIMEOUT = 15
     DEFAULT_DELAY = 2
+    ADAPTIVE_DELAY = True
+    MAX_DELAY = 60
     MAX_RETRIES = 3
+    RETRY_BASE_DELAY = 2  # backoff ceiling of the first retry, doubled per attempt (full jitter)
+    RETRY_MAX_DELAY = 60
+    CIRCUIT_BREAKER = True  # fail fast on a host after consecutive failures, for a cooldown
+    BREAKER_FAILURE_THRESHOLD = 5
+    BREAKER_COOLDOWN = 30  # seconds (doubled while the probe after a cooldown keeps failing)
+    CONCURRENCY = 8  # pages scrape_many fetches at the same time
+    MAX_PARKED_PER_HOST = 1000  # URLs of a throttled host scrape_many holds in memory
+    HTTP_CACHE = True
+    HTTP_CACHE_TTL = 0  # seconds served without revalidation (0 always revalidates)
+    HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    PARSER_BACKEND = 'auto'  # 'auto', 'selectolax', 'lxml' or 'html.parser'
+    MAX_BODY_BYTES = 10 * 1024 * 1024  # larger pages are abandoned mid-download (0 disables)
+    ALLOWED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+    HEAD_BEFORE_GET = False  # check type and size with a HEAD request before each GET
+    METRICS = True  # per-stage latency histograms (connect, TTFB, download, parse, extract)
+    METRICS_PORT = 0  # serve Prometheus metrics at http://127.0.0.1:PORT/metrics (0 disables)
+    COLUMNAR_COMPRESSION = 'zstd'  # compression of export_parquet files
+    COLUMNAR_ROW_GROUP_SIZE = 1000
+    CSV_SAMPLE_SIZE = 1000  # records read to discover the CSV columns (when not given)
+    CSV_BUFFER_SIZE = 1024 * 1024  # bytes buffered between CSV writes to disk
     OUTPUT_DIR = Path('scraped_data')
     
     SHADOWFOX_URL = "https://www.shadowfox.org.in/"
@@ -66,11 +103,13 @@ class WebScraperPro:
     Professional-grade web scraper with advanced features.
     
     Features:
-    - Robust error handling and retry logic
+    - Robust error handling, retries with jittered backoff and a per-host circuit breaker
     - Comprehensive logging
-    - Multiple export formats (JSON, CSV, TXT)
+    - Multiple export formats (JSON, CSV, TXT, Parquet/Arrow)
     - Rate limiting and respectful scraping
     - Session management
+    - Concurrent batch scraping over one connection pool (scrape_many)
+    - Declarative extraction schemas for site-specific fields (scrape_fields)
     - Data validation
     """
     
@@ -87,21 +126,90 @@ class WebScraperPro:
         self.headers = headers or ScraperConfig.DEFAULT_HEADERS
         self.session = requests.Session()
         self.session.headers.update(self.headers)
-        self.stats = {
-            'requests_made': 0,
-            'successful_requests': 0,
-            'failed_requests': 0,
-            'data_points_extracted': 0
-        }
+        # Which failures are retried and how long to back off; failing hosts are skipped for a while
+        self.retry_policy = RetryPolicy(
+            max_attempts=ScraperConfig.MAX_RETRIES,
+            base_delay=ScraperConfig.RETRY_BASE_DELAY,
+            max_delay=ScraperConfig.RETRY_MAX_DELAY
+        )
+        self.circuit_breaker = None
+        if ScraperConfig.CIRCUIT_BREAKER:
+            self.circuit_breaker = CircuitBreaker(
+                failure_threshold=ScraperConfig.BREAKER_FAILURE_THRESHOLD,
+                cooldown=ScraperConfig.BREAKER_COOLDOWN
+            )
+        self.rate_limiter = HostRateLimiter(
+            delay=ScraperConfig.DEFAULT_DELAY,
+            adaptive=ScraperConfig.ADAPTIVE_DELAY,
+            max_delay=ScraperConfig.MAX_DELAY,
+            breaker=self.circuit_breaker
+        )
+        # Striped counters: scrape_many updates them from several threads
+        self.stats = CrawlStats(['requests_made', 'successful_requests', 'failed_requests',
+                                 'rejected_responses', 'data_points_extracted', 'retries',
+                                 'short_circuited'])
+        
+        # Each extractor walks the parsed page once; scrape_website needs both field sets
+        self.parser_backend = resolve_backend(ScraperConfig.PARSER_BACKEND)
+        self.metadata_extractor = PageExtractor(metadata_fields())
+        self.content_extractor = PageExtractor(content_fields(base_url))
+        self.page_extractor = PageExtractor({**metadata_fields(), **content_fields(base_url)})
+        # Header, BOM and <meta> charsets are used before any detection runs over the body
+        self.charset_resolver = CharsetResolver()
+        # Non-HTML and oversized responses are dropped before their body is downloaded
+        self.fetch_limits = FetchLimits(
+            max_bytes=ScraperConfig.MAX_BODY_BYTES,
+            allowed_types=ScraperConfig.ALLOWED_CONTENT_TYPES,
+            head_first=ScraperConfig.HEAD_BEFORE_GET
+        )
         
         # Create output directory first
         ScraperConfig.OUTPUT_DIR.mkdir(exist_ok=True)
         
+        # Unchanged pages are answered with 304 and served from the on-disk cache
+        self.http_cache = None
+        if ScraperConfig.HTTP_CACHE:
+            self.http_cache = HTTPCache(
+                ScraperConfig.OUTPUT_DIR / 'http_cache',
+                ttl=ScraperConfig.HTTP_CACHE_TTL,
+                max_bytes=ScraperConfig.HTTP_CACHE_MAX_BYTES
+            )
+        
+        # Where each fetch spends its time; the counters are read only when reported
+        self.metrics = None
+        self.metrics_server = None
+        self.pool_size = 0
+        self._mount_adapters(requests.adapters.DEFAULT_POOLSIZE)
+        if ScraperConfig.METRICS:
+            for name, help_text in (('requests_made', 'Pages requested'),
+                                    ('failed_requests', 'Pages that failed after all retries'),
+                                    ('data_points_extracted', 'Headings and paragraphs (or schema fields) extracted')):
+                self.metrics.counter(name, help_text, lambda name=name: self.stats[name])
+            if ScraperConfig.METRICS_PORT:
+                self.metrics_server = MetricsServer(self.metrics, ScraperConfig.METRICS_PORT).start()
+        
         # Setup logging
         self._setup_logging(log_level)
         
         self.logger.info(f"WebScraperPro initialized for: {base_url}")
     
+    def _mount_adapters(self, pool_size: int):
+        """Mount (caching) adapters that keep up to pool_size connections per host."""
+        if self.http_cache:
+            adapter = CachingHTTPAdapter(self.http_cache, pool_maxsize=pool_size)
+        else:
+            adapter = HTTPAdapter(pool_maxsize=pool_size)
+        if self.pool_size:
+            self.session.close()  # idle connections of the adapters being replaced
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.pool_size = pool_size
+        
+        if ScraperConfig.METRICS:
+            if self.metrics is None:
+                self.metrics = CrawlMetrics()
+            instrument_session(self.session, self.metrics)
+    
     def _setup_logging(self, log_level: str):
         """Configure logging with both file and console handlers."""
         self.logger = logging.getLogger('WebScraperPro')
@@ -129,55 +237,163 @@ class WebScraperPro:
     def fetch_page(self, url: str, timeout: int = ScraperConfig.DEFAULT_TIMEOUT, 
                    retries: int = ScraperConfig.MAX_RETRIES) -> Optional[BeautifulSoup]:
         """
+        Fetch a web page and parse it into a BeautifulSoup tree.
+        
+        Uses the configured parser backend if it builds BeautifulSoup trees,
+        otherwise lxml or html.parser (see fetch_document for the rest).
+        """
+        return self.fetch_document(url, timeout, retries, soup_backend(self.parser_backend))
+    
+    def fetch_document(self, url: str, timeout: int = ScraperConfig.DEFAULT_TIMEOUT,
+                       retries: int = ScraperConfig.MAX_RETRIES, backend: Optional[str] = None):
+        """
         Fetch a web page with retry logic and comprehensive error handling.
         
+        Server errors, throttling, timeouts and dropped connections are retried
+        after a jittered exponential backoff; other failures are final. While
+        the host's circuit breaker is open the page fails at once.
+        
         Args:
             url: URL to fetch
             timeout: Request timeout in seconds
             retries: Number of retry attempts
+            backend: Parser backend (PARSER_BACKEND if omitted)
             
         Returns:
-            BeautifulSoup object or None if all attempts fail
+            Parsed page (BeautifulSoup, or a SelectolaxDocument with the selectolax
+            backend) or None if all attempts fail
         """
-        self.stats['requests_made'] += 1
-        
-        for attempt in range(1, retries + 1):
+        attempt = 1
+        while True:
+            if not self._circuit_open(url):
+                # Per-host politeness: waits only if this host was hit too recently
+                self.rate_limiter.acquire(url)
             try:
-                self.logger.debug(f"Fetching {url} (Attempt {attempt}/{retries})")
-                response = self.session.get(url, timeout=timeout)
+                return self._fetch_attempt(url, attempt, timeout, retries, backend)
+            except RetryLater as e:
+                time.sleep(e.delay)
+                attempt = e.attempt + 1
+    
+    def _circuit_open(self, url: str) -> float:
+        """Seconds the circuit breaker keeps url's host closed to requests (0 if it is not open)."""
+        return self.circuit_breaker.open_for(url) if self.circuit_breaker else 0.0
+    
+    def _fetch_attempt(self, url: str, attempt: int, timeout: int = ScraperConfig.DEFAULT_TIMEOUT,
+                       retries: int = ScraperConfig.MAX_RETRIES, backend: Optional[str] = None):
+        """
+        Make one attempt at fetching url, without waiting for its host.
+        
+        The caller has already reserved the request slot with the rate
+        limiter. A failure that is worth another try raises RetryLater
+        instead of sleeping through the backoff, so the caller decides
+        where the wait is spent.
+        
+        Returns:
+            Parsed page, or None once the page has failed for good
+        
+        Raises:
+            RetryLater: attempt < retries and the failure is retryable
+        """
+        backend = backend or self.parser_backend
+        if attempt == 1:
+            self.stats.increment('requests_made')
+        metrics = self.metrics
+        
+        open_for = self._circuit_open(url)
+        if open_for > 0:
+            self.stats.increment('short_circuited')
+            self.stats.increment('failed_requests')
+            self.logger.warning(f"[SKIP] {url}: host is failing, circuit open for {open_for:.0f} more seconds")
+            return None
+        
+        throttled_for = None
+        status_code = retry_after = error = None
+        try:
+            self.logger.debug(f"Fetching {url} (Attempt {attempt}/{retries})")
+            if metrics:
+                metrics.take_connect()
+            with self.fetch_limits.get(self.session, url, timeout=timeout) as response:
+                throttled_for = self.rate_limiter.record_response(
+                    url,
+                    response.status_code,
+                    response.elapsed.total_seconds(),
+                    response.headers.get('Retry-After')
+                )
+                fetched = getattr(response, 'cache_status', None) != 'hit'
+                if metrics and fetched:
+                    # elapsed runs until the headers arrived, including any new connection
+                    metrics.observe('ttfb', max(0.0, response.elapsed.total_seconds() - metrics.take_connect()))
                 response.raise_for_status()
-                response.encoding = response.apparent_encoding
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                self.stats['successful_requests'] += 1
-                self.logger.info(f"[OK] Successfully fetched: {url}")
-                return soup
-                
-            except requests.exceptions.HTTPError as e:
-                self.logger.error(f"[ERROR] HTTP Error {response.status_code} for {url}: {e}")
-                if response.status_code in [404, 403, 401]:
-                    break
-                    
-            except requests.exceptions.ConnectionError:
-                self.logger.error(f"[ERROR] Connection Error: Unable to reach {url}")
-                
-            except requests.exceptions.Timeout:
-                self.logger.error(f"[ERROR] Timeout Error: {url} took too long to respond")
-                
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"[ERROR] Request Error for {url}: {e}")
+                started = time.perf_counter()
+                body = self.fetch_limits.read_body(response)
+                if metrics and fetched:
+                    metrics.observe('download', time.perf_counter() - started)
+            
+            # The parser decodes the raw body itself with the resolved encoding
+            started = time.perf_counter()
+            encoding = self.charset_resolver.resolve(body, response.headers.get('Content-Type'))
+            soup = parse_html(body, backend, encoding)
+            if metrics:
+                metrics.observe('parse', time.perf_counter() - started)
+            self.stats.increment('successful_requests')
+            self._host_answered(url)
+            self.logger.info(f"[OK] Successfully fetched: {url}")
+            return soup
+            
+        except ResponseRejected as e:
+            # Retrying would only download the same unusable body again
+            self.stats.increment('rejected_responses')
+            self._host_answered(url)
+            self.logger.warning(f"[SKIP] {url}: {e.detail}")
+            return None
+            
+        except requests.exceptions.HTTPError as e:
+            status_code, retry_after, error = response.status_code, response.headers.get('Retry-After'), e
+            self.logger.error(f"[ERROR] HTTP Error {response.status_code} for {url}: {e}")
                 
-            except Exception as e:
-                self.logger.error(f"[ERROR] Unexpected error fetching {url}: {e}")
+        except requests.exceptions.ConnectionError as e:
+            error = e
+            self.logger.error(f"[ERROR] Connection Error: Unable to reach {url}")
             
-            if attempt < retries:
-                wait_time = attempt * 2
-                self.logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
+        except requests.exceptions.Timeout as e:
+            error = e
+            self.logger.error(f"[ERROR] Timeout Error: {url} took too long to respond")
+            
+        except requests.exceptions.RequestException as e:
+            error = e
+            self.logger.error(f"[ERROR] Request Error for {url}: {e}")
+            
+        except Exception as e:
+            error = e
+            self.logger.error(f"[ERROR] Unexpected error fetching {url}: {e}")
         
-        self.stats['failed_requests'] += 1
+        retryable = self.retry_policy.is_retryable(status_code, error)
+        if not retryable:
+            # 404s and the like: the host is fine and another attempt would fail the same way
+            self._host_answered(url)
+        elif self.circuit_breaker and status_code != 429:
+            cooldown = self.circuit_breaker.record_failure(url)
+            if cooldown:
+                self.logger.warning(f"Host of {url} keeps failing, skipping it for {cooldown:.0f} seconds")
+        
+        if retryable and attempt < retries:
+            self.stats.increment('retries')
+            if throttled_for is not None:
+                # The rate limiter holds the next attempt until the host allows it
+                self.logger.info(f"Host is throttling, retrying in {throttled_for:.0f} seconds...")
+                raise RetryLater(url, 0.0, attempt)
+            wait_time = self.retry_policy.backoff(attempt, parse_retry_after(retry_after))
+            self.logger.info(f"Retrying in {wait_time:.1f} seconds...")
+            raise RetryLater(url, wait_time, attempt)
+        
+        self.stats.increment('failed_requests')
         return None
     
+    def _host_answered(self, url: str):
+        """The host responded, so its circuit breaker closes."""
+        if self.circuit_breaker:
+            self.circuit_breaker.record_success(url)
+    
     def extract_metadata(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Extract comprehensive metadata from a webpage."""
         metadata = {
@@ -191,33 +407,8 @@ class WebScraperPro:
         }
         
         try:
-            title_tag = soup.find('title')
-            if title_tag:
-                metadata['title'] = title_tag.get_text(strip=True)
-            
-            desc_tag = soup.find('meta', attrs={'name': 'description'})
-            if desc_tag and desc_tag.get('content'):
-                metadata['description'] = desc_tag.get('content')
-            
-            keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
-            if keywords_tag and keywords_tag.get('content'):
-                metadata['keywords'] = keywords_tag.get('content')
-            
-            author_tag = soup.find('meta', attrs={'name': 'author'})
-            if author_tag and author_tag.get('content'):
-                metadata['author'] = author_tag.get('content')
-            
-            og_title_tag = soup.find('meta', attrs={'property': 'og:title'})
-            if og_title_tag and og_title_tag.get('content'):
-                metadata['og_title'] = og_title_tag.get('content')
-            
-            og_desc_tag = soup.find('meta', attrs={'property': 'og:description'})
-            if og_desc_tag and og_desc_tag.get('content'):
-                metadata['og_description'] = og_desc_tag.get('content')
-            
-            og_image_tag = soup.find('meta', attrs={'property': 'og:image'})
-            if og_image_tag and og_image_tag.get('content'):
-                metadata['og_image'] = og_image_tag.get('content')
+            # Title plus the first description/keywords/author/og:* meta tags
+            metadata.update(self.metadata_extractor.extract(soup))
             
             self.logger.debug(f"Extracted metadata: {metadata['title']}")
             
@@ -237,57 +428,41 @@ class WebScraperPro:
         }
         
         try:
-            # Headings
-            for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                headings = soup.find_all(tag)
-                for h in headings:
-                    text = h.get_text(strip=True)
-                    if text:
-                        content['headings'].append({
-                            'level': tag,
-                            'text': text
-                        })
-            
-            # Paragraphs
-            paragraphs = soup.find_all('p')
-            content['paragraphs'] = [p.get_text(strip=True) for p in paragraphs 
-                                    if len(p.get_text(strip=True)) > 20]
-            
-            # Links
-            links = soup.find_all('a', href=True)
-            for link in links:
-                text = link.get_text(strip=True)
-                href = urljoin(self.base_url, link['href'])
-                if text and href:
-                    content['links'].append({
-                        'text': text,
-                        'url': href,
-                        'is_internal': urlparse(href).netloc == urlparse(self.base_url).netloc
-                    })
-            
-            # Images
-            images = soup.find_all('img')
-            for img in images:
-                content['images'].append({
-                    'src': urljoin(self.base_url, img.get('src', '')),
-                    'alt': img.get('alt', ''),
-                    'title': img.get('title', '')
-                })
-            
-            # Lists
-            for ul in soup.find_all(['ul', 'ol']):
-                items = [li.get_text(strip=True) for li in ul.find_all('li')]
-                if items:
-                    content['lists'].append(items)
-            
-            self.stats['data_points_extracted'] += len(content['headings']) + len(content['paragraphs'])
-            self.logger.debug(f"Extracted {len(content['headings'])} headings, {len(content['paragraphs'])} paragraphs")
+            # Headings, paragraphs, links, images and lists in one walk
+            content.update(self.content_extractor.extract(soup))
+            self._count_content(content)
             
         except Exception as e:
             self.logger.error(f"[ERROR] Error extracting content: {e}")
         
         return content
     
+    def _count_content(self, content: Dict[str, Any]):
+        """Update statistics for extracted content."""
+        self.stats.increment('data_points_extracted', len(content['headings']) + len(content['paragraphs']))
+        self.logger.debug(f"Extracted {len(content['headings'])} headings, {len(content['paragraphs'])} paragraphs")
+    
+    def extract_page(self, soup: BeautifulSoup) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Extract metadata and content together in a single traversal.
+        
+        Returns:
+            (metadata, content) as returned by extract_metadata and extract_content
+        """
+        try:
+            started = time.perf_counter()
+            fields = self.page_extractor.extract(soup)
+            if self.metrics:
+                self.metrics.observe('extract', time.perf_counter() - started)
+        except Exception as e:
+            self.logger.error(f"[ERROR] Error extracting page: {e}")
+            return self.extract_metadata(soup), self.extract_content(soup)
+        
+        metadata = {key: fields[key] for key in self.metadata_extractor.fields}
+        content = {key: fields[key] for key in self.content_extractor.fields}
+        self._count_content(content)
+        return metadata, content
+    
     def scrape_website(self, url: str) -> Dict[str, Any]:
         """
         Perform comprehensive scraping of a website.
@@ -299,21 +474,153 @@ class WebScraperPro:
             Dictionary containing all scraped data
         """
         self.logger.info(f"Starting comprehensive scrape of: {url}")
-        
-        soup = self.fetch_page(url)
+        return self._page_result(url, self.fetch_document(url))
+    
+    def _page_result(self, url: str, soup) -> Dict[str, Any]:
+        """scrape_website()'s result for a fetched page (soup is None if the fetch failed)."""
         if not soup:
             return {'error': 'Failed to fetch page', 'url': url}
         
+        metadata, content = self.extract_page(soup)
+        
         data = {
             'url': url,
             'scraped_at': datetime.now().isoformat(),
             'scraped_by': 'ShadowFox Web Scraper',
-            'metadata': self.extract_metadata(soup),
-            'content': self.extract_content(soup)
+            'metadata': metadata,
+            'content': content
         }
         
         return data
     
+    def scrape_fields(self, url: str, schema: Union[ExtractionSchema, str, Path]) -> Dict[str, Any]:
+        """
+        Scrape only the fields an extraction schema describes.
+        
+        Args:
+            url: URL to scrape
+            schema: Compiled ExtractionSchema, or the path of a JSON/YAML schema file
+            
+        Returns:
+            Dictionary with the schema's fields under 'data'
+        """
+        if not isinstance(schema, ExtractionSchema):
+            schema = load_schema(schema)
+        self.logger.info(f"Scraping {schema.summary()} from: {url}")
+        return self._fields_result(url, schema, self.fetch_document(url))
+    
+    def _fields_result(self, url: str, schema: ExtractionSchema, soup) -> Dict[str, Any]:
+        """scrape_fields()'s result for a fetched page (soup is None if the fetch failed)."""
+        if not soup:
+            return {'error': 'Failed to fetch page', 'url': url}
+        
+        try:
+            started = time.perf_counter()
+            fields = schema.extract(soup, url)
+            if self.metrics:
+                self.metrics.observe('extract', time.perf_counter() - started)
+        except Exception as e:
+            self.logger.error(f"[ERROR] Error extracting {schema.name} fields from {url}: {e}")
+            return {'error': f'Extraction failed: {e}', 'url': url}
+        
+        self.stats.increment('data_points_extracted', sum(1 for value in fields.values() if value not in (None, [])))
+        
+        return {
+            'url': url,
+            'scraped_at': datetime.now().isoformat(),
+            'scraped_by': 'ShadowFox Web Scraper',
+            'schema': schema.name,
+            'data': fields
+        }
+    
+    def scrape_many(self, urls: Iterable[str], concurrency: int = ScraperConfig.CONCURRENCY,
+                    schema: Union[ExtractionSchema, str, Path, None] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Scrape many URLs concurrently, yielding each result as soon as it is ready.
+        
+        Fetch and extraction run on `concurrency` threads sharing the session,
+        whose connection pool is enlarged to match. Per-host politeness still
+        applies: pages of one host are spaced by DEFAULT_DELAY, so concurrency
+        pays off across hosts or with a short delay. As in the crawl
+        schedulers, a page whose host may not be hit yet is parked in a
+        PoliteFrontier and a failed attempt is deferred there for its backoff,
+        so threads never sleep and a slow or throttled host does not hold up
+        the others. URLs are taken from `urls` only while no queued host is
+        free, so it may be a long generator; stopping the iteration early
+        cancels the URLs not yet started. Memory stays bounded: at most
+        MAX_PARKED_PER_HOST URLs of a host are parked and ten times that many
+        of full hosts are set aside, so a longer run of one host at the front
+        of `urls` is taken in at that host's pace before later hosts are
+        reached.
+        
+        Args:
+            urls: URLs to scrape
+            concurrency: Pages fetched and extracted at the same time
+            schema: Extract only this schema's fields (see scrape_fields)
+            
+        Yields:
+            scrape_website() (or scrape_fields()) results in completion order (each has its 'url')
+        """
+        concurrency = max(1, concurrency)
+        if schema is not None:
+            # Compiled once, shared by every thread
+            schema = schema if isinstance(schema, ExtractionSchema) else load_schema(schema)
+            scrape = lambda url, attempt: self._fields_result(url, schema, self._fetch_attempt(url, attempt))
+        else:
+            scrape = lambda url, attempt: self._page_result(url, self._fetch_attempt(url, attempt))
+        if concurrency > self.pool_size:
+            self._mount_adapters(concurrency)
+        
+        urls = iter(urls)
+        queued: Deque[Tuple[str, int]] = deque()
+        # (url, attempt) items; pages of a host that may not be hit yet are parked there, not on a thread
+        polite = PoliteFrontier(queued, self.rate_limiter, max_parked_per_host=ScraperConfig.MAX_PARKED_PER_HOST)
+        pending: Dict[Any, str] = {}
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='scraper') as executor:
+            try:
+                while True:
+                    wait_for = None
+                    while len(pending) < concurrency:
+                        item, wait_for = polite.pop_ready()
+                        if item is not None:
+                            pending[executor.submit(scrape, *item)] = item[0]
+                            continue
+                        if polite.blocked:
+                            break
+                        
+                        # Every queued host is busy: take more URLs, other hosts may be free
+                        taken = list(itertools.islice(urls, concurrency))
+                        if not taken:
+                            break
+                        for url in taken:
+                            if self._circuit_open(url):
+                                # Not parked behind the cooldown: the attempt fails at once
+                                pending[executor.submit(scrape, url, 1)] = url
+                            else:
+                                queued.append((url, 1))
+                    
+                    if not pending:
+                        if wait_for is None:
+                            return
+                        time.sleep(wait_for)
+                        continue
+                    
+                    done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url = pending.pop(future)
+                        try:
+                            yield future.result()
+                        except RetryLater as e:
+                            # The backoff is waited out in the frontier, the thread moves on
+                            polite.defer((url, e.attempt + 1), e.delay)
+                        except Exception as e:
+                            self.logger.error(f"[ERROR] Unexpected error scraping {url}: {e}")
+                            yield {'error': str(e), 'url': url}
+            finally:
+                # Abandoned early: URLs that have not started are dropped, running ones finish
+                for future in pending:
+                    future.cancel()
+    
     def export_json(self, data: Any, filename: str):
         """Export data to JSON with pretty formatting."""
         try:
@@ -324,25 +631,49 @@ class WebScraperPro:
         except Exception as e:
             self.logger.error(f"[ERROR] Error exporting to JSON: {e}")
     
-    def export_csv(self, data: List[Dict], filename: str):
-        """Export data to CSV format."""
+    def export_csv(self, data: Iterable[Dict], filename: str, columns: Optional[List[str]] = None):
+        """
+        Export records to CSV format.
+        
+        data may be any iterable, e.g. scrape_many() or iter_link_rows(),
+        and is written in constant memory. Records may have different keys:
+        the columns are those of the first CSV_SAMPLE_SIZE records unless
+        given, and nested fields are flattened into dotted columns.
+        """
         try:
-            if not data:
+            filepath = ScraperConfig.OUTPUT_DIR / filename
+            output = write_csv(data, filepath, columns=columns,
+                               sample_size=ScraperConfig.CSV_SAMPLE_SIZE,
+                               buffer_size=ScraperConfig.CSV_BUFFER_SIZE)
+            if not output.rows_written:
                 self.logger.warning("[WARN] No data to export to CSV")
                 return
             
-            filepath = ScraperConfig.OUTPUT_DIR / filename
-            keys = data[0].keys()
-            
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=keys)
-                writer.writeheader()
-                writer.writerows(data)
-            
-            self.logger.info(f"[OK] Data exported to CSV: {filepath}")
+            self.logger.info(f"[OK] Data exported to CSV: {filepath} ({output.summary()})")
         except Exception as e:
             self.logger.error(f"[ERROR] Error exporting to CSV: {e}")
     
+    def export_parquet(self, data: Iterable[Dict], filename: str):
+        """
+        Export records to a columnar Parquet (or, for *.arrow, Arrow IPC) file.
+        
+        Nested fields such as metadata and content stay nested, and records
+        are written a row group at a time, so data may be a long iterator
+        (e.g. scrape_many()). Requires pyarrow.
+        """
+        try:
+            filepath = ScraperConfig.OUTPUT_DIR / filename
+            format = 'arrow' if filepath.suffix == COLUMNAR_FORMATS['arrow'] else 'parquet'
+            output = write_columnar(data, filepath, format=format,
+                                    compression=ScraperConfig.COLUMNAR_COMPRESSION,
+                                    row_group_size=ScraperConfig.COLUMNAR_ROW_GROUP_SIZE)
+            if not output.records_written:
+                self.logger.warning(f"[WARN] No data to export to {format}")
+                return
+            self.logger.info(f"[OK] Data exported to {format}: {filepath} ({output.summary()})")
+        except Exception as e:
+            self.logger.error(f"[ERROR] Error exporting to Parquet/Arrow: {e}")
+    
     def export_txt(self, data: Dict, filename: str):
         """Export data to readable text format."""
         try:
@@ -388,9 +719,23 @@ class WebScraperPro:
         print(f"Total Requests Made:      {self.stats['requests_made']}")
         print(f"Successful Requests:      {self.stats['successful_requests']}")
         print(f"Failed Requests:          {self.stats['failed_requests']}")
+        print(f"Rejected Responses:       {self.stats['rejected_responses']} ({self.fetch_limits.summary()})")
         print(f"Data Points Extracted:    {self.stats['data_points_extracted']}")
+        print(f"Throttled Responses:      {self.rate_limiter.stats['throttled_responses']}")
+        print(f"Retried Requests:         {self.stats['retries']}")
+        if self.circuit_breaker:
+            print(f"Circuit Breaker:          {self.circuit_breaker.summary()}, "
+                  f"{self.stats['short_circuited']} pages failed fast")
+        if self.http_cache:
+            print(f"HTTP Cache:               {self.http_cache.summary()}")
+        print(f"Page Encodings:           {self.charset_resolver.summary()}")
         success_rate = (self.stats['successful_requests']/max(self.stats['requests_made'],1)*100)
         print(f"Success Rate:             {success_rate:.1f}%")
+        if self.metrics:
+            lines = self.metrics.stage_lines() or ['no samples']
+            print(f"Stage Latency:            {lines[0]}")
+            for line in lines[1:]:
+                print(f"{'':26}{line}")
         print("=" * 80 + "\n")
 
 
@@ -432,7 +777,7 @@ def scrape_shadowfox_website():
         
         # Export links to CSV
         if data['content']['links']:
-            scraper.export_csv(data['content']['links'][:50], f'shadowfox_links_{timestamp}.csv')
+            scraper.export_csv(iter_link_rows([data]), f'shadowfox_links_{timestamp}.csv')
     else:
         print(f"\n[ERROR] {data['error']}")
     
@@ -482,7 +827,24 @@ def demo_scraper():
         scraper.export_txt(data, f'demo_report_{timestamp}.txt')
         
         if data['content']['links']:
-            scraper.export_csv(data['content']['links'][:20], f'demo_links_{timestamp}.csv')
+            scraper.export_csv(iter_link_rows([data]), f'demo_links_{timestamp}.csv')
+    
+    # Further pages concurrently, reported in the order they finish
+    print("\n[INFO] Scraping quote pages 2-5 concurrently...")
+    pages = [f"http://quotes.toscrape.com/page/{n}/" for n in range(2, 6)]
+    for page in scraper.scrape_many(pages, concurrency=4):
+        if 'error' in page:
+            print(f"  {page['url']}: {page['error']}")
+        else:
+            print(f"  {page['url']}: {len(page['content']['paragraphs'])} paragraphs")
+    
+    # Only the fields a schema describes, without writing extraction code
+    print("\n[INFO] Extracting quotes with schemas/quotes.yaml...")
+    quotes = scraper.scrape_fields("http://quotes.toscrape.com/", Path(__file__).parent / 'schemas' / 'quotes.yaml')
+    if 'error' not in quotes:
+        for quote in quotes['data']['quotes'][:3]:
+            print(f"  {quote['author']}: {quote['text'][:60]} {quote['tags']}")
+        print(f"  Next page: {quotes['data']['next_page']}")
     
     scraper.print_statistics()
 
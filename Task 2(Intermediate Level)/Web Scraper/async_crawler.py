@@ -0,0 +1,423 @@
+"""
+Async Crawl Engine for ShadowFox
+================================
+asyncio + aiohttp crawl engine for AdvancedWebScraper. Pages are fetched
+over a bounded pool of HTTP/1.1 keep-alive connections with hundreds of
+requests in flight on a single event loop, while parsing and extraction
+reuse the exact same process_page/extract_page_data code as the threaded
+engine.
+
+Requires the optional dependency: pip install aiohttp
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from advanced_scraper import AdvancedWebScraper, AdvancedScraperConfig, Colors
+from fetch_limits import ResponseRejected
+from parsers import soup_backend
+from rate_limiter import PoliteFrontier
+from retry_policy import RetryLater
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def timing_trace_config(metrics) -> 'aiohttp.TraceConfig':
+    """
+    aiohttp trace hooks that record the dns, connect and ttfb stages.
+    
+    aiohttp resolves the host inside connection creation, so the DNS time
+    is subtracted from 'connect'. TTFB runs from the request headers being
+    sent to the response headers being read, once per redirect hop.
+    """
+    trace_config = aiohttp.TraceConfig()
+    
+    async def connection_create_start(session, context, params):
+        context.dns = 0.0
+        context.connect_started = time.perf_counter()
+    
+    async def connection_create_end(session, context, params):
+        metrics.observe('connect', time.perf_counter() - context.connect_started - context.dns)
+    
+    async def dns_resolvehost_start(session, context, params):
+        context.dns_started = time.perf_counter()
+    
+    async def dns_resolvehost_end(session, context, params):
+        context.dns = time.perf_counter() - context.dns_started
+        metrics.observe('dns', context.dns)
+    
+    async def request_headers_sent(session, context, params):
+        context.headers_sent = time.perf_counter()
+    
+    async def request_end(session, context, params):
+        if hasattr(context, 'headers_sent'):
+            metrics.observe('ttfb', time.perf_counter() - context.headers_sent)
+    
+    trace_config.on_connection_create_start.append(connection_create_start)
+    trace_config.on_connection_create_end.append(connection_create_end)
+    trace_config.on_dns_resolvehost_start.append(dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(dns_resolvehost_end)
+    trace_config.on_request_headers_sent.append(request_headers_sent)
+    trace_config.on_request_end.append(request_end)
+    return trace_config
+
+
+class AsyncCrawlScheduler:
+    """
+    Event-loop counterpart of CrawlScheduler.
+    
+    A fixed number of worker tasks pull from the scraper's shared frontier,
+    skipping over hosts that are currently rate limited (or failing) and
+    deferring failed fetches until their retry backoff is over; the crawl ends
+    once the frontier is empty and no page is in flight.
+    """
+    
+    def __init__(self, scraper: 'AsyncWebScraper', session: 'aiohttp.ClientSession',
+                 concurrency: int):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            scraper: Scraper whose frontier and crawl_url_async are used
+            session: Shared aiohttp session (owns the connection pool)
+            concurrency: Maximum number of pages in flight
+        """
+        self.scraper = scraper
+        self.session = session
+        self.concurrency = max(1, concurrency)
+        
+        self._condition = asyncio.Condition()
+        self._in_flight = 0
+        self._polite = PoliteFrontier(scraper.to_visit, scraper.rate_limiter,
+                                      max_parked_per_host=AdvancedScraperConfig.MAX_PARKED_PER_HOST)
+        scraper.watch_scheduler(self, scraper.parse_stage)
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of pages currently being crawled."""
+        return self._in_flight
+    
+    @property
+    def queued(self) -> int:
+        """Number of URLs waiting in the frontier (including rate-limited ones)."""
+        return len(self._polite)
+    
+    async def _next_url(self):
+        """Wait until a URL is available; return None when the crawl is over."""
+        async with self._condition:
+            while True:
+                # Without budget only retries go out: their pages are already counted.
+                # Pages in flight may still be skipped (robots.txt, depth) and free budget.
+                item, wait = self._polite.pop_ready(fresh=self.scraper.budget_left(self._in_flight))
+                if item is not None:
+                    self._in_flight += 1
+                    return item
+                
+                if wait is None and self._in_flight == 0:
+                    self._condition.notify_all()
+                    return None
+                
+                try:
+                    await asyncio.wait_for(self._condition.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _finish_url(self, url: str, depth: int, new_links: List[str], retry_delay: Optional[float] = None):
+        """Queue discovered links (or the URL itself for a retry) and release the in-flight slot."""
+        async with self._condition:
+            if retry_delay is not None:
+                self._polite.defer((url, depth), retry_delay)
+            else:
+                if depth < self.scraper.max_depth:
+                    for link in new_links:
+                        self.scraper.enqueue(link, depth + 1)
+                self.scraper.finish_url(url)
+            
+            self._in_flight -= 1
+            self._condition.notify_all()
+    
+    async def _worker(self):
+        """Worker task: crawl URLs until the frontier is drained."""
+        while True:
+            item = await self._next_url()
+            if item is None:
+                return
+            
+            url, depth = item
+            new_links = []
+            retry_delay = None
+            try:
+                new_links = await self.scraper.crawl_url_async(self.session, url, depth)
+            except RetryLater as e:
+                retry_delay = e.delay
+            except Exception as e:
+                self.scraper.logger.error(f"Error processing {url}: {e}")
+            finally:
+                await self._finish_url(url, depth, new_links, retry_delay)
+            
+            await self.scraper.checkpoint_async()
+    
+    async def _report_progress(self, interval: float):
+        """Print a progress line every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.scraper.print_progress(self)
+    
+    async def run(self):
+        """Run the crawl to completion."""
+        interval = AdvancedScraperConfig.PROGRESS_INTERVAL
+        reporter = asyncio.create_task(self._report_progress(interval)) if interval > 0 else None
+        
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+        finally:
+            if reporter:
+                reporter.cancel()
+
+
+class AsyncWebScraper(AdvancedWebScraper):
+    """
+    AdvancedWebScraper running on an asyncio event loop.
+    
+    Features:
+    - Hundreds of concurrent requests on one thread
+    - Bounded HTTP/1.1 keep-alive connection pool
+    - Per-host token-bucket politeness that never blocks the loop
+    - Same crawl_url/extract_page_data contract and output as the threaded engine
+    """
+    
+    def __init__(self, target_url: str, max_depth: int = 2,
+                 max_concurrency: int = AdvancedScraperConfig.ASYNC_CONCURRENCY,
+                 max_connections: int = AdvancedScraperConfig.ASYNC_MAX_CONNECTIONS,
+                 frontier_backend: Optional[str] = None, resume: bool = False,
+                 parse_processes: Optional[int] = None, max_pages: Optional[int] = None,
+                 frontier_order: Optional[str] = None, incremental: Optional[bool] = None):
+        """
+        Initialize the async scraper.
+        
+        Args:
+            target_url: Target website URL
+            max_depth: Maximum crawling depth
+            max_concurrency: Maximum number of pages in flight
+            max_connections: Size of the keep-alive connection pool
+            frontier_backend: Seen-set/queue backend ('memory', 'bloom' or 'sqlite')
+            resume: Continue from the last checkpoint of this target, if any
+            parse_processes: Worker processes for parsing (0 parses on the event loop)
+            max_pages: Page budget; the crawl stops after this many fetches (0 for no limit)
+            frontier_order: 'priority' (best-first) or 'fifo' (breadth-first)
+            incremental: Skip extraction and export of pages unchanged since the last run
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncWebScraper requires aiohttp: pip install aiohttp")
+        
+        super().__init__(target_url, max_depth=max_depth, max_threads=1,
+                         frontier_backend=frontier_backend, resume=resume,
+                         parse_processes=parse_processes, max_pages=max_pages,
+                         frontier_order=frontier_order, incremental=incremental)
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.parse_stage = None
+    
+    async def fetch_page_async(self, session: 'aiohttp.ClientSession', url: str) -> Optional[BeautifulSoup]:
+        """Fetch a webpage and parse it into a BeautifulSoup tree (lxml or html.parser)."""
+        html = await self.fetch_html_async(session, url)
+        if html is None:
+            return None
+        return self.parse_page(html, url, soup_backend(self.parser_backend))
+    
+    async def fetch_html_async(self, session: 'aiohttp.ClientSession', url: str) -> Optional[str]:
+        """Download a webpage without blocking the event loop (raises RetryLater like fetch_html)."""
+        try:
+            body, headers = await self.download_async(session, url)
+            self.stats.increment('bytes_downloaded', len(body))
+            self.host_answered(url)
+            return self.charset_resolver.decode(body, headers.get('Content-Type'))
+        
+        except ResponseRejected as e:
+            self.host_answered(url)
+            self.stats.increment('urls_rejected')
+            self.logger.info(f"Skipped {url}: {e.detail}")
+            return None
+        except aiohttp.ClientResponseError as e:
+            self.fetch_failed(url, e, e.status, e.headers.get('Retry-After') if e.headers else None)
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.fetch_failed(url, e)
+            return None
+        except Exception as e:
+            self.stats.increment('errors')
+            self.logger.error(f"Unexpected error: {e}")
+            return None
+    
+    async def download_async(self, session: 'aiohttp.ClientSession', url: str) -> Tuple[bytes, Mapping[str, str]]:
+        """
+        Body and headers of url, through the HTTP cache when it is enabled.
+        
+        aiohttp does not go through CachingHTTPAdapter, so the same cache is
+        consulted here: entries within the TTL are served without a request,
+        others are revalidated with their ETag / Last-Modified and a 304 is
+        answered from disk. The cache's SQLite reads and writes run in the
+        default executor, off the event loop.
+        
+        Raises:
+            ResponseRejected, aiohttp.ClientError: As for an uncached download
+        """
+        loop = asyncio.get_running_loop()
+        cache = self.http_cache
+        entry = await loop.run_in_executor(None, cache.get, url) if cache else None
+        if entry is not None and cache.is_fresh(entry):
+            cache.record('hits')
+            cache.record('bytes_saved', len(entry.body))
+            self.fetch_limits.check_cached(url, entry.headers, entry.body)
+            return entry.body, entry.headers
+        
+        await self.fetch_limits.head_async(session, url, allow_redirects=True)
+        # Like response.elapsed in the threaded engine: the GET alone, not the HEAD before it
+        started = loop.time()
+        conditional = entry.conditional_headers() if entry is not None else None
+        async with session.get(url, allow_redirects=True, headers=conditional) as response:
+            self.rate_limiter.record_response(
+                url,
+                response.status,
+                loop.time() - started,
+                response.headers.get('Retry-After')
+            )
+            if response.status == 304 and entry is not None:
+                # Unchanged since it was stored: the body comes from disk
+                await loop.run_in_executor(None, cache.refresh, entry, response)
+                cache.record('revalidated')
+                cache.record('bytes_saved', len(entry.body))
+                self.fetch_limits.check_cached(url, entry.headers, entry.body)
+                return entry.body, entry.headers
+            
+            if cache:
+                cache.record('misses')
+            response.raise_for_status()
+            download_started = time.perf_counter()
+            body = await self.fetch_limits.read_body_async(response)
+            if self.metrics:
+                self.metrics.observe('download', time.perf_counter() - download_started)
+            if cache and cache.storable(response.status, response.headers):
+                # Only bodies that passed the fetch limits are stored
+                await loop.run_in_executor(None, cache.store_body, url, response.status, response.headers, body)
+            return body, response.headers
+    
+    async def crawl_url_async(self, session: 'aiohttp.ClientSession', url: str, depth: int) -> List[str]:
+        """Crawl a single URL and return discovered links."""
+        if depth > self.max_depth:
+            return []
+        if self.robots:
+            if self.robots.peek(url) is None:
+                # First URL of this host: fetch robots.txt off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self.robots.rules_for, url)
+            if not self.robots.allowed(url):
+                self.logger.info(f"Disallowed by robots.txt: {url}")
+                return []
+        
+        if url not in self.retry_attempts:
+            # A retry is counted in 'retries'; the page itself counts once
+            self.stats.increment('urls_crawled')
+        
+        self.print_status(url, 'crawling')
+        
+        html = await self.fetch_html_async(session, url)
+        if html is None:
+            return []
+        
+        links = self.unchanged_links(url, html)
+        if links is not None:
+            return links
+        
+        if self.parse_stage:
+            # Parse in a worker process so the event loop keeps serving other requests
+            try:
+                fields = await self.parse_stage.extract_async(html, url)
+            except Exception as e:
+                self.stats.increment('errors')
+                self.logger.error(f"Error parsing {url}: {e}")
+                return []
+            return await self.store_page_async(self.page_record(url, fields))
+        
+        soup = self.parse_page(html, url)
+        if not soup:
+            return []
+        
+        return await self.store_page_async(self.extract_page_data(soup, url))
+    
+    async def store_page_async(self, page_data: Dict[str, Any]) -> List[str]:
+        """
+        store_page() without blocking the event loop.
+        
+        While the result writer's buffer is full the record would wait on
+        the loop for the writer thread, stalling every request in flight, so
+        the hand-off then runs in the default executor.
+        """
+        if getattr(self.found_data, 'full', False):
+            return await asyncio.get_running_loop().run_in_executor(None, self.store_page, page_data)
+        return self.store_page(page_data)
+    
+    async def checkpoint_async(self):
+        """maybe_checkpoint() with the journal's SQLite writes in the default executor."""
+        if self.checkpoint and self.checkpoint.due():
+            await asyncio.get_running_loop().run_in_executor(None, self.maybe_checkpoint)
+    
+    async def _crawl(self):
+        """Open the pooled session and run the async scheduler."""
+        connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=AdvancedScraperConfig.DEFAULT_TIMEOUT)
+        
+        trace_configs = [timing_trace_config(self.metrics)] if self.metrics else None
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=trace_configs,
+                                         headers=AdvancedScraperConfig.DEFAULT_HEADERS) as session:
+            await AsyncCrawlScheduler(self, session, self.max_concurrency).run()
+    
+    def print_engine_info(self):
+        """Print the concurrency settings of the async engine."""
+        print(f"{Colors.BLUE}[!] Max Concurrency: {self.max_concurrency}{Colors.RESET}")
+        print(f"{Colors.BLUE}[!] Connection Pool: {self.max_connections}{Colors.RESET}")
+        print(f"{Colors.BLUE}[!] HTML Parser: {self.parser_backend}{Colors.RESET}")
+        if self.schema:
+            print(f"{Colors.BLUE}[!] Extraction: {self.schema.summary()}{Colors.RESET}")
+        if self.parse_processes > 0:
+            print(f"{Colors.BLUE}[!] Parse Processes: {self.parse_processes}{Colors.RESET}")
+        if self.metrics_server:
+            print(f"{Colors.BLUE}[!] Metrics: {self.metrics_server.url}{Colors.RESET}")
+        print(f"{Colors.GREEN}[✓] Preparing Crawler (asyncio event loop){Colors.RESET}\n")
+    
+    def run_crawl(self):
+        """Drive the crawl on a fresh event loop."""
+        self.seed_frontier()
+        self.parse_stage = self.create_parse_stage()
+        try:
+            asyncio.run(self._crawl())
+        finally:
+            if self.parse_stage:
+                self.parse_stage.shutdown()
+                self.parse_stage = None
+
+
+def main():
+    """Main function to run the async scraper."""
+    target = "http://quotes.toscrape.com/"
+    
+    scraper = AsyncWebScraper(
+        target_url=target,
+        max_depth=2,
+        max_concurrency=50
+    )
+    
+    scraper.start_crawling()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1308 @@
+"""
+Crawl Benchmarks for ShadowFox
+==============================
+Offline benchmarks for the ShadowFox scrapers. Every benchmark runs
+against LocalTestSite on 127.0.0.1, so results are reproducible and no
+real website is contacted.
+
+Usage:
+    python benchmark.py engines --pages 1000 --latency 0.05
+    python benchmark.py stress --workers 64
+    python benchmark.py frontier --urls 1000000
+    python benchmark.py results --records 50000
+    python benchmark.py columnar --records 20000
+    python benchmark.py csv --links 300000
+    python benchmark.py cache --pages 1000
+    python benchmark.py extract --fixtures saved_pages/
+    python benchmark.py parsers --fixtures saved_pages/
+    python benchmark.py schema --fixtures saved_pages/
+    python benchmark.py pipeline --processes 0 1 2 4 8
+    python benchmark.py encoding --pages 200
+    python benchmark.py limits --trap-mib 20
+    python benchmark.py sitemap --pages 2000
+    python benchmark.py priority --budget 200
+    python benchmark.py incremental --pages 2000 --changed 0.05
+    python benchmark.py duplicates --pages 1000 --mirrors 3
+    python benchmark.py canonical --links 10000
+    python benchmark.py distributed --domains 8 --workers 1 2 4
+    python benchmark.py metrics --pages 1000
+    python benchmark.py batch --pages 200 --concurrency 1 4 16
+    python benchmark.py retry --pages 300 --outage 3
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import argparse
+import codecs
+import contextlib
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urljoin, urlparse, urlunparse
+
+from bs4 import BeautifulSoup
+from requests.models import Response
+
+from advanced_scraper import AdvancedWebScraper, AdvancedScraperConfig
+from app import WebScraperPro, ScraperConfig
+from canonical import URLCanonicalizer
+from charset import CharsetResolver
+from columnar_writer import ColumnarWriter, columnar_path, page_record_schema, pa
+from crawl_state import ResultSink
+from csv_export import iter_link_rows, write_csv
+from distributed import DistributedCrawler
+from extraction import PageExtractor, content_fields, metadata_fields, page_data_fields
+from extraction_schema import LINKS_FIELD, ExtractionSchema
+from frontier import FRONTIER_BACKENDS, create_frontier
+from local_test_server import LocalTestSite
+from metrics import LatencyHistogram
+from parsers import available_backends, parse_html
+from priority import create_priority_frontier
+from result_writer import NDJSONWriter, StreamingResultSink, iter_ndjson, ndjson_path, write_json_envelope, zstandard
+
+
+@contextlib.contextmanager
+def benchmark_environment(crawl_features: bool = False):
+    """
+    Write scraper output to a scratch directory and disable politeness delays (both scrapers).
+    
+    Checkpoints, robots.txt and sitemap seeding are turned off too, unless
+    crawl_features is set (for checks that must hold with the defaults).
+    """
+    overrides = {
+        'DEFAULT_DELAY': 0,
+        'ADAPTIVE_DELAY': False,
+        'PROGRESS_INTERVAL': 0
+    }
+    if not crawl_features:
+        overrides.update({'CHECKPOINT_INTERVAL': 0, 'ROBOTS_TXT': False, 'SITEMAP_SEED': False})
+    restored = ['OUTPUT_DIR', 'CHECKPOINT_INTERVAL', 'ROBOTS_TXT', 'SITEMAP_SEED', 'PARSER_BACKEND', 'MAX_BODY_BYTES',
+                'ALLOWED_CONTENT_TYPES', 'HEAD_BEFORE_GET', 'INCREMENTAL', 'NEAR_DUPLICATES', 'METRICS', 'MAX_RETRIES', 'RETRY_BASE_DELAY', 'CIRCUIT_BREAKER',
+                'BREAKER_COOLDOWN', 'BREAKER_MAX_COOLDOWN']
+    saved = {name: getattr(AdvancedScraperConfig, name) for name in list(overrides) + restored}
+    simple_overrides = {'DEFAULT_DELAY': 0, 'ADAPTIVE_DELAY': False}
+    simple_restored = ['OUTPUT_DIR', 'HTTP_CACHE', 'METRICS']
+    simple_saved = {name: getattr(ScraperConfig, name) for name in list(simple_overrides) + simple_restored}
+    
+    with tempfile.TemporaryDirectory(prefix='shadowfox_bench_') as tmp:
+        overrides['OUTPUT_DIR'] = simple_overrides['OUTPUT_DIR'] = Path(tmp)
+        for name, value in overrides.items():
+            setattr(AdvancedScraperConfig, name, value)
+        for name, value in simple_overrides.items():
+            setattr(ScraperConfig, name, value)
+        try:
+            yield Path(tmp)
+        finally:
+            for name, value in saved.items():
+                setattr(AdvancedScraperConfig, name, value)
+            for name, value in simple_saved.items():
+                setattr(ScraperConfig, name, value)
+
+
+def timed_crawl(scraper: AdvancedWebScraper, export: bool = False) -> float:
+    """Run a crawl (and optionally its export) without console output and return its pages/second."""
+    scraper.stats['start_time'] = datetime.now()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.run_crawl()
+        if export:
+            scraper.export_results()
+    scraper.stats['end_time'] = datetime.now()
+    scraper.close()
+    return scraper.pages_per_second()
+
+
+def print_result(name: str, scraper: AdvancedWebScraper, rate: float):
+    """Print one benchmark result line."""
+    print(f"{name:<28} {scraper.stats['urls_crawled']:>7} pages "
+          f"{scraper.crawl_duration():>8.2f} s {rate:>10.1f} pages/second")
+
+
+def benchmark_engines(num_pages: int, latency: float, threads: int, concurrency: int):
+    """Compare the threaded and asyncio crawl engines on the same local site."""
+    from async_crawler import AsyncWebScraper
+    
+    print(f"\nCrawl engines: {num_pages} pages, {latency * 1000:.0f} ms server latency")
+    print("-" * 72)
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, latency=latency) as site:
+        depth = num_pages
+        
+        threaded = AdvancedWebScraper(site.start_url, max_depth=depth, max_threads=threads)
+        print_result(f"threaded ({threads} threads)", threaded, timed_crawl(threaded))
+        
+        asynchronous = AsyncWebScraper(site.start_url, max_depth=depth, max_concurrency=concurrency)
+        print_result(f"asyncio ({concurrency} in flight)", asynchronous, timed_crawl(asynchronous))
+
+
+def stress_exactly_once(num_pages: int, workers: int, latency: float) -> bool:
+    """
+    Crawl a densely linked local site with many workers and verify that
+    every URL was fetched exactly once and every counter adds up. Runs with
+    the default checkpointing, robots.txt and sitemap seeding.
+    
+    Returns:
+        True if all checks passed
+    """
+    print(f"\nExactly-once stress: {num_pages} pages, {workers} workers")
+    print("-" * 72)
+    
+    robots_txt = "User-agent: *\nDisallow: /private/\nSitemap: {base_url}/sitemap.xml\n"
+    with benchmark_environment(crawl_features=True), LocalTestSite(num_pages=num_pages, links_per_page=25,
+                                                                   latency=latency, robots_txt=robots_txt,
+                                                                   sitemap=True) as site:
+        scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=workers)
+        rate = timed_crawl(scraper)
+        print_result(f"threaded ({workers} threads)", scraper, rate)
+        
+        # robots.txt and the sitemap files are not pages
+        hits = {path: count for path, count in site.hits.items() if path.startswith('/page/')}
+        duplicates = {path: count for path, count in hits.items() if count > 1}
+        checks = {
+            'every page fetched': len(hits) == num_pages,
+            'no page fetched twice': not duplicates,
+            'urls_crawled matches server hits': scraper.stats['urls_crawled'] == sum(hits.values()),
+            'visited set matches server hits': len(scraper.visited_urls) == len(hits),
+            'one record per page': len(scraper.found_data) == scraper.stats['data_extracted'] == num_pages
+        }
+    
+    for name, passed in checks.items():
+        print(f"  [{'PASS' if passed else 'FAIL'}] {name}")
+    if duplicates:
+        print(f"  duplicate fetches: {dict(list(duplicates.items())[:10])}")
+    
+    return all(checks.values())
+
+
+def benchmark_frontier(num_urls: int, error_rate: float):
+    """Measure enqueue throughput and bytes per URL of every frontier backend."""
+    print(f"\nFrontier backends: {num_urls:,} unique URLs (+50% duplicates)")
+    print("-" * 72)
+    
+    with tempfile.TemporaryDirectory(prefix='shadowfox_bench_') as tmp:
+        for backend, order in [(backend, order) for order in ('fifo', 'priority') for backend in FRONTIER_BACKENDS]:
+            directory = Path(tmp) / f"{backend}_{order}"
+            directory.mkdir()
+            if order == 'fifo':
+                frontier = create_frontier(backend, bloom_capacity=num_urls, bloom_error_rate=error_rate,
+                                           memory_limit=10_000, directory=str(directory))
+            else:
+                frontier = create_priority_frontier(backend, bloom_capacity=num_urls, bloom_error_rate=error_rate,
+                                                    memory_limit=10_000, directory=str(directory))
+            
+            started = time.perf_counter()
+            queued = 0
+            for i in range(num_urls + num_urls // 2):
+                # The last third of the pushes repeat URLs that were already queued
+                n = i if i < num_urls else i - num_urls
+                queued += frontier.push(f"https://example.com/section/{n % 97}/page-{n}.html", 1)
+            elapsed = time.perf_counter() - started
+            
+            print(f"{backend + '/' + order:<16} {queued:>10,} queued {elapsed:>8.2f} s "
+                  f"{(num_urls + num_urls // 2) / elapsed:>10,.0f} push/s "
+                  f"{frontier.bytes_per_url():>8.1f} bytes/URL")
+            frontier.close()
+
+
+def benchmark_cache(num_pages: int, latency: float, threads: int):
+    """Crawl a site twice to measure what the conditional HTTP cache saves on a re-crawl."""
+    print(f"\nHTTP cache re-crawl: {num_pages} pages, {latency * 1000:.0f} ms server latency")
+    print("-" * 72)
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, latency=latency,
+                                                validators=True) as site:
+        for run in ('cold', 'warm'):
+            sent_before = site.bytes_sent
+            scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads)
+            rate = timed_crawl(scraper)
+            print_result(f"{run} cache", scraper, rate)
+            print(f"  {site.bytes_sent - sent_before:,} body bytes downloaded; "
+                  f"cache: {scraper.http_cache.summary()}")
+
+
+def benchmark_limits(num_pages: int, traps: int, trap_bytes: int, threads: int):
+    """Crawl a site linking to oversized downloads with and without fetch limits."""
+    print(f"\nFetch limits: {num_pages} pages plus {traps} binary downloads and {traps} endless HTML "
+          f"streams of {trap_bytes / 1024 / 1024:.0f} MiB")
+    print("-" * 72)
+    
+    runs = [
+        ('no limits', 0, (), False),
+        ('streamed limits', 1024 * 1024, AdvancedScraperConfig.ALLOWED_CONTENT_TYPES, False),
+        ('limits + HEAD', 1024 * 1024, AdvancedScraperConfig.ALLOWED_CONTENT_TYPES, True)
+    ]
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, trap_pages=traps,
+                                                trap_bytes=trap_bytes) as site:
+        for name, max_bytes, allowed_types, head_first in runs:
+            AdvancedScraperConfig.MAX_BODY_BYTES = max_bytes
+            AdvancedScraperConfig.ALLOWED_CONTENT_TYPES = allowed_types
+            AdvancedScraperConfig.HEAD_BEFORE_GET = head_first
+            
+            sent_before = site.bytes_sent
+            scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads)
+            tracemalloc.start()
+            rate = timed_crawl(scraper)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            
+            print_result(name, scraper, rate)
+            print(f"  {(site.bytes_sent - sent_before) / 1024 / 1024:,.1f} MiB sent by the server, "
+                  f"{peak / 1024 / 1024:,.1f} MiB peak, {scraper.stats['urls_rejected']} rejected "
+                  f"({scraper.fetch_limits.summary()})")
+
+
+def benchmark_sitemap(num_pages: int, depth: int, latency: float, threads: int, changed: float):
+    """Depth-limited crawl from links only vs sitemap seeding, then an incremental re-crawl."""
+    print(f"\nSitemap seeding: {num_pages} pages, 2 links per page, max depth {depth}, "
+          f"{latency * 1000:.0f} ms latency, robots.txt disallows pages ending in 7")
+    print("-" * 72)
+    
+    robots_txt = 'User-agent: *\nDisallow: /page/*7$\nSitemap: {base_url}/sitemap.xml\n'
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, links_per_page=2, latency=latency,
+                                                robots_txt=robots_txt, sitemap=True) as site:
+        AdvancedScraperConfig.ROBOTS_TXT = True
+        runs = [('links only', False), ('sitemap seeded', True), ('incremental', True)]
+        for name, seed in runs:
+            if name == 'incremental':
+                for n in range(0, num_pages, max(1, round(1 / changed))):
+                    site.lastmods[n] = '2026-10-15'
+            AdvancedScraperConfig.SITEMAP_SEED = seed
+            
+            site.hits.clear()
+            scraper = AdvancedWebScraper(site.start_url, max_depth=depth, max_threads=threads)
+            rate = timed_crawl(scraper)
+            print_result(name, scraper, rate)
+            print(f"  {sum(site.hits.values())} requests, robots.txt: {scraper.robots.summary()}; "
+                  f"sitemap: {scraper.sitemap_stats['seeded']} queued, "
+                  f"{scraper.sitemap_stats['unchanged']} unchanged skipped")
+
+
+def benchmark_priority(num_pages: int, budget: int, key_every: int, threads: int):
+    """Spend the same page budget breadth-first and best-first and count the key pages reached."""
+    key_pages = (num_pages - 1) // key_every
+    print(f"\nPriority frontier: {num_pages} pages, budget {budget}, "
+          f"{key_pages} key pages under /product/")
+    print("-" * 72)
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, key_every=key_every) as site:
+        for order in ('fifo', 'priority'):
+            site.hits.clear()
+            scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads,
+                                         max_pages=budget, frontier_order=order)
+            rate = timed_crawl(scraper)
+            print_result(order, scraper, rate)
+            reached = sum(1 for path in site.hits if path.startswith('/product/'))
+            print(f"  {reached} of {key_pages} key pages fetched "
+                  f"({reached / max(1, sum(site.hits.values())):.0%} of all requests)")
+
+
+def benchmark_incremental(num_pages: int, paragraphs: int, changed: float, removed: int, threads: int):
+    """A full crawl, then incremental re-crawls of the same site with fewer and fewer pages left alone."""
+    step = max(1, round(1 / changed))
+    print(f"\nIncremental re-crawl: {num_pages} pages, {len(range(1, num_pages, step))} edited "
+          f"and {removed} removed in the last run")
+    print("-" * 72)
+    
+    def edit_pages():
+        for n in range(1, num_pages, step):
+            site.revisions[n] = 'Revised: prices, stock levels and delivery dates were updated today.'
+        site.removed.update(range(num_pages - removed, num_pages))
+    
+    runs = [
+        ('first crawl', None),
+        ('unchanged', None),
+        ('timestamps only', lambda: setattr(site, 'volatile', True)),
+        ('edited', edit_pages)
+    ]
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, paragraph_count=paragraphs) as site:
+        AdvancedScraperConfig.INCREMENTAL = True
+        for name, edit in runs:
+            if edit:
+                edit()
+            scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads)
+            rate = timed_crawl(scraper, export=True)
+            print_result(name, scraper, rate)
+            print(f"  {scraper.change_tracker.summary()}")
+
+
+def benchmark_duplicates(num_pages: int, mirrors: int, threads: int):
+    """Crawl a site mirrored under several prefixes with and without near-duplicate detection."""
+    prefixes = [f'/print{k}' for k in range(mirrors)]
+    print(f"\nNear-duplicates: {num_pages} pages, mirrored under {mirrors} printer-friendly prefixes")
+    print("-" * 72)
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, mirrors=prefixes) as site:
+        baseline = None
+        for name, detect in (('no detection', False), ('near-duplicate detection', True)):
+            AdvancedScraperConfig.NEAR_DUPLICATES = detect
+            site.hits.clear()
+            site.bytes_sent = 0
+            scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads)
+            rate = timed_crawl(scraper)
+            print_result(name, scraper, rate)
+            requests_sent = sum(site.hits.values())
+            print(f"  {requests_sent} requests, {site.bytes_sent:,} bytes, "
+                  f"{scraper.stats['urls_found']} URLs queued")
+            if baseline is None:
+                baseline = (requests_sent, site.bytes_sent)
+                continue
+            print(f"  {scraper.near_duplicates.summary(scraper.visited_urls, site.bytes_sent / requests_sent)}")
+            print(f"  avoided: {baseline[0] - requests_sent} requests, {baseline[1] - site.bytes_sent:,} bytes")
+
+
+def benchmark_retry(num_pages: int, flaky_share: float, outage: float, threads: int):
+    """Pages lost to transient errors and an outage, with and without retries and the circuit breaker."""
+    print(f"\nRetries: {num_pages} pages, {flaky_share:.0%} failing twice, then a {outage:.0f} s outage")
+    print("-" * 72)
+    
+    with benchmark_environment():
+        # Short backoffs and cooldowns so the benchmark runs in seconds
+        AdvancedScraperConfig.RETRY_BASE_DELAY = 0.1
+        AdvancedScraperConfig.BREAKER_COOLDOWN = 0.5
+        AdvancedScraperConfig.BREAKER_MAX_COOLDOWN = outage / 2
+        logging.disable(logging.ERROR)
+        try:
+            flaky = {n: 2 for n in range(1, num_pages) if n % round(1 / flaky_share) == 0} if flaky_share else {}
+            for name, attempts in (('no retries', 1), ('3 attempts with backoff', 3)):
+                AdvancedScraperConfig.MAX_RETRIES = attempts
+                with LocalTestSite(num_pages=num_pages) as site:
+                    site.failures = dict(flaky)
+                    scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads)
+                    rate = timed_crawl(scraper)
+                    print_result(name, scraper, rate)
+                    print(f"  {len(scraper.found_data)} of {num_pages} pages extracted, "
+                          f"{scraper.stats['retries']} retries, {scraper.stats['errors']} errors")
+            
+            for name, breaker in (('outage, no breaker', False), ('outage, circuit breaker', True)):
+                AdvancedScraperConfig.CIRCUIT_BREAKER = breaker
+                with LocalTestSite(num_pages=num_pages, latency=0.01) as site:
+                    sent = {}
+                    
+                    def take_down():
+                        time.sleep(0.5)
+                        sent['before'] = sum(site.hits.values())
+                        site.down = True
+                        time.sleep(outage)
+                        site.down = False
+                        sent['during'] = sum(site.hits.values()) - sent['before']
+                    
+                    outage_thread = threading.Thread(target=take_down, daemon=True)
+                    outage_thread.start()
+                    scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads)
+                    rate = timed_crawl(scraper)
+                    outage_thread.join()
+                    print_result(name, scraper, rate)
+                    print(f"  {len(scraper.found_data)} of {num_pages} pages extracted, "
+                          f"{sent['during']} requests sent while down, {scraper.stats['errors']} errors")
+                    if scraper.circuit_breaker:
+                        print(f"  {scraper.circuit_breaker.summary()}")
+        finally:
+            logging.disable(logging.NOTSET)
+
+
+def benchmark_distributed(num_domains: int, num_pages: int, paragraphs: int, latency: float,
+                          threads: int, worker_counts: List[int]):
+    """Crawl several local sites with DistributedCrawler at each worker process count."""
+    print(f"\nDistributed crawl: {num_domains} hosts x {num_pages} pages, {paragraphs} paragraphs per page, "
+          f"{latency * 1000:.0f} ms latency, {os.cpu_count()} CPU cores")
+    print("-" * 72)
+    
+    with benchmark_environment(), contextlib.ExitStack() as stack:
+        sites = [stack.enter_context(LocalTestSite(num_pages=num_pages, paragraph_count=paragraphs,
+                                                   latency=latency))
+                 for _ in range(num_domains)]
+        for workers in worker_counts:
+            crawler = DistributedCrawler([site.start_url for site in sites], workers=workers,
+                                         max_depth=num_pages, max_threads=threads)
+            with contextlib.redirect_stdout(io.StringIO()):
+                crawler.run_crawl()
+            totals = crawler.totals()
+            print(f"{workers:>2} worker(s)  {crawler.pages_per_second():>8.1f} pages/sec  "
+                  f"{totals['urls_crawled']} pages, {crawler.records_written} records merged, "
+                  f"{totals['errors']} errors, hosts per worker {crawler.shard_hosts}")
+
+
+def benchmark_metrics(num_pages: int, threads: int, rounds: int):
+    """Cost of the stage histograms: per sample, and per crawl with metrics off and on."""
+    print(f"\nCrawl metrics: {num_pages} pages, {threads} threads, best of {rounds} crawls each")
+    print("-" * 72)
+    
+    histogram = LatencyHistogram()
+    samples = 200_000
+    started = time.perf_counter()
+    for n in range(samples):
+        histogram.record(n * 1e-7)
+    print(f"{'record()':<28} {(time.perf_counter() - started) / samples * 1e9:>7.0f} ns per sample")
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages) as site:
+        best = {}
+        for _ in range(rounds):
+            for enabled in (False, True):
+                AdvancedScraperConfig.METRICS = enabled
+                scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads)
+                rate = timed_crawl(scraper)
+                if rate > best.get(enabled, (0.0, None))[0]:
+                    best[enabled] = (rate, scraper)
+        
+        for enabled in (False, True):
+            rate, scraper = best[enabled]
+            print_result('metrics on' if enabled else 'metrics off', scraper, rate)
+        print(f"  overhead: {(1 - best[True][0] / best[False][0]) * 100:.1f}% of crawl throughput")
+        for line in best[True][1].metrics.stage_lines():
+            print(f"  {line}")
+
+
+def benchmark_batch(num_pages: int, latency: float, concurrency_levels: List[int]):
+    """WebScraperPro over a URL list: scrape_website in a loop versus scrape_many at several concurrencies."""
+    print(f"\nBatch scraping: {num_pages} pages, {latency * 1000:.0f} ms server latency")
+    print("-" * 72)
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, latency=latency) as site:
+        # Every pass must hit the server, not the previous pass's cached copies
+        ScraperConfig.HTTP_CACHE = False
+        urls = [site.base_url + site.page_path(n) for n in range(num_pages)]
+        
+        runs = [('sequential', None)] + [(f"scrape_many x{level}", level) for level in concurrency_levels]
+        baseline = None
+        for label, concurrency in runs:
+            scraper = WebScraperPro(site.start_url, log_level='ERROR')
+            started = time.perf_counter()
+            if concurrency is None:
+                pages = (scraper.scrape_website(url) for url in urls)
+            else:
+                pages = scraper.scrape_many(urls, concurrency=concurrency)
+            first = None
+            results = []
+            for result in pages:
+                results.append(result)
+                first = first or time.perf_counter() - started
+            elapsed = time.perf_counter() - started
+            
+            rate = len(results) / elapsed
+            baseline = baseline or rate
+            failed = sum('error' in result for result in results)
+            print(f"{label:<22} {rate:>8.1f} pages/s  {rate / baseline:>5.1f}x  "
+                  f"first result {first * 1000:>6.1f} ms  {failed} failed")
+            scraper.session.close()
+            for handler in list(scraper.logger.handlers):
+                scraper.logger.removeHandler(handler)
+                handler.close()
+
+
+def benchmark_pipeline(num_pages: int, paragraphs: int, threads: int, process_counts: List[int],
+                       parser_backend: str):
+    """Sweep parse-stage process counts on a CPU-heavy local site with a fixed number of fetchers."""
+    print(f"\nParse pipeline: {num_pages} pages with {paragraphs} paragraphs, "
+          f"{threads} fetch threads, parser {parser_backend}, {os.cpu_count()} CPUs")
+    print("-" * 72)
+    
+    with benchmark_environment(), LocalTestSite(num_pages=num_pages, paragraph_count=paragraphs) as site:
+        AdvancedScraperConfig.PARSER_BACKEND = parser_backend
+        for processes in process_counts:
+            site.hits.clear()
+            scraper = AdvancedWebScraper(site.start_url, max_depth=num_pages, max_threads=threads,
+                                         parse_processes=processes)
+            rate = timed_crawl(scraper)
+            label = f"{processes} parse processes" if processes else "parse on fetch threads"
+            print_result(label, scraper, rate)
+
+
+def encoding_cases(num_pages: int) -> List[tuple]:
+    """(label, body, Content-Type, expected text) pages covering every resolution step."""
+    cases = []
+    for n in range(num_pages):
+        html = fixture_html(n, sections=40).replace('<meta charset="utf-8">', '')
+        html = html.replace('</main>', '<p>Café, naïve façade – “quoted” déjà vu, long enough to keep.</p></main>')
+        declared = html.replace('<head>', '<head><meta charset="windows-1252">')
+        cases += [
+            ('header', html.encode('utf-8'), 'text/html; charset=utf-8', html),
+            ('bom', codecs.BOM_UTF8 + html.encode('utf-8'), 'text/html', html),
+            ('meta', declared.encode('cp1252'), 'text/html', declared),
+            ('undeclared utf-8', html.encode('utf-8'), 'text/html', html),
+            ('undeclared cp1252', html.encode('cp1252'), 'text/html', html),
+        ]
+    return cases
+
+
+def apparent_encoding_text(body: bytes, content_type: str) -> str:
+    """What fetch_page did before: charset detection over every body, then response.text."""
+    response = Response()
+    response._content = body
+    response.headers['Content-Type'] = content_type
+    response.encoding = response.apparent_encoding
+    return response.text
+
+
+def benchmark_encoding(num_pages: int):
+    """Time per page and correctness of apparent_encoding vs declared-first encoding resolution."""
+    cases = encoding_cases(num_pages)
+    resolver = CharsetResolver()
+    
+    print(f"\nEncoding resolution: {num_pages} pages per case, "
+          f"{sum(len(case[1]) for case in cases) / len(cases) / 1024:.0f} KiB average")
+    print("-" * 72)
+    
+    saved = 0.0
+    for label in dict.fromkeys(case[0] for case in cases):
+        pages = [case[1:] for case in cases if case[0] == label]
+        timings = []
+        correct = []
+        for decode in (apparent_encoding_text, resolver.decode):
+            started = time.process_time()
+            texts = [decode(body, content_type) for body, content_type, _ in pages]
+            timings.append((time.process_time() - started) / len(pages) * 1000)
+            correct.append(sum(text.lstrip('\ufeff') == expected for text, (_, _, expected) in zip(texts, pages)))
+        saved += (timings[0] - timings[1]) * len(pages)
+        
+        print(f"{label:<18} before {timings[0]:>6.2f} ms/page  after {timings[1]:>6.2f} ms/page  "
+              f"correct: before {correct[0]}/{len(pages)}, after {correct[1]}/{len(pages)}")
+    
+    print(f"\nAverage time saved: {saved / len(cases):.2f} ms/page")
+    print(f"Page encodings: {resolver.summary()}")
+
+
+def fixture_html(n: int, sections: int = 150) -> str:
+    """A large synthetic page: nested layout, nav lists, all heading levels, meta and forms."""
+    nav = ''.join(f'<li><a href="/nav/{k}">Menu {k}</a><ul><li><a href="/nav/{k}/sub">Sub {k}</a></li></ul></li>'
+                  for k in range(20))
+    body = ''.join(
+        f'<section class="s{k}"><div class="card"><h{k % 6 + 1}>Section {k} of page {n}</h{k % 6 + 1}>'
+        f'<p>Paragraph {k}: <b>bold</b> and <i>italic</i> text with <a href="/p/{n}/{k}">a link</a> '
+        f'inside, long enough to be kept by the extractors.</p><p>short {k}</p>'
+        f'<ol><li>Point {k}.1</li><li>Point {k}.2 <span>detail</span></li></ol>'
+        f'<img src="/img/{n}/{k}.png" alt="Figure {k}" title="Figure title {k}">'
+        f'<!-- comment {k} --></div></section>'
+        for k in range(sections)
+    )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f'<title>Fixture page {n}</title>'
+        f'<meta name="description" content="Fixture description {n}">'
+        '<meta name="keywords" content="crawl, benchmark"><meta name="author" content="ShadowFox">'
+        f'<meta property="og:title" content="OG fixture {n}"><meta property="og:image" content="/og/{n}.png">'
+        '<script src="/static/app.js"></script><script>var inline = 1;</script>'
+        '<style>body { margin: 0 }</style></head><body>'
+        f'<header><nav><ul>{nav}</ul></nav></header><main>{body}</main>'
+        '<form action="/search" method="post"><input name="q"></form>'
+        '<footer><p>Footer text that is comfortably longer than twenty characters.</p></footer>'
+        '</body></html>'
+    )
+
+
+def link_mix(count: int) -> List[str]:
+    """hrefs as found on real pages: relative, absolute, off-site, tracking parameters, pagination, files."""
+    kinds = (
+        lambda k: f'/articles/{k}',
+        lambda k: f'articles/{k}/../{k}/comments',
+        lambda k: f'https://example.com/list?page={k % 50}&utm_source=feed',
+        lambda k: f'https://EXAMPLE.com:443/Item/{k}#reviews',
+        lambda k: f'//cdn.example.net/img/{k}.png',
+        lambda k: f'https://other.org/{k}',
+        lambda k: f'/files/report-{k}.pdf',
+        lambda k: f'?page={k % 20}',
+        lambda k: f'/search?sort=asc&q=item%7e{k}',
+        lambda k: f'mailto:team{k}@example.com'
+    )
+    return [kinds[k % len(kinds)](k) for k in range(count)]
+
+
+def legacy_resolve_links(hrefs: List[str], current_url: str, base_domain: str) -> List[str]:
+    """AdvancedWebScraper.resolve_links before URLCanonicalizer: urljoin, then two urlparse calls per link."""
+    links = []
+    for href in hrefs:
+        parsed = urlparse(urljoin(current_url, href))
+        normalized = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
+        parsed = urlparse(normalized)
+        if (parsed.scheme in ['http', 'https'] and parsed.netloc == base_domain and
+                not any(ext in parsed.path.lower() for ext in ['.pdf', '.jpg', '.png', '.gif', '.zip', '.exe'])):
+            links.append(normalized)
+    return links
+
+
+def benchmark_canonical(num_links: int, repeat: int):
+    """Time per link of the old urljoin/urlparse link resolution vs URLCanonicalizer on one large page."""
+    page_url = 'https://example.com/catalog/index.html'
+    hrefs = link_mix(num_links)
+    canonicalizer = URLCanonicalizer(page_url)
+    
+    def canonical_links() -> List[str]:
+        base = canonicalizer.split_base(page_url)
+        resolved = (canonicalizer.resolve(href, base) for href in hrefs)
+        return [url for url in resolved if url is not None]
+    
+    print(f"\nURL canonicalization: one page with {num_links} links, best of {repeat}")
+    print("-" * 72)
+    
+    runs = [
+        ('urljoin + urlparse (old)', lambda: legacy_resolve_links(hrefs, page_url, 'example.com')),
+        ('URLCanonicalizer', canonical_links)
+    ]
+    timings = {}
+    for name, resolve in runs:
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            links = resolve()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+        paginated = sum(1 for url in set(links) if 'page=' in url)
+        print(f"{name:<28} {best * 1e6 / num_links:>7.2f} us/link {len(links):>7} kept "
+              f"{len(set(links)):>7} distinct, {paginated} paginated")
+    
+    old, new = timings.values()
+    print(f"\nSpeed-up: {old / new:.2f}x")
+
+
+def legacy_page_data(soup: BeautifulSoup) -> Dict:
+    """AdvancedWebScraper.extract_page_data before single-pass extraction (one find_all per field)."""
+    data = {'title': None, 'headings': [], 'paragraphs': [], 'links': [], 'images': [],
+            'forms': [], 'scripts': [], 'meta': {}}
+    if soup.title:
+        data['title'] = soup.title.get_text(strip=True)
+    for tag in ['h1', 'h2', 'h3']:
+        for heading in soup.find_all(tag):
+            text = heading.get_text(strip=True)
+            if text:
+                data['headings'].append({'level': tag, 'text': text})
+    for p in soup.find_all('p'):
+        text = p.get_text(strip=True)
+        if len(text) > 20:
+            data['paragraphs'].append(text)
+    for link in soup.find_all('a', href=True):
+        data['links'].append({'text': link.get_text(strip=True), 'href': link['href']})
+    for img in soup.find_all('img'):
+        data['images'].append({'src': img.get('src', ''), 'alt': img.get('alt', '')})
+    for form in soup.find_all('form'):
+        data['forms'].append({'action': form.get('action', ''), 'method': form.get('method', 'get')})
+    for script in soup.find_all('script', src=True):
+        data['scripts'].append(script['src'])
+    for meta in soup.find_all('meta'):
+        name = meta.get('name') or meta.get('property')
+        content = meta.get('content')
+        if name and content:
+            data['meta'][name] = content
+    return data
+
+
+def legacy_scrape(soup: BeautifulSoup, base_url: str) -> Dict:
+    """WebScraperPro.extract_metadata + extract_content before single-pass extraction."""
+    metadata = {'title': None}
+    title_tag = soup.find('title')
+    if title_tag:
+        metadata['title'] = title_tag.get_text(strip=True)
+    for key, attribute, value in (('description', 'name', 'description'), ('keywords', 'name', 'keywords'),
+                                  ('author', 'name', 'author'), ('og_title', 'property', 'og:title'),
+                                  ('og_description', 'property', 'og:description'),
+                                  ('og_image', 'property', 'og:image')):
+        tag = soup.find('meta', attrs={attribute: value})
+        metadata[key] = tag.get('content') if tag and tag.get('content') else None
+    
+    content = {'headings': [], 'paragraphs': [], 'links': [], 'images': [], 'lists': []}
+    for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+        for h in soup.find_all(tag):
+            text = h.get_text(strip=True)
+            if text:
+                content['headings'].append({'level': tag, 'text': text})
+    content['paragraphs'] = [p.get_text(strip=True) for p in soup.find_all('p')
+                             if len(p.get_text(strip=True)) > 20]
+    for link in soup.find_all('a', href=True):
+        text = link.get_text(strip=True)
+        href = urljoin(base_url, link['href'])
+        if text and href:
+            content['links'].append({'text': text, 'url': href,
+                                     'is_internal': urlparse(href).netloc == urlparse(base_url).netloc})
+    for img in soup.find_all('img'):
+        content['images'].append({'src': urljoin(base_url, img.get('src', '')),
+                                  'alt': img.get('alt', ''), 'title': img.get('title', '')})
+    for ul in soup.find_all(['ul', 'ol']):
+        items = [li.get_text(strip=True) for li in ul.find_all('li')]
+        if items:
+            content['lists'].append(items)
+    return {**metadata, **content}
+
+
+def load_fixtures(directory: str, count: int) -> List[str]:
+    """Saved *.html pages from directory, or `count` generated pages if none is given."""
+    if directory:
+        return [path.read_text(encoding='utf-8', errors='replace')
+                for path in sorted(Path(directory).glob('*.html'))]
+    return [fixture_html(n) for n in range(count)]
+
+
+def benchmark_extraction(fixtures_dir: str, count: int, repeat: int) -> bool:
+    """
+    CPU time per page of the old per-field find_all extraction vs the
+    single-pass PageExtractor, after checking both produce identical records.
+    
+    Returns:
+        True if every fixture produced identical records
+    """
+    pages = load_fixtures(fixtures_dir, count)
+    if not pages:
+        print(f"No *.html fixtures found in {fixtures_dir}")
+        return False
+    
+    base_url = 'https://example.com/'
+    soups = [BeautifulSoup(html, 'html.parser') for html in pages]
+    size = sum(len(html) for html in pages) / len(pages)
+    print(f"\nExtraction: {len(pages)} pages, {size / 1024:.0f} KiB average, {repeat} rounds")
+    print("-" * 72)
+    
+    cases = [
+        ('page record (advanced)', legacy_page_data, PageExtractor(page_data_fields()).extract),
+        ('metadata + content (app)', lambda soup: legacy_scrape(soup, base_url),
+         PageExtractor({**metadata_fields(), **content_fields(base_url)}).extract)
+    ]
+    
+    identical = True
+    for name, before, after in cases:
+        mismatches = sum(before(soup) != after(soup) for soup in soups)
+        identical = identical and not mismatches
+        
+        timings = []
+        for extract in (before, after):
+            started = time.process_time()
+            for _ in range(repeat):
+                for soup in soups:
+                    extract(soup)
+            timings.append((time.process_time() - started) / (repeat * len(soups)) * 1000)
+        
+        print(f"{name:<26} before {timings[0]:>7.2f} ms/page  after {timings[1]:>7.2f} ms/page "
+              f"({timings[0] / timings[1]:.1f}x)  {'identical' if not mismatches else f'{mismatches} MISMATCHES'}")
+    
+    return identical
+
+
+# Well-formed snippets exercising the corners where parser trees and text handling can drift
+CONFORMANCE_CASES = [
+    '<title> Spaced &amp; escaped </title><p>Entities: &lt;tag&gt; &quot;quoted&quot; &#169; &eacute;t&eacute;</p>',
+    '<p>Non-breaking&nbsp;spaces&nbsp;and\ttabs\n and newlines around text</p><h1>&nbsp;</h1>',
+    '<p>Inline <b>bold <i>nested</i></b> text<br>after a break, and <!-- a comment --> more</p>',
+    '<p>Text with <script>var x = "script text";</script> and <style>p {}</style> inside it here</p>',
+    '<script src="/a.js" async></script><script src></script><img src alt><form method="POST"></form>',
+    '<meta name="description" content=""><meta name="description" content="second">'
+    '<meta property="og:title" content="OG"><meta name="robots" content="noindex">',
+    '<a href="">empty href</a><a>no href</a><a href="/x"> </a><a href="#frag">Fragment</a>',
+    '<ul><li>One<ol><li>Nested</li><li>Two</li></ol></li><li></li></ul><ol></ol>',
+    '<h2>Ünïcödé — “quotes” 日本語</h2><p>Ünïcödé paragraph that is long enough — 日本語テキスト</p>',
+    '<div class="a b" rel="nofollow x"><h6>Deep <span><em>heading</em></span></h6><template><p>Template text</p></template></div>',
+]
+
+
+def parser_corpus(fixtures_dir: str, count: int) -> List[str]:
+    """Conformance pages: the edge cases, generated fixtures, local site pages and saved pages."""
+    site = LocalTestSite(num_pages=count)
+    pages = [f'<!DOCTYPE html><html><head></head><body>{case}</body></html>' for case in CONFORMANCE_CASES]
+    pages += [fixture_html(n, sections=40) for n in range(count)]
+    pages += [site.render_page(n) for n in range(count)]
+    if fixtures_dir:
+        pages += load_fixtures(fixtures_dir, 0)
+    return pages
+
+
+def check_parsers(fixtures_dir: str, count: int, repeat: int) -> bool:
+    """
+    Conformance and speed of every installed parser backend: each one must
+    produce exactly the records html.parser produces on the corpus.
+    
+    Returns:
+        True if every backend matched on every page
+    """
+    pages = parser_corpus(fixtures_dir, count)
+    base_url = 'https://example.com/'
+    extractor = PageExtractor({**page_data_fields(), **metadata_fields(), **content_fields(base_url)})
+    
+    print(f"\nParser backends: {len(pages)} pages, reference html.parser")
+    print("-" * 72)
+    
+    reference = [extractor.extract(parse_html(html, 'html.parser')) for html in pages]
+    
+    conforming = True
+    for backend in available_backends():
+        mismatches = []
+        for index, html in enumerate(pages):
+            record = extractor.extract(parse_html(html, backend))
+            fields = [key for key in record if record[key] != reference[index][key]]
+            if fields:
+                mismatches.append((index, fields))
+        conforming = conforming and not mismatches
+        
+        started = time.process_time()
+        for _ in range(repeat):
+            for html in pages:
+                extractor.extract(parse_html(html, backend))
+        per_page = (time.process_time() - started) / (repeat * len(pages)) * 1000
+        
+        print(f"{backend:<12} {per_page:>7.2f} ms/page parse+extract  "
+              f"{'identical' if not mismatches else f'{len(mismatches)} pages DIFFER'}")
+        for index, fields in mismatches[:5]:
+            print(f"  page {index}: {', '.join(fields)}")
+    
+    return conforming
+
+
+# Narrow to wide schemas; 'page fields' asks for about what the built-in page record holds
+SCHEMA_CASES = [
+    ('title', {'title': 'title'}),
+    ('title + description', {'title': 'title',
+                             'description': {'css': 'meta[name=description]', 'attr': 'content'}}),
+    ('title + links', {'title': 'title', 'links': LINKS_FIELD}),
+    ('title via XPath', {'title': {'xpath': '//title'}}),
+    ('page fields', {
+        'title': 'title',
+        'headings': {'css': 'h1, h2, h3', 'many': True},
+        'paragraphs': {'css': 'p', 'many': True, 'post': ['regex:^.{21,}$']},
+        'links': LINKS_FIELD,
+        'images': {'css': 'img', 'many': True, 'fields': {'src': {'attr': 'src'}, 'alt': {'attr': 'alt'}}},
+        'forms': {'css': 'form', 'many': True, 'fields': {'action': {'attr': 'action'}, 'method': {'attr': 'method'}}},
+        'scripts': {'css': 'script[src]', 'many': True, 'attr': 'src'},
+        'meta': {'css': 'meta[name][content]', 'many': True, 'attr': 'content'}
+    })
+]
+
+
+def benchmark_schema(fixtures_dir: str, count: int, repeat: int) -> bool:
+    """
+    Extraction cost per page of the built-in page fields (one walk over
+    every element) vs extraction schemas of growing width, per parser
+    backend. Trees are parsed up front; only extraction is timed.
+    
+    Returns:
+        True if the schemas' title and links match the built-in fields
+    """
+    pages = load_fixtures(fixtures_dir, count)
+    if not pages:
+        print(f"No *.html fixtures found in {fixtures_dir}")
+        return False
+    
+    url = 'https://example.com/'
+    builtin = PageExtractor(page_data_fields())
+    schemas = [(name, ExtractionSchema({'name': name, 'fields': fields})) for name, fields in SCHEMA_CASES]
+    crawl_schema = dict(schemas)['title + links']
+    backends = available_backends()
+    size = sum(len(html) for html in pages) / len(pages)
+    print(f"\nExtraction schemas: {len(pages)} pages, {size / 1024:.0f} KiB average, {repeat} rounds, ms/page")
+    print("-" * 72)
+    print(f"{'':<28}" + ''.join(f"{backend:>14}" for backend in backends))
+    
+    cases = [('built-in page fields', builtin.extract)] + [(f'schema: {name}', schema.extract) for name, schema in schemas]
+    timings = {name: [] for name, _ in cases}
+    consistent = True
+    for backend in backends:
+        trees = [parse_html(html, backend) for html in pages]
+        
+        # Same title and links as the handlers the crawler uses by default
+        reference = [builtin.extract(tree) for tree in trees]
+        for tree, expected in zip(trees, reference):
+            record = crawl_schema.extract(tree, url)
+            if record['title'] != expected['title'] or record['links'] != expected['links']:
+                consistent = False
+        
+        for name, extract in cases:
+            started = time.process_time()
+            for _ in range(repeat):
+                for tree in trees:
+                    extract(tree, url)
+            timings[name].append((time.process_time() - started) / (repeat * len(trees)) * 1000)
+    
+    for name, per_backend in timings.items():
+        print(f"{name:<28}" + ''.join(f"{ms:>14.3f}" for ms in per_backend))
+    
+    builtin_ms = timings['built-in page fields']
+    narrow_ms = timings['schema: title + links']
+    print("\nCrawl-ready schema (title + links) vs built-in fields: "
+          + ', '.join(f"{backend} {before / after:.1f}x" for backend, before, after in zip(backends, builtin_ms, narrow_ms)))
+    print(f"Schema title and links {'match' if consistent else 'DIFFER FROM'} the built-in fields")
+    return consistent
+
+
+def sample_record(n: int) -> dict:
+    """A page record shaped like AdvancedWebScraper.extract_page_data output."""
+    return {
+        'url': f"https://example.com/page/{n}",
+        'title': f"Example page {n}",
+        'meta_description': "A synthetic page used to benchmark result export. " * 2,
+        'headings': {'h1': [f"Heading {n}"], 'h2': [f"Section {k}" for k in range(5)], 'h3': []},
+        'links_count': 40,
+        'images_count': 6,
+        'forms_count': 1,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def benchmark_results(num_records: int):
+    """Compare peak memory and end-of-run stall of in-memory vs streamed result export."""
+    print(f"\nResult export: {num_records:,} page records")
+    print("-" * 72)
+    
+    compressions = [None, 'gzip'] + (['zstd'] if zstandard else [])
+    
+    with tempfile.TemporaryDirectory(prefix='shadowfox_bench_') as tmp:
+        for compression in ['in-memory'] + compressions:
+            tracemalloc.start()
+            started = time.perf_counter()
+            
+            if compression == 'in-memory':
+                output = Path(tmp) / 'results.json'
+                sink = ResultSink()
+            else:
+                output = ndjson_path(Path(tmp) / f'results_{compression}', compression)
+                sink = StreamingResultSink(NDJSONWriter(output, compression=compression))
+            
+            for n in range(num_records):
+                sink.append(sample_record(n))
+            
+            # The stall: what is left to do once the crawl itself has finished
+            stall_started = time.perf_counter()
+            if compression == 'in-memory':
+                with open(output, 'w', encoding='utf-8') as f:
+                    json.dump({'data': sink.snapshot()}, f, indent=2, ensure_ascii=False)
+            else:
+                sink.close()
+            finished = time.perf_counter()
+            
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            
+            print(f"{compression or 'ndjson':<10} {finished - started:>7.2f} s total "
+                  f"{finished - stall_started:>7.2f} s final stall "
+                  f"{peak / 1024 / 1024:>8.1f} MiB peak {output.stat().st_size / 1024 / 1024:>8.1f} MiB file")
+
+
+def full_page_record(n: int) -> dict:
+    """A page record with the fields and nesting of AdvancedWebScraper.page_record()."""
+    return {
+        'url': f"https://example.com/page/{n}",
+        'title': f"Example page {n}",
+        'headings': [{'level': f'h{k % 3 + 1}', 'text': f"Section {k} of page {n}"} for k in range(8)],
+        'paragraphs': [f"Paragraph {k} of page {n}: " + "synthetic text for the export benchmark. " * 4
+                       for k in range(12)],
+        'links': [{'text': f"Link {k}", 'href': f"/page/{(n * 7 + k) % 100_000}"} for k in range(30)],
+        'images': [{'src': f"/img/{n}/{k}.png", 'alt': f"Figure {k}"} for k in range(4)],
+        'forms': [{'action': '/search', 'method': 'get'}],
+        'scripts': ['/static/app.js'],
+        'meta': {'description': f"Description of page {n}", 'og:title': f"OG page {n}"},
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def benchmark_columnar(num_records: int, row_group_size: int):
+    """
+    Write the same crawl records as NDJSON (+ the JSON envelope) and as
+    Parquet and Arrow files, then time two analytics queries on each:
+    the url and title of every page, and the number of links per page.
+    """
+    if pa is None:
+        print("Columnar export requires pyarrow: pip install pyarrow")
+        return
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    
+    print(f"\nColumnar export: {num_records:,} page records, {row_group_size} per row group")
+    print("-" * 72)
+    
+    with tempfile.TemporaryDirectory(prefix='shadowfox_bench_') as tmp:
+        base = Path(tmp) / 'results'
+        outputs = {}
+        
+        started = time.perf_counter()
+        writer = NDJSONWriter(ndjson_path(base))
+        for n in range(num_records):
+            writer.write(full_page_record(n))
+        writer.close()
+        write_json_envelope(writer.path, base.with_suffix('.json'), {'target': 'https://example.com/'})
+        outputs['ndjson + json'] = (writer.path, time.perf_counter() - started)
+        
+        for format, compression in (('parquet', 'zstd'), ('parquet', 'snappy'), ('arrow', 'zstd')):
+            started = time.perf_counter()
+            path = columnar_path(base.with_name(f'results_{compression}'), format)
+            writer = ColumnarWriter(path, format, page_record_schema(), compression, row_group_size)
+            for n in range(num_records):
+                writer.write(full_page_record(n))
+            writer.close()
+            outputs[f'{format} {compression}'] = (path, time.perf_counter() - started)
+        
+        def json_query(columns):
+            with open(base.with_suffix('.json'), encoding='utf-8') as f:
+                return [[record[column] for column in columns] for record in json.load(f)['data']]
+        
+        def ndjson_query(columns):
+            return [[record[column] for column in columns] for record in iter_ndjson(outputs['ndjson + json'][0])]
+        
+        def columnar_reader(path):
+            if path.suffix == '.parquet':
+                return lambda columns: pq.read_table(path, columns=columns)
+            return lambda columns: pa.ipc.open_file(path).read_all().select(columns)
+        
+        print(f"{'':<16}{'write s':>9}{'size MiB':>10}{'url+title s':>13}{'link count s':>14}")
+        size = lambda path: path.stat().st_size / 1024 / 1024
+        json_size = size(base.with_suffix('.json'))
+        for name, (path, write_seconds) in outputs.items():
+            queries = ([('json envelope', json_query), ('ndjson', ndjson_query)] if name == 'ndjson + json'
+                       else [(name, columnar_reader(path))])
+            for label, query in queries:
+                started = time.perf_counter()
+                query(['url', 'title'])
+                titles = time.perf_counter() - started
+                
+                started = time.perf_counter()
+                links = query(['links'])
+                if isinstance(links, list):
+                    total = sum(len(row[0]) for row in links)
+                else:
+                    total = pc.sum(pc.list_value_length(links.column('links'))).as_py()
+                counting = time.perf_counter() - started
+                
+                file_size = json_size if label == 'json envelope' else size(path)
+                print(f"{label:<16}{write_seconds:>9.2f}{file_size:>10.1f}{titles:>13.3f}{counting:>14.3f}"
+                      f"  ({total:,} links)")
+
+
+def link_pages(num_links: int, extra_keys: bool):
+    """Page records with num_links links in total; with extra_keys, some links carry rel/title keys."""
+    for n in range(num_links // 30):
+        record = full_page_record(n)
+        if extra_keys:
+            for k, link in enumerate(record['links']):
+                if k % 7 == 3:
+                    link['rel'] = 'nofollow'
+                if (n + k) % 11 == 5:
+                    link['title'] = f"Title of link {k}"
+        yield record
+
+
+def legacy_export_csv(data: List[Dict], path: Path):
+    """WebScraperPro.export_csv before streaming: header from the first record, whole list in memory."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=data[0].keys())
+        writer.writeheader()
+        writer.writerows(data)
+
+
+def benchmark_csv(num_links: int):
+    """
+    Export link rows (and whole page records) to CSV the old way, as a
+    list with a header taken from row 0, and with the streaming write_csv():
+    time, peak memory, and whether rows with extra keys survive.
+    """
+    print(f"\nCSV export: {num_links:,} link rows from {num_links // 30:,} pages")
+    print("-" * 72)
+    
+    with tempfile.TemporaryDirectory(prefix='shadowfox_bench_') as tmp:
+        path = Path(tmp) / 'links.csv'
+        cases = [
+            ('list + DictWriter', lambda: legacy_export_csv(list(iter_link_rows(link_pages(num_links, False))), path)),
+            ('list + DictWriter, mixed', lambda: legacy_export_csv(list(iter_link_rows(link_pages(num_links, True))), path)),
+            ('write_csv', lambda: write_csv(iter_link_rows(link_pages(num_links, False)), path)),
+            ('write_csv, mixed', lambda: write_csv(iter_link_rows(link_pages(num_links, True)), path)),
+            ('write_csv, page records', lambda: write_csv(link_pages(num_links, False), path))
+        ]
+        
+        print(f"{'':<28}{'seconds':>9}{'peak MiB':>10}{'rows':>11}{'columns':>9}")
+        for name, export in cases:
+            try:
+                started = time.perf_counter()
+                export()
+                seconds = time.perf_counter() - started
+                
+                # Second run under tracemalloc, which would distort the timing
+                tracemalloc.start()
+                export()
+                _, peak = tracemalloc.get_traced_memory()
+            except ValueError as e:
+                print(f"{name:<28}  failed: {e}")
+                continue
+            finally:
+                tracemalloc.stop()
+            
+            with open(path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                columns = len(next(reader))
+                rows = sum(1 for _ in reader)
+            print(f"{name:<28}{seconds:>9.2f}{peak / 1024 / 1024:>10.1f}{rows:>11,}{columns:>9}")
+
+
+def main():
+    """Parse command line arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description='ShadowFox crawl benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    engines = subparsers.add_parser('engines', help='threaded vs asyncio crawl engine')
+    engines.add_argument('--pages', type=int, default=500)
+    engines.add_argument('--latency', type=float, default=0.05)
+    engines.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    engines.add_argument('--concurrency', type=int, default=AdvancedScraperConfig.ASYNC_CONCURRENCY)
+    
+    stress = subparsers.add_parser('stress', help='exactly-once crawl check under heavy concurrency')
+    stress.add_argument('--pages', type=int, default=2000)
+    stress.add_argument('--workers', type=int, default=64)
+    stress.add_argument('--latency', type=float, default=0.005)
+    
+    frontier = subparsers.add_parser('frontier', help='frontier backend memory and throughput')
+    frontier.add_argument('--urls', type=int, default=200_000)
+    frontier.add_argument('--error-rate', type=float, default=AdvancedScraperConfig.BLOOM_ERROR_RATE)
+    
+    results = subparsers.add_parser('results', help='in-memory vs streamed result export')
+    results.add_argument('--records', type=int, default=50_000)
+    
+    columnar = subparsers.add_parser('columnar', help='NDJSON/JSON vs Parquet and Arrow: file size and column queries')
+    columnar.add_argument('--records', type=int, default=20_000)
+    columnar.add_argument('--row-group-size', type=int, default=AdvancedScraperConfig.COLUMNAR_ROW_GROUP_SIZE)
+    
+    csv_export = subparsers.add_parser('csv', help='list + DictWriter vs streaming CSV export of link rows')
+    csv_export.add_argument('--links', type=int, default=300_000)
+    
+    cache = subparsers.add_parser('cache', help='cold vs warm conditional HTTP cache')
+    cache.add_argument('--pages', type=int, default=500)
+    cache.add_argument('--latency', type=float, default=0.005)
+    cache.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    
+    extract = subparsers.add_parser('extract', help='CPU per page of per-field vs single-pass extraction')
+    extract.add_argument('--fixtures', help='directory of saved *.html pages (default: generated pages)')
+    extract.add_argument('--pages', type=int, default=20, help='generated pages when --fixtures is not given')
+    extract.add_argument('--repeat', type=int, default=3)
+    
+    parsers = subparsers.add_parser('parsers', help='parser backend conformance and speed')
+    parsers.add_argument('--fixtures', help='directory of saved *.html pages to add to the corpus')
+    parsers.add_argument('--pages', type=int, default=10, help='generated pages in the corpus')
+    parsers.add_argument('--repeat', type=int, default=3)
+    
+    schema = subparsers.add_parser('schema', help='extraction cost per page of built-in fields vs narrow and wide schemas')
+    schema.add_argument('--fixtures', help='directory of saved *.html pages (default: generated pages)')
+    schema.add_argument('--pages', type=int, default=20, help='generated pages when --fixtures is not given')
+    schema.add_argument('--repeat', type=int, default=3)
+    
+    pipeline = subparsers.add_parser('pipeline', help='parse-stage process count sweep')
+    pipeline.add_argument('--pages', type=int, default=400)
+    pipeline.add_argument('--paragraphs', type=int, default=300)
+    pipeline.add_argument('--threads', type=int, default=16)
+    pipeline.add_argument('--processes', type=int, nargs='+', default=[0, 1, 2, 4])
+    pipeline.add_argument('--parser', default='html.parser', help="parser backend ('auto' for the fastest)")
+    
+    limits = subparsers.add_parser('limits', help='crawl with oversized non-HTML links, with and without fetch limits')
+    limits.add_argument('--pages', type=int, default=200)
+    limits.add_argument('--traps', type=int, default=3, help='binary downloads and HTML streams each')
+    limits.add_argument('--trap-mib', type=int, default=20)
+    limits.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    
+    sitemap = subparsers.add_parser('sitemap', help='link discovery vs sitemap seeding and incremental re-crawl')
+    sitemap.add_argument('--pages', type=int, default=2000)
+    sitemap.add_argument('--depth', type=int, default=3)
+    sitemap.add_argument('--latency', type=float, default=0.01)
+    sitemap.add_argument('--threads', type=int, default=16)
+    sitemap.add_argument('--changed', type=float, default=0.1, help='share of pages with a new lastmod')
+    
+    priority = subparsers.add_parser('priority', help='breadth-first vs best-first crawl under a page budget')
+    priority.add_argument('--pages', type=int, default=5000)
+    priority.add_argument('--budget', type=int, default=500)
+    priority.add_argument('--key-every', type=int, default=20, help='every n-th page is a key page')
+    priority.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    
+    incremental = subparsers.add_parser('incremental', help='full crawl vs incremental re-crawls with change detection')
+    incremental.add_argument('--pages', type=int, default=2000)
+    incremental.add_argument('--paragraphs', type=int, default=40, help='paragraphs per page')
+    incremental.add_argument('--changed', type=float, default=0.05, help='share of pages edited in the last run')
+    incremental.add_argument('--removed', type=int, default=20, help='pages removed in the last run')
+    incremental.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    
+    duplicates = subparsers.add_parser('duplicates', help='crawl waste on a mirrored site with and without near-duplicate detection')
+    duplicates.add_argument('--pages', type=int, default=1000)
+    duplicates.add_argument('--mirrors', type=int, default=3, help='prefixes that serve a copy of the site')
+    duplicates.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    
+    canonical = subparsers.add_parser('canonical', help='link resolution cost per link, old vs URLCanonicalizer')
+    canonical.add_argument('--links', type=int, default=10000, help='links on the benchmark page')
+    canonical.add_argument('--repeat', type=int, default=20)
+    
+    distributed = subparsers.add_parser('distributed', help='multi-domain crawl at several worker process counts')
+    distributed.add_argument('--domains', type=int, default=8, help='local sites crawled at once')
+    distributed.add_argument('--pages', type=int, default=200, help='pages per site')
+    distributed.add_argument('--paragraphs', type=int, default=40, help='paragraphs per page')
+    distributed.add_argument('--latency', type=float, default=0.02)
+    distributed.add_argument('--threads', type=int, default=4, help='fetching threads per host')
+    distributed.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    
+    metrics = subparsers.add_parser('metrics', help='stage histogram cost per sample and per crawl')
+    metrics.add_argument('--pages', type=int, default=1000)
+    metrics.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    metrics.add_argument('--rounds', type=int, default=3)
+    
+    retry = subparsers.add_parser('retry', help='pages lost to flaky pages and an outage, with and without retries')
+    retry.add_argument('--pages', type=int, default=300)
+    retry.add_argument('--flaky', type=float, default=0.2, help='share of pages that fail twice before answering')
+    retry.add_argument('--outage', type=float, default=3.0, help='seconds the site answers 500 to everything')
+    retry.add_argument('--threads', type=int, default=AdvancedScraperConfig.MAX_THREADS)
+    
+    batch = subparsers.add_parser('batch', help='WebScraperPro over a URL list, sequential vs scrape_many')
+    batch.add_argument('--pages', type=int, default=200)
+    batch.add_argument('--latency', type=float, default=0.05)
+    batch.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    
+    encoding = subparsers.add_parser('encoding', help='apparent_encoding vs declared-first charset resolution')
+    encoding.add_argument('--pages', type=int, default=100, help='pages per encoding case')
+    
+    args = parser.parse_args()
+    
+    if args.benchmark == 'engines':
+        benchmark_engines(args.pages, args.latency, args.threads, args.concurrency)
+    elif args.benchmark == 'stress':
+        if not stress_exactly_once(args.pages, args.workers, args.latency):
+            sys.exit(1)
+    elif args.benchmark == 'frontier':
+        benchmark_frontier(args.urls, args.error_rate)
+    elif args.benchmark == 'results':
+        benchmark_results(args.records)
+    elif args.benchmark == 'columnar':
+        benchmark_columnar(args.records, args.row_group_size)
+    elif args.benchmark == 'csv':
+        benchmark_csv(args.links)
+    elif args.benchmark == 'cache':
+        benchmark_cache(args.pages, args.latency, args.threads)
+    elif args.benchmark == 'pipeline':
+        benchmark_pipeline(args.pages, args.paragraphs, args.threads, args.processes, args.parser)
+    elif args.benchmark == 'parsers':
+        if not check_parsers(args.fixtures, args.pages, args.repeat):
+            sys.exit(1)
+    elif args.benchmark == 'schema':
+        if not benchmark_schema(args.fixtures, args.pages, args.repeat):
+            sys.exit(1)
+    elif args.benchmark == 'limits':
+        benchmark_limits(args.pages, args.traps, args.trap_mib * 1024 * 1024, args.threads)
+    elif args.benchmark == 'sitemap':
+        benchmark_sitemap(args.pages, args.depth, args.latency, args.threads, args.changed)
+    elif args.benchmark == 'priority':
+        benchmark_priority(args.pages, args.budget, args.key_every, args.threads)
+    elif args.benchmark == 'incremental':
+        benchmark_incremental(args.pages, args.paragraphs, args.changed, args.removed, args.threads)
+    elif args.benchmark == 'duplicates':
+        benchmark_duplicates(args.pages, args.mirrors, args.threads)
+    elif args.benchmark == 'canonical':
+        benchmark_canonical(args.links, args.repeat)
+    elif args.benchmark == 'distributed':
+        benchmark_distributed(args.domains, args.pages, args.paragraphs, args.latency, args.threads, args.workers)
+    elif args.benchmark == 'metrics':
+        benchmark_metrics(args.pages, args.threads, args.rounds)
+    elif args.benchmark == 'retry':
+        benchmark_retry(args.pages, args.flaky, args.outage, args.threads)
+    elif args.benchmark == 'batch':
+        benchmark_batch(args.pages, args.latency, args.concurrency)
+    elif args.benchmark == 'encoding':
+        benchmark_encoding(args.pages)
+    elif args.benchmark == 'extract':
+        if not benchmark_extraction(args.fixtures, args.pages, args.repeat):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+URL Canonicalization for ShadowFox
+==================================
+Turns the hrefs of a page into canonical, crawlable URLs for
+AdvancedWebScraper. Every rule is compiled once: allow/deny regex sets,
+per-parameter keep/strip rules (glob patterns such as utm_*), skipped
+file extensions. Each link is split once with urlsplit; relative links
+are resolved against the pre-split page URL (RFC 3986), and the result
+gets a lower-case scheme and host, no default port, no dot segments,
+normalized percent-encoding, a filtered and sorted query and no fragment.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import fnmatch
+import re
+import string
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# Tracking and session parameters that never change the content of a page
+DEFAULT_STRIP_PARAMS = ('utm_*', 'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid',
+                        'sessionid', 'sid', 'phpsessid', 'jsessionid')
+
+DEFAULT_SKIP_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.zip', '.exe')
+
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + '-._~')
+_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+_PATH_SAFE = "/%:@!$&'()*+,;="
+_QUERY_SAFE = "/%:@!$'()*+,;=?"
+_PATH_UNSAFE = re.compile(r"[^A-Za-z0-9\-._~/%:@!$&'()*+,;=]")
+_QUERY_UNSAFE = re.compile(r"[^A-Za-z0-9\-._~/%:@!$'()*+,;=?]")
+_SESSION_PATH = re.compile(r';(?:jsessionid|phpsessid|sid)=[^/]*', re.IGNORECASE)
+
+
+def _fix_escape(match: re.Match) -> str:
+    """Decode an escaped unreserved character, upper-case any other escape."""
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else '%' + match.group(1).upper()
+
+
+def normalize_encoding(value: str, unsafe: re.Pattern, safe: str) -> str:
+    """Normalize percent-escapes and escape characters that may not appear unescaped."""
+    if '%' in value:
+        value = _ESCAPE.sub(_fix_escape, value)
+    if unsafe.search(value):
+        value = quote(value, safe=safe)
+    return value
+
+
+def remove_dot_segments(path: str) -> str:
+    """Resolve '.' and '..' segments of an absolute path (RFC 3986, section 5.2.4)."""
+    output = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if len(output) > 1:
+                output.pop()
+        elif segment != '.':
+            output.append(segment)
+    if path.endswith(('/.', '/..')):
+        output.append('')
+    return '/'.join(output) or '/'
+
+
+def compile_patterns(patterns: Iterable[str], flags: int = 0) -> Optional[re.Pattern]:
+    """One regex matching any of the patterns (None if there are none)."""
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+
+
+class BaseURL(NamedTuple):
+    """A page URL split once, for resolving the relative links on it."""
+    scheme: str
+    netloc: str
+    path: str
+    query: str
+
+
+class URLCanonicalizer:
+    """
+    Canonical form and crawl scope of URLs.
+    
+    resolve() is the hot path: one urlsplit per link, no urljoin. Host
+    and parameter decisions are cached, so a page full of links to the
+    same host with the same parameters costs little more than the split.
+    """
+    
+    def __init__(self, target_url: str, allow: Iterable[str] = (), deny: Iterable[str] = (),
+                 keep_params: Optional[Iterable[str]] = None, strip_params: Iterable[str] = DEFAULT_STRIP_PARAMS,
+                 skip_extensions: Iterable[str] = DEFAULT_SKIP_EXTENSIONS, sort_query: bool = True,
+                 lowercase_path: bool = False):
+        """
+        Initialize the canonicalizer.
+        
+        Args:
+            target_url: Site being crawled; only URLs on its host are in scope
+            allow: Regexes; when given, a canonical URL must match one of them
+            deny: Regexes; a canonical URL matching any of them is out of scope
+            keep_params: Glob patterns of query parameters kept (None keeps all not stripped)
+            strip_params: Glob patterns of query parameters always removed
+            skip_extensions: File extensions that are never crawled
+            sort_query: Sort query parameters, so their order does not matter
+            lowercase_path: Treat paths as case-insensitive (some IIS sites)
+        """
+        self.allow = compile_patterns(allow)
+        self.deny = compile_patterns(deny)
+        self.keep_params = compile_patterns((fnmatch.translate(p) for p in keep_params), re.IGNORECASE) \
+            if keep_params is not None else None
+        self.strip_params = compile_patterns((fnmatch.translate(p) for p in strip_params), re.IGNORECASE)
+        self.skip_extensions = compile_patterns(
+            (re.escape(extension) + '$' for extension in skip_extensions), re.IGNORECASE
+        )
+        self.sort_query = sort_query
+        self.lowercase_path = lowercase_path
+        
+        self._hosts: Dict[Tuple[str, str], str] = {}
+        self._params: Dict[str, bool] = {}
+        
+        target = urlsplit(target_url.strip())
+        self.scheme = target.scheme.lower()
+        self.host = self._netloc(self.scheme, target.netloc)
+    
+    def _netloc(self, scheme: str, netloc: str) -> str:
+        """Lower-case host without a default port or a trailing dot."""
+        key = (scheme, netloc)
+        cached = self._hosts.get(key)
+        if cached is None:
+            userinfo, _, hostport = netloc.rpartition('@')
+            host, port = hostport.lower(), ''
+            if host.rfind(':') > host.rfind(']'):
+                host, _, port = host.rpartition(':')
+            host = host.rstrip('.')
+            if port and port != DEFAULT_PORTS.get(scheme):
+                host = f'{host}:{port}'
+            cached = f'{userinfo}@{host}' if userinfo else host
+            if len(self._hosts) < 10000:
+                self._hosts[key] = cached
+        return cached
+    
+    def _keep_param(self, name: str) -> bool:
+        decision = self._params.get(name)
+        if decision is None:
+            decision = not (self.strip_params and self.strip_params.match(name)) and \
+                (self.keep_params is None or bool(self.keep_params.match(name)))
+            if len(self._params) < 10000:
+                self._params[name] = decision
+        return decision
+    
+    def _query(self, query: str) -> str:
+        """Filtered, normalized and (optionally) sorted query string."""
+        pairs = [
+            normalize_encoding(pair, _QUERY_UNSAFE, _QUERY_SAFE)
+            for pair in query.split('&')
+            if pair and self._keep_param(pair.split('=', 1)[0])
+        ]
+        if self.sort_query:
+            pairs.sort()
+        return '&'.join(pairs)
+    
+    def _path(self, path: str) -> str:
+        if ';' in path:
+            path = _SESSION_PATH.sub('', path)
+        if '/.' in path:
+            path = remove_dot_segments(path)
+        path = normalize_encoding(path, _PATH_UNSAFE, _PATH_SAFE) or '/'
+        return path.lower() if self.lowercase_path else path
+    
+    def split_base(self, url: str) -> BaseURL:
+        """Split a page URL once for resolve()."""
+        parts = urlsplit(url)
+        return BaseURL(parts.scheme.lower(), parts.netloc, parts.path or '/', parts.query)
+    
+    def _components(self, href: str, base: Optional[BaseURL]) -> Optional[Tuple[str, str, str, str]]:
+        """Resolve href (against base, if given) to canonical (scheme, netloc, path, query)."""
+        try:
+            parts = urlsplit(href.strip())
+        except ValueError:
+            return None
+        scheme = parts.scheme.lower()
+        path = parts.path
+        query = parts.query
+        
+        if scheme:
+            netloc = parts.netloc
+        elif base is None:
+            return None
+        else:
+            scheme = base.scheme
+            if parts.netloc:
+                netloc = parts.netloc
+            else:
+                netloc = base.netloc
+                if not path:
+                    path = base.path
+                    if not query:
+                        query = base.query
+                elif not path.startswith('/'):
+                    path = base.path[:base.path.rfind('/') + 1] + path
+        
+        if scheme not in DEFAULT_PORTS:
+            return None
+        return scheme, self._netloc(scheme, netloc), self._path(path), self._query(query) if query else ''
+    
+    def _in_scope(self, host: str, path: str, url: str) -> bool:
+        return (
+            host == self.host and
+            not (self.skip_extensions and self.skip_extensions.search(path)) and
+            not (self.allow and not self.allow.search(url)) and
+            not (self.deny and self.deny.search(url))
+        )
+    
+    def resolve(self, href: str, base: Optional[BaseURL] = None) -> Optional[str]:
+        """
+        Canonical URL of a link, or None if it is out of scope.
+        
+        Args:
+            href: Raw href value (relative links need base)
+            base: The page the link is on, from split_base()
+        """
+        components = self._components(href, base)
+        if components is None:
+            return None
+        scheme, host, path, query = components
+        url = f'{scheme}://{host}{path}?{query}' if query else f'{scheme}://{host}{path}'
+        return url if self._in_scope(host, path, url) else None
+    
+    def canonicalize(self, url: str) -> Optional[str]:
+        """Canonical form of an absolute URL, or None if it is out of scope."""
+        return self.resolve(url)
+    
+    def normalize(self, url: str) -> str:
+        """Canonical form of an absolute URL, whether or not it is in scope."""
+        components = self._components(url, None)
+        if components is None:
+            return url
+        scheme, host, path, query = components
+        return f'{scheme}://{host}{path}?{query}' if query else f'{scheme}://{host}{path}'
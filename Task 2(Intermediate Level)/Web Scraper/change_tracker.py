@@ -0,0 +1,261 @@
+"""
+Incremental Re-Crawl for ShadowFox
+==================================
+Content fingerprints that let AdvancedWebScraper re-crawl a site and only
+extract and export what changed since the previous run. Every extracted
+page is stored per normalized URL with a hash of its HTML, a 64-bit
+SimHash of its visible words and the links it contained. On the next run
+a page with the same hash, or a SimHash within a few bits (a rotating
+banner or a timestamp), is not parsed again: its stored links are queued
+instead, so the crawl still reaches everything behind it.
+
+At the end of a run the pages that were added or changed, and those of
+the previous run that were not found again, are written to a delta file.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+
+# How each page of a run compared with the previous run, as counted in ChangeTracker.stats
+CHANGE_KINDS = ('added', 'changed', 'unchanged', 'near_duplicate', 'removed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT,
+    simhash INTEGER,
+    links TEXT,
+    seen_run INTEGER,
+    change TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_seen ON pages (seen_run);
+"""
+
+_INVISIBLE = re.compile(r'<(script|style)\b.*?</\1\s*>|<!--.*?-->|<[^>]*>', re.IGNORECASE | re.DOTALL)
+_WORD = re.compile(r'\w+')
+
+# _BIT_TABLES[bit] maps every byte value to its bit `bit` (0 or 1), for bytes.translate()
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+
+def content_hash(html: str) -> str:
+    """Exact fingerprint of a page."""
+    return hashlib.blake2b(html.encode('utf-8', errors='replace'), digest_size=16).hexdigest()
+
+
+def visible_words(html: str) -> List[str]:
+    """Lower-cased words outside tags, scripts, styles and comments."""
+    return _WORD.findall(_INVISIBLE.sub(' ', html).lower())
+
+
+def simhash(tokens: Iterable[str]) -> int:
+    """
+    64-bit SimHash of a token sequence (repeated tokens weigh more).
+    
+    Bit k of the result is set if bit k is set in more than half of the
+    token hashes. The per-bit counts are taken column by column with
+    bytes.translate(), so the cost stays in C however long the page is.
+    """
+    blake2b = hashlib.blake2b
+    # Each distinct token is hashed once and its digest repeated by its count
+    digests = b''.join(blake2b(token.encode('utf-8'), digest_size=8).digest() * count
+                       for token, count in Counter(tokens).items())
+    total = len(digests) // 8
+    fingerprint = 0
+    for position in range(8):
+        column = digests[position::8]
+        for bit in range(8):
+            if column.translate(_BIT_TABLES[bit]).count(1) * 2 > total:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits."""
+    return bin(a ^ b).count('1')
+
+
+def _to_signed(value: int) -> int:
+    """Store an unsigned 64-bit value in SQLite's signed INTEGER."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class Fingerprint(NamedTuple):
+    """Fingerprint of a fetched page waiting for its extracted links."""
+    content_hash: str
+    simhash: Optional[int]
+    change: str
+
+
+class ChangeTracker:
+    """
+    Per-target page fingerprints kept across runs.
+    
+    check() compares a fetched page with the previous run; record() stores
+    the fingerprint of a page that was extracted. Writes are buffered and
+    flushed in batches.
+    
+    Counters in `stats` (one per entry of CHANGE_KINDS):
+    - added, changed:           extracted and exported
+    - unchanged, near_duplicate: skipped, stored links queued instead
+    - removed:                  in the previous run but not found in this one
+    """
+    
+    def __init__(self, path: Path, use_simhash: bool = True, max_distance: int = 3,
+                 resume: bool = False, batch_size: int = 1000):
+        """
+        Initialize the tracker.
+        
+        Args:
+            path: SQLite file holding the fingerprints
+            use_simhash: Treat pages within max_distance SimHash bits as unchanged
+            max_distance: Largest SimHash Hamming distance of a near-duplicate
+            resume: Continue the previous run instead of starting a new one
+            batch_size: Rows buffered before they are written
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.use_simhash = use_simhash
+        self.max_distance = max_distance
+        self.batch_size = batch_size
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'run'").fetchone()
+        previous = int(row[0]) if row else 0
+        self.run = previous if resume and previous else previous + 1
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('run', ?)", (str(self.run),))
+        
+        self._pending: Dict[str, Fingerprint] = {}
+        self._touched: List[tuple] = []
+        self._stored: List[tuple] = []
+        self.stats = {kind: 0 for kind in CHANGE_KINDS}
+    
+    def check(self, url: str, html: str) -> Optional[List[str]]:
+        """
+        Compare a fetched page with the previous run.
+        
+        Returns:
+            The page's stored links if it is unchanged (or a near-duplicate),
+            None if it is new or changed and has to be extracted
+        """
+        digest = content_hash(html)
+        with self._lock:
+            row = self._conn.execute('SELECT content_hash, simhash, links FROM pages WHERE url = ?',
+                                     (url,)).fetchone()
+        
+        kind = None
+        fingerprint = None
+        if row is not None and row[0] == digest:
+            kind = 'unchanged'
+        elif self.use_simhash:
+            fingerprint = simhash(visible_words(html))
+            # Compared with the last extracted version, so small edits cannot drift unnoticed
+            if row is not None and row[1] is not None and \
+                    hamming_distance(fingerprint, _to_unsigned(row[1])) <= self.max_distance:
+                kind = 'near_duplicate'
+        
+        with self._lock:
+            if kind is None:
+                self._pending[url] = Fingerprint(digest, fingerprint, 'changed' if row else 'added')
+                return None
+            self.stats[kind] += 1
+            self._touched.append((self.run, kind, url))
+            self._maybe_flush()
+        return json.loads(row[2])
+    
+    def record(self, url: str, links: List[str]):
+        """Store the fingerprint of a page checked by check() and extracted with these links."""
+        with self._lock:
+            fingerprint = self._pending.pop(url, None)
+            if fingerprint is None:
+                return
+            self.stats[fingerprint.change] += 1
+            simhash_value = None if fingerprint.simhash is None else _to_signed(fingerprint.simhash)
+            self._stored.append((url, fingerprint.content_hash, simhash_value, json.dumps(links),
+                                 self.run, fingerprint.change))
+            self._maybe_flush()
+    
+    def _maybe_flush(self):
+        if len(self._touched) + len(self._stored) >= self.batch_size:
+            self._flush()
+    
+    def _flush(self):
+        """Write buffered rows. Caller holds the lock."""
+        with self._conn:
+            self._conn.executemany('UPDATE pages SET seen_run = ?, change = ? WHERE url = ?', self._touched)
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO pages (url, content_hash, simhash, links, seen_run, change) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                self._stored
+            )
+        self._touched, self._stored = [], []
+    
+    def flush(self):
+        """Write everything buffered so far."""
+        with self._lock:
+            self._flush()
+    
+    def write_delta(self, path: Path, removals: bool = True) -> int:
+        """
+        Write this run's added and changed pages, and optionally the removed ones, as NDJSON.
+        
+        Args:
+            path: Delta file to create
+            removals: Also report (and forget) pages of earlier runs not seen in this one;
+                      only meaningful when the crawl covered the whole site
+        
+        Returns:
+            Number of lines written
+        """
+        with self._lock:
+            self._flush()
+            lines = 0
+            with open(path, 'w', encoding='utf-8') as f:
+                for url, change, digest in self._conn.execute(
+                        "SELECT url, change, content_hash FROM pages "
+                        "WHERE seen_run = ? AND change IN ('added', 'changed') ORDER BY url", (self.run,)):
+                    f.write(json.dumps({'url': url, 'change': change, 'content_hash': digest}) + '\n')
+                    lines += 1
+                
+                if removals:
+                    removed = 0
+                    for url, digest in self._conn.execute(
+                            'SELECT url, content_hash FROM pages WHERE seen_run < ? ORDER BY url', (self.run,)):
+                        f.write(json.dumps({'url': url, 'change': 'removed', 'content_hash': digest}) + '\n')
+                        removed += 1
+                    with self._conn:
+                        self._conn.execute('DELETE FROM pages WHERE seen_run < ?', (self.run,))
+                    self.stats['removed'] = removed
+                    lines += removed
+        return lines
+    
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
+    
+    def summary(self) -> str:
+        """One-line description of the counters for statistics output."""
+        return (f"{self.stats['added']} added, {self.stats['changed']} changed, "
+                f"{self.stats['unchanged']} unchanged, {self.stats['near_duplicate']} near-duplicates, "
+                f"{self.stats['removed']} removed")
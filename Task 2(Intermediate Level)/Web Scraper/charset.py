@@ -0,0 +1,182 @@
+"""
+Encoding Resolution for ShadowFox
+=================================
+Works out how to decode a fetched page without running charset
+detection over every body. The cheap, authoritative sources are tried
+first and the statistical detector only runs when none of them answers:
+
+1. Byte order mark (a BOM always wins, as in browsers)
+2. charset parameter of the Content-Type header
+3. <meta charset> / <meta http-equiv="Content-Type"> in the first 1024 bytes
+4. Strict UTF-8 decode (succeeds for UTF-8 and plain ASCII pages)
+5. charset-normalizer, the detector behind requests' apparent_encoding
+
+Counters record which step resolved each page, so the statistics show how
+often the expensive detector actually ran.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import codecs
+import re
+import threading
+from typing import Optional, Tuple
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+
+# Resolution steps, in the order they are tried
+ENCODING_SOURCES = ('bom', 'header', 'meta', 'utf-8', 'detector', 'fallback')
+
+# Longest first: the UTF-32 LE mark starts with the UTF-16 LE mark
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?\s*([^"\';\s]+)', re.IGNORECASE)
+# Matches both <meta charset="x"> and <meta http-equiv=... content="text/html; charset=x">
+_META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_:.+-]+)', re.IGNORECASE)
+
+# Labels browsers decode differently from Python's codec of the same name
+_BROWSER_ALIASES = {
+    'ascii': 'cp1252',
+    'latin-1': 'cp1252',
+    'iso8859-1': 'cp1252',
+}
+
+# Used when the detector is missing or gives up; it decodes any byte sequence
+FALLBACK_ENCODING = 'cp1252'
+
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """Python codec name for a charset label, or None if the label is unknown."""
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip()).name
+    except LookupError:
+        return None
+    return _BROWSER_ALIASES.get(name, name)
+
+
+def header_encoding(content_type: Optional[str]) -> Optional[str]:
+    """Encoding named by a Content-Type header's charset parameter."""
+    if not content_type:
+        return None
+    match = _HEADER_CHARSET.search(content_type)
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def bom_encoding(body: bytes) -> Optional[str]:
+    """Encoding indicated by a leading byte order mark."""
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return encoding
+    return None
+
+
+def meta_encoding(body: bytes, prescan_bytes: int = 1024) -> Optional[str]:
+    """Encoding declared by a <meta> tag near the start of the document."""
+    match = _META_CHARSET.search(body, 0, prescan_bytes)
+    if not match:
+        return None
+    encoding = normalize_encoding(match.group(1).decode('ascii'))
+    # A meta tag readable as ASCII cannot be in UTF-16/32; browsers read UTF-8 instead
+    if encoding and encoding.startswith(('utf-16', 'utf-32')):
+        return 'utf-8'
+    return encoding
+
+
+def detect_encoding(body: bytes) -> Optional[str]:
+    """Statistical detection over the whole body (the expensive step)."""
+    if charset_normalizer is None:
+        return None
+    best = charset_normalizer.from_bytes(body).best()
+    return normalize_encoding(best.encoding) if best else None
+
+
+class CharsetResolver:
+    """
+    Resolves and decodes response bodies, counting which step answered.
+    
+    Counters in `stats` (one per entry of ENCODING_SOURCES):
+    - bom, header, meta: declared encodings, no scan of the body
+    - utf-8:             no declaration, body is valid UTF-8
+    - detector:          charset-normalizer had to analyse the body
+    - fallback:          nothing matched, decoded as cp1252
+    """
+    
+    def __init__(self, prescan_bytes: int = 1024):
+        """
+        Initialize the resolver.
+        
+        Args:
+            prescan_bytes: How far into the body to look for a <meta> charset
+        """
+        self.prescan_bytes = prescan_bytes
+        self._lock = threading.Lock()
+        self.stats = {source: 0 for source in ENCODING_SOURCES}
+    
+    def record(self, key: str, amount: int = 1):
+        """Add amount to counter key."""
+        with self._lock:
+            self.stats[key] += amount
+    
+    def _resolve(self, body: bytes, content_type: Optional[str]) -> Tuple[str, str, Optional[str]]:
+        """Return (encoding, source, decoded text if the UTF-8 check already produced it)."""
+        encoding = bom_encoding(body)
+        if encoding:
+            return encoding, 'bom', None
+        
+        encoding = header_encoding(content_type)
+        if encoding:
+            return encoding, 'header', None
+        
+        encoding = meta_encoding(body, self.prescan_bytes)
+        if encoding:
+            return encoding, 'meta', None
+        
+        try:
+            return 'utf-8', 'utf-8', body.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+        
+        encoding = detect_encoding(body)
+        if encoding:
+            return encoding, 'detector', None
+        return FALLBACK_ENCODING, 'fallback', None
+    
+    def resolve(self, body: bytes, content_type: Optional[str] = None) -> str:
+        """
+        Return the encoding to decode body with.
+        
+        Args:
+            body: Raw response body
+            content_type: Content-Type header value, if any
+        """
+        encoding, source, _ = self._resolve(body, content_type)
+        self.record(source)
+        return encoding
+    
+    def decode(self, body: bytes, content_type: Optional[str] = None) -> str:
+        """Return body decoded with its resolved encoding (undecodable bytes replaced)."""
+        encoding, source, text = self._resolve(body, content_type)
+        self.record(source)
+        if text is None:
+            text = body.decode(encoding, errors='replace')
+        # The BOM is a marker, not part of the document
+        return text[1:] if source == 'bom' and text.startswith('\ufeff') else text
+    
+    def summary(self) -> str:
+        """One-line description of the counters for statistics output."""
+        declared = self.stats['bom'] + self.stats['header'] + self.stats['meta']
+        return (f"{declared} declared, {self.stats['utf-8']} UTF-8, "
+                f"{self.stats['detector']} detector runs, {self.stats['fallback']} fallback")
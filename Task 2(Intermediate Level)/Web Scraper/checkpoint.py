@@ -0,0 +1,179 @@
+"""
+Crawl Checkpoints for ShadowFox
+===============================
+Persistent, incremental checkpoints for AdvancedWebScraper. The crawl is
+journaled to a local SQLite file: every URL that enters the frontier,
+every URL that finishes, each extracted page record and the latest
+statistics. Each flush only appends what changed since the previous one,
+so checkpointing stays cheap on long crawls, and a restarted crawl can
+rebuild its seen-set, frontier, stats and results from the journal.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pushed (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, depth INTEGER);
+CREATE TABLE IF NOT EXISTS done (url TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pages (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, record TEXT);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url);
+"""
+
+
+def checkpoint_path(directory: Path, target_url: str) -> Path:
+    """Return the checkpoint file used for crawls of target_url."""
+    host = re.sub(r'[^A-Za-z0-9._-]', '_', urlparse(target_url).netloc) or 'crawl'
+    digest = hashlib.sha1(target_url.encode('utf-8')).hexdigest()[:8]
+    return directory / f'crawl_{host}_{digest}.sqlite'
+
+
+class CrawlCheckpoint:
+    """
+    Append-only crawl journal with periodic flushes.
+    
+    The crawler reports events as they happen (record_push, record_done);
+    they are buffered in memory and written together with any new page
+    records and the current stats whenever flush() runs.
+    """
+    
+    def __init__(self, path: Path, interval: float = 60.0, fresh: bool = False):
+        """
+        Initialize the checkpoint.
+        
+        Args:
+            path: SQLite file holding the journal
+            interval: Minimum seconds between automatic flushes
+            fresh: Discard any existing journal at path
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        if fresh:
+            for suffix in ('', '-wal', '-shm'):
+                Path(str(self.path) + suffix).unlink(missing_ok=True)
+        
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pushed: List[Tuple[str, int]] = []
+        self._done: List[str] = []
+        self._pages_written = self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        self._last_flush = time.monotonic()
+        
+        self.flushes = 0
+    
+    @property
+    def exists(self) -> bool:
+        """True if the journal holds a previous crawl."""
+        return self._conn.execute('SELECT 1 FROM pushed LIMIT 1').fetchone() is not None
+    
+    def record_push(self, url: str, depth: int):
+        """Journal a URL entering the frontier."""
+        with self._buffer_lock:
+            self._pushed.append((url, depth))
+    
+    def record_done(self, url: str):
+        """Journal a URL whose crawl has finished (successfully or not)."""
+        with self._buffer_lock:
+            self._done.append(url)
+    
+    def due(self) -> bool:
+        """True if the flush interval has elapsed."""
+        return self.interval > 0 and time.monotonic() - self._last_flush >= self.interval
+    
+    def flush(self, stats: Dict[str, Any], records, meta: Optional[Dict[str, Any]] = None,
+              blocking: bool = True) -> bool:
+        """
+        Write everything recorded since the previous flush.
+        
+        Args:
+            stats: JSON-serializable stats snapshot
+            records: Append-only record store (ResultSink); only its unwritten tail is stored
+            meta: Extra metadata to store (target URL, depth limit, ...)
+            blocking: Wait for a concurrent flush instead of skipping
+        
+        Returns:
+            True if this call performed the flush
+        """
+        if not self._flush_lock.acquire(blocking=blocking):
+            return False
+        
+        try:
+            with self._buffer_lock:
+                pushed, self._pushed = self._pushed, []
+                done, self._done = self._done, []
+            
+            new_records = records.since(self._pages_written)
+            
+            with self._conn:
+                self._conn.executemany('INSERT INTO pushed (url, depth) VALUES (?, ?)', pushed)
+                self._conn.executemany('INSERT OR IGNORE INTO done (url) VALUES (?)',
+                                       ((url,) for url in done))
+                self._conn.executemany(
+                    'INSERT INTO pages (url, record) VALUES (?, ?)',
+                    ((record.get('url'), json.dumps(record, ensure_ascii=False)) for record in new_records)
+                )
+                entries = dict(meta or {})
+                entries['stats'] = stats
+                entries['updated_at'] = time.time()
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                    ((key, json.dumps(value, default=str)) for key, value in entries.items())
+                )
+            
+            self._pages_written += len(new_records)
+            if hasattr(records, 'discard_before'):
+                # Streaming sinks only hold records until they are journaled
+                records.discard_before(self._pages_written)
+            self._last_flush = time.monotonic()
+            self.flushes += 1
+            return True
+        finally:
+            self._flush_lock.release()
+    
+    def load_meta(self) -> Dict[str, Any]:
+        """Return the stored metadata."""
+        return {key: json.loads(value) for key, value in self._conn.execute('SELECT key, value FROM meta')}
+    
+    def iter_pages(self) -> Iterator[Dict]:
+        """Yield the stored page records in extraction order."""
+        for (record,) in self._conn.execute('SELECT record FROM pages ORDER BY seq'):
+            yield json.loads(record)
+    
+    def iter_pushed(self) -> Iterator[Tuple[str, int]]:
+        """Yield every URL that ever entered the frontier, in order."""
+        yield from self._conn.execute('SELECT url, depth FROM pushed ORDER BY seq')
+    
+    def iter_pending(self) -> Iterator[Tuple[str, int]]:
+        """
+        Yield frontier items that had not finished at the last flush.
+        
+        URLs that already have a stored page record count as finished, so a
+        page extracted just before a crash is not crawled twice.
+        """
+        yield from self._conn.execute(
+            'SELECT url, depth FROM pushed '
+            'WHERE url NOT IN (SELECT url FROM done) '
+            'AND url NOT IN (SELECT url FROM pages WHERE url IS NOT NULL) '
+            'ORDER BY seq'
+        )
+    
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,327 @@
+"""
+Columnar Result Export for ShadowFox
+====================================
+Writes page records to Apache Parquet or Arrow IPC files, the formats
+analytics tools (pandas, Polars, DuckDB, Spark) read natively. Records
+are buffered into row groups of row_group_size and each group is
+written as soon as it is full, so a crawl of any size is exported in
+bounded memory. Nested fields stay nested (links, images and headings
+are lists of structs, meta is a map), every column is compressed on its
+own, and a query that needs two columns reads only those two from disk.
+
+The built-in page record has a fixed schema (page_record_schema());
+other records, such as extraction schema output or WebScraperPro
+results, get theirs from the first row group.
+
+Requires the optional dependency: pip install pyarrow
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+COLUMNAR_COMPRESSIONS = {
+    'parquet': ('zstd', 'snappy', 'gzip', 'lz4', 'brotli', None),
+    'arrow': ('zstd', 'lz4', None)
+}
+
+_STOP = object()
+
+
+def columnar_path(base: Path, format: str = 'parquet') -> Path:
+    """Return base with the .parquet or .arrow suffix applied."""
+    if format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format '{format}', expected one of {list(COLUMNAR_FORMATS)}")
+    return base.with_name(base.name + COLUMNAR_FORMATS[format])
+
+
+def page_record_schema() -> 'pa.Schema':
+    """Arrow schema of an AdvancedWebScraper page record (extract_page_data output)."""
+    if pa is None:
+        raise ImportError("Columnar export requires pyarrow: pip install pyarrow")
+    
+    def pairs(*names: str) -> 'pa.DataType':
+        return pa.list_(pa.struct([(name, pa.string()) for name in names]))
+    
+    return pa.schema([
+        ('url', pa.string()),
+        ('title', pa.string()),
+        ('headings', pairs('level', 'text')),
+        ('paragraphs', pa.list_(pa.string())),
+        ('links', pairs('text', 'href')),
+        ('images', pairs('src', 'alt')),
+        ('forms', pairs('action', 'method')),
+        ('scripts', pa.list_(pa.string())),
+        ('meta', pa.map_(pa.string(), pa.string())),
+        ('timestamp', pa.string()),
+        ('duplicate_of', pa.string())
+    ])
+
+
+def _without_nulls(data_type: 'pa.DataType') -> 'pa.DataType':
+    """data_type with every null type (a column that was always empty) replaced by string."""
+    if pa.types.is_null(data_type):
+        return pa.string()
+    if pa.types.is_list(data_type):
+        return pa.list_(_without_nulls(data_type.value_type))
+    if pa.types.is_struct(data_type):
+        return pa.struct([field.with_type(_without_nulls(field.type)) for field in data_type])
+    return data_type
+
+
+def infer_schema(records: List[Dict]) -> 'pa.Schema':
+    """Arrow schema of a sample of records; columns with no value in the sample become strings."""
+    sample = pa.Table.from_pylist(records).schema
+    return pa.schema([field.with_type(_without_nulls(field.type)) for field in sample])
+
+
+class ColumnarFile:
+    """
+    Parquet or Arrow IPC file written one row group at a time.
+    
+    append() buffers records; every row_group_size records become one
+    row group (one record batch in Arrow files). Keys the schema does not
+    have are left out, missing keys are written as nulls, and a record
+    whose values do not fit the schema is skipped and counted.
+    """
+    
+    def __init__(self, path: Path, format: str = 'parquet', schema: Optional['pa.Schema'] = None,
+                 compression: Optional[str] = 'zstd', row_group_size: int = 1000):
+        """
+        Initialize the file (it is created with the first row group).
+        
+        Args:
+            path: Output file
+            format: 'parquet' or 'arrow'
+            schema: Arrow schema of the records (None infers it from the first row group)
+            compression: Column compression, one of COLUMNAR_COMPRESSIONS[format]
+            row_group_size: Records per row group
+        """
+        if pa is None:
+            raise ImportError("Columnar export requires pyarrow: pip install pyarrow")
+        if format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format '{format}', expected one of {list(COLUMNAR_FORMATS)}")
+        if compression not in COLUMNAR_COMPRESSIONS[format]:
+            raise ValueError(f"Unknown {format} compression '{compression}', "
+                             f"expected one of {list(COLUMNAR_COMPRESSIONS[format])}")
+        
+        self.path = Path(path)
+        self.format = format
+        self.schema = schema
+        self.compression = compression
+        self.row_group_size = max(1, row_group_size)
+        
+        self._rows: List[Dict] = []
+        self._writer = None
+        self._sink = None
+        self._closed = False
+        
+        self.records_written = 0
+        self.records_skipped = 0
+        self.row_groups = 0
+    
+    def append(self, record: Dict):
+        """Add a record, writing a row group once enough are buffered."""
+        if self._closed:
+            raise ValueError("append() on a closed ColumnarFile")
+        self._rows.append(record)
+        if len(self._rows) >= self.row_group_size:
+            self.flush()
+    
+    def _table(self, rows: List[Dict]) -> 'pa.Table':
+        """Convert buffered records, leaving out the ones that do not fit the schema."""
+        if self.schema is None:
+            self.schema = infer_schema(rows)
+        try:
+            return pa.Table.from_pylist(rows, schema=self.schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+            # One malformed record must not cost the whole row group
+            fitting = []
+            for row in rows:
+                try:
+                    pa.Table.from_pylist([row], schema=self.schema)
+                    fitting.append(row)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+                    self.records_skipped += 1
+            return pa.Table.from_pylist(fitting, schema=self.schema)
+    
+    def _open(self):
+        if self.format == 'parquet':
+            self._writer = pq.ParquetWriter(str(self.path), self.schema, compression=self.compression or 'none')
+        else:
+            self._sink = pa.OSFile(str(self.path), 'wb')
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = pa.ipc.new_file(self._sink, self.schema, options=options)
+    
+    def flush(self):
+        """Write the buffered records as one row group."""
+        if not self._rows:
+            return
+        table = self._table(self._rows)
+        self._rows = []
+        if not table.num_rows:
+            return
+        
+        if self._writer is None:
+            self._open()
+        if self.format == 'parquet':
+            self._writer.write_table(table, row_group_size=table.num_rows)
+        else:
+            self._writer.write_table(table)
+        self.records_written += table.num_rows
+        self.row_groups += 1
+    
+    def close(self):
+        """Write the last row group and the file footer (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+            if self._writer is None:
+                if self.schema is None:
+                    # Nothing was written and nothing says what the columns would have been
+                    return
+                self._open()
+            self._writer.close()
+        finally:
+            if self._sink is not None:
+                self._sink.close()
+            self._writer = self._sink = None
+    
+    @property
+    def bytes_written(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+    
+    def summary(self) -> str:
+        """One-line summary for the statistics output."""
+        skipped = f", {self.records_skipped} skipped" if self.records_skipped else ''
+        return (f"{self.records_written} records in {self.row_groups} row groups "
+                f"({self.format}, {self.compression or 'uncompressed'}{skipped})")
+
+
+class ColumnarWriter:
+    """
+    Background-thread ColumnarFile with bounded buffering.
+    
+    Same contract as result_writer.NDJSONWriter (write(), pending,
+    close(), error), so StreamingResultSink can feed both: record
+    conversion and compression happen off the crawl threads, and
+    producers block when the writer falls behind.
+    """
+    
+    def __init__(self, path: Path, format: str = 'parquet', schema: Optional['pa.Schema'] = None,
+                 compression: Optional[str] = 'zstd', row_group_size: int = 1000, max_pending: int = 1000):
+        """
+        Initialize the writer and start its thread.
+        
+        Args:
+            path: Output file
+            format: 'parquet' or 'arrow'
+            schema: Arrow schema of the records (None infers it from the first row group)
+            compression: Column compression, one of COLUMNAR_COMPRESSIONS[format]
+            row_group_size: Records per row group
+            max_pending: Records that may wait in memory before write() blocks
+        """
+        self.file = ColumnarFile(path, format, schema, compression, row_group_size)
+        self.path = self.file.path
+        self.compression = compression
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        # Orders write() against close(), so nothing is queued behind the stop marker
+        self._lock = threading.Lock()
+        self._closed = False
+        self.error: Optional[BaseException] = None
+        
+        self._thread = threading.Thread(target=self._run, name='columnar-writer', daemon=True)
+        self._thread.start()
+    
+    def write(self, record: Dict):
+        """Queue a record for writing, blocking while the buffer is full."""
+        with self._lock:
+            if self._closed:
+                raise ValueError("write() on a closed ColumnarWriter")
+            if self.error:
+                raise RuntimeError(f"Columnar writer failed: {self.error}") from self.error
+            self._queue.put(record)
+    
+    @property
+    def pending(self) -> int:
+        """Records waiting for the writer thread."""
+        return self._queue.qsize()
+    
+    @property
+    def full(self) -> bool:
+        """True while write() would block."""
+        return self._queue.full()
+    
+    @property
+    def records_written(self) -> int:
+        return self.file.records_written
+    
+    @property
+    def bytes_written(self) -> int:
+        return self.file.bytes_written
+    
+    def _run(self):
+        """Writer thread: append records until the stop marker arrives."""
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                return
+            if self.error:
+                # Keep draining so producers never block forever; write() reports the error
+                continue
+            try:
+                self.file.append(record)
+            except Exception as e:
+                self.error = e
+    
+    def close(self):
+        """Write everything still queued and finish the file (idempotent)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+        try:
+            # Even after a failed append, so the row groups already written get their footer
+            self.file.close()
+        except Exception as e:
+            if not self.error:
+                self.error = e
+    
+    def summary(self) -> str:
+        """One-line summary for the statistics output."""
+        return self.file.summary() + (f", failed: {self.error}" if self.error else '')
+
+
+def write_columnar(records: Iterable[Dict], path: Path, format: str = 'parquet',
+                   schema: Optional['pa.Schema'] = None, compression: Optional[str] = 'zstd',
+                   row_group_size: int = 1000) -> ColumnarFile:
+    """
+    Write records (any iterable, e.g. result_writer.iter_ndjson()) to a
+    columnar file in constant memory.
+    
+    Returns:
+        The closed ColumnarFile, for its counters
+    """
+    output = ColumnarFile(path, format, schema, compression, row_group_size)
+    for record in records:
+        output.append(record)
+    output.close()
+    return output
@@ -0,0 +1,192 @@
+"""
+Concurrent Crawl State for ShadowFox
+====================================
+Thread-safe building blocks for the crawl engines: a visited set with
+atomic claim-a-URL semantics, striped statistics counters and an
+append-only result sink. Locks are split into stripes so that many
+worker threads rarely contend on the same one.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import itertools
+import sys
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+DEFAULT_STRIPES = 16
+
+
+class VisitedSet:
+    """
+    Lock-striped set of URLs.
+    
+    claim() is the only way a worker should mark a URL as taken: it adds
+    the URL and reports whether this caller was the one that added it, so
+    exactly one worker ever fetches a given URL.
+    """
+    
+    def __init__(self, urls: Iterable[str] = (), stripes: int = DEFAULT_STRIPES):
+        """
+        Initialize the visited set.
+        
+        Args:
+            urls: URLs that are already visited
+            stripes: Number of independently locked shards
+        """
+        self._shards = [(threading.Lock(), set()) for _ in range(max(1, stripes))]
+        for url in urls:
+            self.claim(url)
+    
+    def _shard(self, url: str):
+        return self._shards[hash(url) % len(self._shards)]
+    
+    def claim(self, url: str) -> bool:
+        """
+        Atomically mark url as visited.
+        
+        Returns:
+            True if the caller claimed the URL, False if it was already taken
+        """
+        lock, urls = self._shard(url)
+        with lock:
+            if url in urls:
+                return False
+            urls.add(url)
+            return True
+    
+    def add(self, url: str):
+        """Mark url as visited (set-compatible alias of claim)."""
+        self.claim(url)
+    
+    def __contains__(self, url: str) -> bool:
+        # A lone membership test is atomic under the GIL; no lock needed
+        return url in self._shard(url)[1]
+    
+    def __len__(self) -> int:
+        return sum(len(urls) for _, urls in self._shards)
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over a consistent snapshot of every shard."""
+        for lock, urls in self._shards:
+            with lock:
+                snapshot = list(urls)
+            yield from snapshot
+    
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the shards and the URL strings."""
+        return sum(sys.getsizeof(urls) + sum(sys.getsizeof(url) for url in urls)
+                   for _, urls in self._shards)
+
+
+class CrawlStats:
+    """
+    Statistics dictionary whose counters are striped per thread.
+    
+    Each thread is assigned one stripe on first use and increments only
+    that stripe's counters, so hot-path increments never contend across
+    workers; reading a counter sums the stripes. Non-counter entries (such
+    as start_time/end_time) behave like plain dictionary values.
+    """
+    
+    def __init__(self, counters: Iterable[str], values: Optional[Dict[str, Any]] = None,
+                 stripes: int = DEFAULT_STRIPES):
+        """
+        Initialize the statistics.
+        
+        Args:
+            counters: Names of the integer counters
+            values: Initial non-counter entries
+            stripes: Number of independently locked counter stripes
+        """
+        self._counter_names = list(counters)
+        self._stripes = [(threading.Lock(), dict.fromkeys(self._counter_names, 0))
+                         for _ in range(max(1, stripes))]
+        self._values: Dict[str, Any] = dict(values or {})
+        
+        self._local = threading.local()
+        self._next_stripe = itertools.count()
+    
+    def _stripe(self):
+        """Return the calling thread's stripe, assigning one round-robin on first use."""
+        index = getattr(self._local, 'index', None)
+        if index is None:
+            index = self._local.index = next(self._next_stripe) % len(self._stripes)
+        return self._stripes[index]
+    
+    def increment(self, key: str, amount: int = 1):
+        """Atomically add amount to counter key."""
+        lock, counts = self._stripe()
+        with lock:
+            counts[key] += amount
+    
+    def keys(self) -> List[str]:
+        return self._counter_names + list(self._values)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._counter_names or key in self._values
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._values[key]
+        if key not in self._counter_names:
+            raise KeyError(key)
+        
+        total = 0
+        for lock, counts in self._stripes:
+            with lock:
+                total += counts[key]
+        return total
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._counter_names:
+            self._values[key] = value
+            return
+        
+        # Resetting a counter: fold the new value into the first stripe
+        for index, (lock, counts) in enumerate(self._stripes):
+            with lock:
+                counts[key] = value if index == 0 else 0
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+    
+    def copy(self) -> Dict[str, Any]:
+        """Return a plain dictionary snapshot of all counters and values."""
+        return {key: self[key] for key in self.keys()}
+
+
+class ResultSink:
+    """
+    Append-only, thread-safe store for extracted page records.
+    
+    Workers only ever append; readers iterate over a snapshot, so export
+    can run while the crawl is still producing records.
+    """
+    
+    def __init__(self):
+        self._records: List[Dict] = []
+        self._lock = threading.Lock()
+    
+    def append(self, record: Dict):
+        """Add one page record."""
+        with self._lock:
+            self._records.append(record)
+    
+    def snapshot(self) -> List[Dict]:
+        """Return a copy of the records collected so far."""
+        with self._lock:
+            return list(self._records)
+    
+    def since(self, index: int) -> List[Dict]:
+        """Return the records appended after the first `index` ones."""
+        with self._lock:
+            return self._records[index:]
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.snapshot())
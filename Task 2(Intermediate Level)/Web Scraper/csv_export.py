@@ -0,0 +1,138 @@
+"""
+Streaming CSV Export for ShadowFox
+==================================
+Writes records of any shape to CSV in constant memory. Records may come
+from any iterable (a list, scrape_many(), result_writer.iter_ndjson()),
+so a crawl's millions of link rows never have to be held at once.
+
+The columns are either given or discovered from the first sample_size
+records: every key seen there becomes a column, in first-seen order, so
+records with different keys share one header instead of failing on the
+first key record 0 did not have. Nested dicts are flattened into dotted
+columns (metadata.title), lists are written as JSON text, and keys that
+only show up after the sample are left out. Rows go through a single
+csv.writer into a large file buffer, so the disk sees big writes.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import csv
+import itertools
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+CSV_SAMPLE_SIZE = 1000
+CSV_BUFFER_SIZE = 1024 * 1024
+
+_NESTED = (dict, list, tuple)
+
+
+def flatten_record(record: Dict, prefix: str = '', out: Optional[Dict] = None) -> Dict:
+    """
+    Flatten nested dicts into dotted keys; lists become JSON text.
+    
+    {'metadata': {'title': 'X'}, 'tags': ['a', 'b']} ->
+    {'metadata.title': 'X', 'tags': '["a", "b"]'}
+    """
+    if out is None:
+        out = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flatten_record(value, name + '.', out)
+        elif isinstance(value, (list, tuple)):
+            out[name] = json.dumps(value, ensure_ascii=False)
+        else:
+            out[name] = value
+    return out
+
+
+def discover_columns(sample: Iterable[Dict], flatten: bool = True) -> List[str]:
+    """Union of the (flattened) keys of sample, in first-seen order."""
+    columns: Dict[str, None] = {}
+    for record in sample:
+        columns.update(dict.fromkeys(flatten_record(record) if flatten else record))
+    return list(columns)
+
+
+def iter_link_rows(pages: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    One row per link of every page, for link exports of any size.
+    
+    Accepts WebScraperPro results (content.links) and crawl records
+    (links); pages without links, such as errors, are passed over.
+    """
+    for page in pages:
+        links = page.get('links')
+        if links is None:
+            links = page.get('content', {}).get('links') or ()
+        for link in links:
+            if isinstance(link, dict):
+                yield {'page': page.get('url'), **link}
+            else:
+                yield {'page': page.get('url'), 'href': link}
+
+
+class CSVExport:
+    """Counters of a finished write_csv() call."""
+    
+    def __init__(self, path: Path, columns: List[str], flattened: bool):
+        self.path = Path(path)
+        self.columns = columns
+        self.flattened = flattened
+        self.rows_written = 0
+    
+    @property
+    def bytes_written(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+    
+    def summary(self) -> str:
+        """One-line summary for the log output."""
+        return (f"{self.rows_written} rows, {len(self.columns)} columns"
+                f"{', flattened' if self.flattened else ''}")
+
+
+def write_csv(records: Iterable[Dict], path: Path, columns: Optional[Sequence[str]] = None,
+              sample_size: int = CSV_SAMPLE_SIZE, buffer_size: int = CSV_BUFFER_SIZE,
+              flatten: Optional[bool] = None) -> CSVExport:
+    """
+    Write records to path as CSV in constant memory.
+    
+    Args:
+        records: Dicts to write (any iterable; consumed once)
+        path: Output file
+        columns: Header and column order (None discovers them from the first sample_size records)
+        sample_size: Records buffered for column discovery
+        buffer_size: Bytes buffered before each write to disk
+        flatten: Flatten nested values (None: only if the sample has any, or a column is dotted)
+    
+    Returns:
+        The CSVExport with its row count (no file is written when there is
+        nothing to export and no columns were given)
+    """
+    records = iter(records)
+    sample = list(itertools.islice(records, max(1, sample_size))) if columns is None or flatten is None else []
+    if flatten is None:
+        flatten = (any(isinstance(value, _NESTED) for record in sample for value in record.values())
+                   or any('.' in column for column in columns or ()))
+    if columns is None:
+        columns = discover_columns(sample, flatten)
+    export = CSVExport(path, list(columns), flatten)
+    if not export.columns:
+        return export
+    
+    def rows(records: Iterable[Dict]) -> Iterator[Iterable]:
+        # map(record.get, ...) keeps the per-row work in C; missing keys become empty cells
+        for record in records:
+            if flatten:
+                record = flatten_record(record)
+            export.rows_written += 1
+            yield map(record.get, export.columns)
+    
+    with open(path, 'w', newline='', encoding='utf-8', buffering=max(buffer_size, 8192)) as f:
+        writer = csv.writer(f)
+        writer.writerow(export.columns)
+        writer.writerows(rows(itertools.chain(sample, records)))
+    return export
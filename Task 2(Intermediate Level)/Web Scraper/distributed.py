@@ -0,0 +1,338 @@
+"""
+Multi-Domain Crawling for ShadowFox
+===================================
+Crawls many sites at once with a coordinator and N local worker
+processes. Hosts are sharded across the workers by a stable hash of the
+host, so every host belongs to exactly one process: its frontier,
+seen-set and politeness state (rate limiter, robots.txt) never leave
+that process. Each worker crawls several of its hosts concurrently,
+one AdvancedWebScraper per host.
+
+Workers send page records back over a multiprocessing queue in
+batches; the coordinator writes them all to a single NDJSON file. With
+one process per core, throughput scales with the cores of the machine
+instead of being capped by one interpreter.
+
+Usage:
+    crawler = DistributedCrawler(['https://a.example/', 'https://b.example/'], workers=4)
+    crawler.start_crawling()
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from advanced_scraper import AdvancedScraperConfig, AdvancedWebScraper, Colors, create_columnar_writer, print_banner
+from result_writer import NDJSONWriter, ndjson_path, write_json_envelope
+
+
+# Per-host counters reported by the workers and summed by the coordinator
+HOST_COUNTERS = ('urls_crawled', 'urls_found', 'data_extracted', 'errors', 'urls_rejected', 'bytes_downloaded',
+                 'retries')
+
+
+def host_of(url: str) -> str:
+    """Lower-case host[:port] of a URL, the unit of sharding."""
+    return urlsplit(url.strip()).netloc.lower()
+
+
+def host_shard(host: str, shards: int) -> int:
+    """Stable shard of a host: the same in every process and every run."""
+    digest = hashlib.blake2b(host.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+
+def config_snapshot() -> Dict[str, Any]:
+    """AdvancedScraperConfig settings, to reproduce in worker processes."""
+    return {name: value for name, value in vars(AdvancedScraperConfig).items() if name.isupper()}
+
+
+class QueueResultSink:
+    """
+    Result sink of a worker: page records go to the coordinator in batches.
+    
+    Implements the part of the ResultSink interface the scraper uses
+    while crawling (append and len).
+    """
+    
+    def __init__(self, results, batch_size: int = 100):
+        """
+        Initialize the sink.
+        
+        Args:
+            results: multiprocessing queue read by the coordinator
+            batch_size: Records sent per message
+        """
+        self.results = results
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._batch: List[Dict] = []
+        self._count = 0
+    
+    def append(self, record: Dict):
+        """Queue one page record for the coordinator."""
+        with self._lock:
+            self._count += 1
+            self._batch.append(record)
+            if len(self._batch) < self.batch_size:
+                return
+            batch, self._batch = self._batch, []
+        self.results.put(('records', batch))
+    
+    def close(self):
+        """Send the records still batched."""
+        with self._lock:
+            batch, self._batch = self._batch, []
+        if batch:
+            self.results.put(('records', batch))
+    
+    def __len__(self) -> int:
+        return self._count
+
+
+def crawl_host(seeds: List[str], results, options: Dict[str, Any], batch_size: int):
+    """Crawl one host in the calling worker and report its counters."""
+    sink = QueueResultSink(results, batch_size)
+    started = time.monotonic()
+    counters = dict.fromkeys(HOST_COUNTERS, 0)
+    error = None
+    try:
+        scraper = AdvancedWebScraper(seeds[0], result_sink=sink, **options)
+        try:
+            for seed in seeds[1:]:
+                url = scraper.canonicalizer.canonicalize(seed)
+                if url:
+                    scraper.enqueue(url, 0)
+            scraper.run_crawl()
+        finally:
+            scraper.close()
+        counters = {key: scraper.stats[key] for key in HOST_COUNTERS}
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        sink.close()
+    results.put(('host', host_of(seeds[0]), counters, time.monotonic() - started, error))
+
+
+def worker_main(shard: int, config: Dict[str, Any], tasks, results, options: Dict[str, Any],
+                hosts_per_worker: int, batch_size: int):
+    """
+    Worker process: crawl the hosts the coordinator assigns until it sends None.
+    
+    Distributed crawls are not checkpointed; console output of the
+    per-host scrapers is discarded (the crawler log still records it).
+    """
+    for name, value in config.items():
+        setattr(AdvancedScraperConfig, name, value)
+    AdvancedScraperConfig.CHECKPOINT_INTERVAL = 0
+    AdvancedScraperConfig.PROGRESS_INTERVAL = 0
+    AdvancedScraperConfig.METRICS_PORT = 0
+    
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=hosts_per_worker, thread_name_prefix=f'shard{shard}') as pool:
+            while True:
+                seeds = tasks.get()
+                if seeds is None:
+                    break
+                pool.submit(crawl_host, seeds, results, options, batch_size)
+    results.put(('done', shard))
+
+
+class DistributedCrawler:
+    """
+    Coordinator of a multi-domain crawl.
+    
+    Seeds are grouped by host and each host is sent to the worker
+    host_shard() picks. The coordinator then only merges: it writes
+    record batches to one NDJSON file and sums the per-host counters.
+    """
+    
+    def __init__(self, seeds: Iterable[str], workers: Optional[int] = None, max_depth: int = 2,
+                 max_threads: int = 4, hosts_per_worker: Optional[int] = None,
+                 max_pages: Optional[int] = None, batch_size: Optional[int] = None):
+        """
+        Initialize the coordinator.
+        
+        Args:
+            seeds: Start URLs; every distinct host is crawled as one site
+            workers: Worker processes (default: one per core)
+            max_depth: Maximum crawling depth per host
+            max_threads: Fetching threads per host
+            hosts_per_worker: Hosts each worker crawls at the same time
+            max_pages: Page budget per host (0 for no limit)
+            batch_size: Page records per message from a worker to the coordinator
+        """
+        self.hosts: Dict[str, List[str]] = {}
+        for seed in seeds:
+            self.hosts.setdefault(host_of(seed), []).append(seed)
+        if not self.hosts:
+            raise ValueError("DistributedCrawler needs at least one seed URL")
+        
+        self.workers = min(workers or AdvancedScraperConfig.DISTRIBUTED_WORKERS or os.cpu_count() or 1,
+                           len(self.hosts))
+        self.hosts_per_worker = hosts_per_worker or AdvancedScraperConfig.DISTRIBUTED_HOSTS_PER_WORKER
+        self.batch_size = batch_size or AdvancedScraperConfig.DISTRIBUTED_BATCH_SIZE
+        self.options = {'max_depth': max_depth, 'max_threads': max_threads, 'max_pages': max_pages}
+        
+        self.host_stats: Dict[str, Dict[str, Any]] = {}
+        self.shard_hosts = [0] * self.workers
+        self.records_written = 0
+        self.output_path: Optional[Path] = None
+        self.columnar = None
+        self.duration = 0.0
+    
+    def shard_of(self, host: str) -> int:
+        """Worker that owns a host."""
+        return host_shard(host, self.workers)
+    
+    def run_crawl(self) -> Path:
+        """
+        Start the workers, hand out the hosts and merge the results.
+        
+        Returns:
+            Path of the merged NDJSON file
+        """
+        AdvancedScraperConfig.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.output_path = ndjson_path(AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{timestamp}',
+                                       AdvancedScraperConfig.RESULT_COMPRESSION)
+        writer = NDJSONWriter(self.output_path, compression=AdvancedScraperConfig.RESULT_COMPRESSION,
+                              max_pending=AdvancedScraperConfig.RESULT_BUFFER_SIZE,
+                              fsync=AdvancedScraperConfig.RESULT_FSYNC,
+                              fsync_interval=AdvancedScraperConfig.RESULT_FSYNC_INTERVAL)
+        self.columnar = create_columnar_writer(AdvancedScraperConfig.OUTPUT_DIR / f'crawl_results_{timestamp}')
+        
+        # spawn: workers start from a clean interpreter, so the config snapshot is all they inherit
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue(maxsize=self.workers * 64)
+        tasks = [context.Queue() for _ in range(self.workers)]
+        config = config_snapshot()
+        processes = [
+            context.Process(target=worker_main, name=f'shadowfox-shard-{shard}',
+                            args=(shard, config, tasks[shard], results, self.options,
+                                  self.hosts_per_worker, self.batch_size))
+            for shard in range(self.workers)
+        ]
+        
+        started = time.monotonic()
+        for process in processes:
+            process.start()
+        for host, seeds in self.hosts.items():
+            shard = self.shard_of(host)
+            self.shard_hosts[shard] += 1
+            tasks[shard].put(seeds)
+        for task_queue in tasks:
+            task_queue.put(None)
+        
+        try:
+            self._merge(results, processes, writer)
+        finally:
+            writer.close()
+            if self.columnar:
+                self.columnar.close()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self.duration = time.monotonic() - started
+        return self.output_path
+    
+    def _merge(self, results, processes: List, writer: NDJSONWriter):
+        """Write record batches and collect host counters until every worker is done."""
+        pending = set(range(len(processes)))
+        while pending:
+            try:
+                message = results.get(timeout=1.0)
+            except queue.Empty:
+                # A worker that died without saying goodbye will never send its 'done'
+                for shard in list(pending):
+                    if processes[shard].exitcode is not None:
+                        pending.discard(shard)
+                continue
+            
+            kind = message[0]
+            if kind == 'records':
+                for record in message[1]:
+                    writer.write(record)
+                    if self.columnar:
+                        self.columnar.write(record)
+                self.records_written += len(message[1])
+            elif kind == 'host':
+                _, host, counters, duration, error = message
+                self.host_stats[host] = {**counters, 'duration': duration, 'error': error}
+                print(f"{Colors.GREEN}[✓]{Colors.RESET} {host}: {counters['urls_crawled']} pages "
+                      f"in {duration:.1f}s" + (f" ({Colors.RED}{error}{Colors.RESET})" if error else ''))
+            elif kind == 'done':
+                pending.discard(message[1])
+    
+    def totals(self) -> Dict[str, int]:
+        """Counters summed over all hosts."""
+        return {key: sum(stats[key] for stats in self.host_stats.values()) for key in HOST_COUNTERS}
+    
+    def pages_per_second(self) -> float:
+        return self.totals()['urls_crawled'] / self.duration if self.duration else 0.0
+    
+    def start_crawling(self):
+        """Run the crawl with console output, merged exports and statistics."""
+        print_banner()
+        print(f"\n{Colors.MAGENTA}TARGETS:{Colors.RESET} {len(self.hosts)} hosts")
+        print(f"{Colors.BLUE}[!] Worker Processes: {self.workers}{Colors.RESET}")
+        print(f"{Colors.BLUE}[!] Hosts per Worker: {self.hosts_per_worker} at a time{Colors.RESET}")
+        print(f"{Colors.BLUE}[!] Max Depth: {self.options['max_depth']}{Colors.RESET}\n")
+        
+        output = self.run_crawl()
+        print(f"\n{Colors.GREEN}[✓] Results streamed to: {output}{Colors.RESET}")
+        if AdvancedScraperConfig.WRITE_JSON_ENVELOPE:
+            json_file = output.with_name(output.name.split('.ndjson')[0] + '.json')
+            write_json_envelope(output, json_file, {'targets': list(self.hosts), 'stats': self.totals()})
+            print(f"{Colors.GREEN}[✓] Results exported to: {json_file}{Colors.RESET}")
+        if self.columnar and not self.columnar.error:
+            print(f"{Colors.GREEN}[✓] Columnar results exported to: {self.columnar.path}{Colors.RESET}")
+        self.print_statistics()
+    
+    def print_statistics(self):
+        """Print merged crawl statistics."""
+        totals = self.totals()
+        failed = sum(1 for stats in self.host_stats.values() if stats['error'])
+        
+        print(f"\n{Colors.CYAN}{'=' * 80}{Colors.RESET}")
+        print(f"{Colors.BOLD}DISTRIBUTED CRAWLING STATISTICS{Colors.RESET}")
+        print(f"{Colors.CYAN}{'=' * 80}{Colors.RESET}")
+        print(f"Hosts Crawled:        {len(self.host_stats)} of {len(self.hosts)} ({failed} failed)")
+        print(f"Hosts per Worker:     {', '.join(str(count) for count in self.shard_hosts)}")
+        print(f"URLs Crawled:         {totals['urls_crawled']}")
+        print(f"URLs Discovered:      {totals['urls_found']}")
+        print(f"Records Written:      {self.records_written}")
+        if self.columnar:
+            print(f"Columnar Export:      {self.columnar.summary()}")
+        print(f"Bytes Downloaded:     {totals['bytes_downloaded']:,}")
+        print(f"Errors:               {totals['errors']}")
+        print(f"Retried Fetches:      {totals['retries']}")
+        print(f"Duration:             {self.duration:.2f} seconds")
+        print(f"Average Speed:        {self.pages_per_second():.2f} pages/second")
+        print(f"{Colors.CYAN}{'=' * 80}{Colors.RESET}\n")
+
+
+def main():
+    """Crawl several sites at once."""
+    crawler = DistributedCrawler(
+        ['http://quotes.toscrape.com/', 'http://books.toscrape.com/'],
+        max_depth=1
+    )
+    crawler.start_crawling()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Single-Pass HTML Extraction for ShadowFox
+=========================================
+Extraction engine shared by WebScraperPro and AdvancedWebScraper. The
+parsed document is walked exactly once; every element is dispatched by
+tag name to the field handlers that registered for it, and each handler
+builds one field of the output record. This replaces one find_all()
+traversal of the whole tree per field while producing the same records
+(including their ordering).
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+
+class FieldHandler:
+    """
+    Builds one field of an extracted record.
+    
+    Subclasses list the tag names they want in `tags`, create their
+    per-document state in start(), receive matching elements in visit()
+    and turn the state into the field value in finish().
+    """
+    
+    tags: Tuple[str, ...] = ()
+    
+    def start(self) -> Any:
+        """Return fresh per-document state."""
+        return []
+    
+    def visit(self, element, state: Any):
+        """Handle one matching element."""
+        raise NotImplementedError
+    
+    def finish(self, state: Any) -> Any:
+        """Return the field value."""
+        return state
+
+
+class TitleField(FieldHandler):
+    """Text of the first <title>."""
+    
+    tags = ('title',)
+    
+    def start(self):
+        return [None]
+    
+    def visit(self, element, state):
+        if state[0] is None:
+            state[0] = element.get_text(strip=True)
+    
+    def finish(self, state):
+        return state[0]
+
+
+class HeadingsField(FieldHandler):
+    """Non-empty headings as {'level', 'text'}, grouped by level in `levels` order."""
+    
+    def __init__(self, levels: Iterable[str] = ('h1', 'h2', 'h3')):
+        self.tags = tuple(levels)
+    
+    def start(self):
+        return {level: [] for level in self.tags}
+    
+    def visit(self, element, state):
+        text = element.get_text(strip=True)
+        if text:
+            state[element.name].append({'level': element.name, 'text': text})
+    
+    def finish(self, state):
+        return [heading for level in self.tags for heading in state[level]]
+
+
+class ParagraphsField(FieldHandler):
+    """Paragraph texts longer than min_length characters."""
+    
+    tags = ('p',)
+    
+    def __init__(self, min_length: int = 20):
+        self.min_length = min_length
+    
+    def visit(self, element, state):
+        text = element.get_text(strip=True)
+        if len(text) > self.min_length:
+            state.append(text)
+
+
+class LinksField(FieldHandler):
+    """Raw anchors as {'text', 'href'}."""
+    
+    tags = ('a',)
+    
+    def visit(self, element, state):
+        href = element.get('href')
+        if href is not None:
+            state.append({'text': element.get_text(strip=True), 'href': href})
+
+
+class ImagesField(FieldHandler):
+    """Images as {'src', 'alt'}."""
+    
+    tags = ('img',)
+    
+    def visit(self, element, state):
+        state.append({'src': element.get('src', ''), 'alt': element.get('alt', '')})
+
+
+class FormsField(FieldHandler):
+    """Forms as {'action', 'method'}."""
+    
+    tags = ('form',)
+    
+    def visit(self, element, state):
+        state.append({'action': element.get('action', ''), 'method': element.get('method', 'get')})
+
+
+class ScriptsField(FieldHandler):
+    """src of external scripts."""
+    
+    tags = ('script',)
+    
+    def visit(self, element, state):
+        src = element.get('src')
+        if src is not None:
+            state.append(src)
+
+
+class MetaField(FieldHandler):
+    """All <meta name|property=... content=...> pairs (later tags win)."""
+    
+    tags = ('meta',)
+    
+    def start(self):
+        return {}
+    
+    def visit(self, element, state):
+        name = element.get('name') or element.get('property')
+        content = element.get('content')
+        if name and content:
+            state[name] = content
+
+
+class MetaLookupField(FieldHandler):
+    """content of the first <meta> whose `attribute` equals `value` (None if empty)."""
+    
+    tags = ('meta',)
+    
+    def __init__(self, attribute: str, value: str):
+        self.attribute = attribute
+        self.value = value
+    
+    def start(self):
+        return {'found': False, 'content': None}
+    
+    def visit(self, element, state):
+        if not state['found'] and element.get(self.attribute) == self.value:
+            state['found'] = True
+            state['content'] = element.get('content') or None
+    
+    def finish(self, state):
+        return state['content']
+
+
+class ResolvedLinksField(FieldHandler):
+    """Non-empty anchors resolved against base_url, flagged internal/external."""
+    
+    tags = ('a',)
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.base_netloc = urlparse(base_url).netloc
+    
+    def visit(self, element, state):
+        href = element.get('href')
+        if href is None:
+            return
+        text = element.get_text(strip=True)
+        href = urljoin(self.base_url, href)
+        if text and href:
+            state.append({
+                'text': text,
+                'url': href,
+                'is_internal': urlparse(href).netloc == self.base_netloc
+            })
+
+
+class ResolvedImagesField(FieldHandler):
+    """Images with src resolved against base_url, plus alt and title."""
+    
+    tags = ('img',)
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+    
+    def visit(self, element, state):
+        state.append({
+            'src': urljoin(self.base_url, element.get('src', '')),
+            'alt': element.get('alt', ''),
+            'title': element.get('title', '')
+        })
+
+
+class ListsField(FieldHandler):
+    """
+    Item texts of every <ul>/<ol> in document order (empty lists dropped).
+    
+    An <li> belongs to every list it is nested in, so nested lists show up
+    both on their own and inside their parents, as with find_all('li').
+    """
+    
+    tags = ('ul', 'ol', 'li')
+    
+    def start(self):
+        return {}
+    
+    def visit(self, element, state):
+        if element.name != 'li':
+            state[id(element)] = []
+            return
+        
+        owners = [state[id(parent)] for parent in element.parents
+                  if parent.name in ('ul', 'ol') and id(parent) in state]
+        if owners:
+            text = element.get_text(strip=True)
+            for items in owners:
+                items.append(text)
+    
+    def finish(self, state):
+        return [items for items in state.values() if items]
+
+
+class PageExtractor:
+    """
+    Walks a parsed document once and feeds each element to the field
+    handlers registered for its tag name.
+    
+    Usage:
+        extractor = PageExtractor({'title': TitleField(), 'links': LinksField()})
+        record = extractor.extract(soup)
+    """
+    
+    def __init__(self, fields: Optional[Dict[str, FieldHandler]] = None):
+        """
+        Initialize the extractor.
+        
+        Args:
+            fields: Output key -> handler, in output order
+        """
+        self.fields: Dict[str, FieldHandler] = {}
+        self._dispatch: Dict[str, List[Tuple[str, FieldHandler]]] = {}
+        for key, handler in (fields or {}).items():
+            self.register(key, handler)
+    
+    def register(self, key: str, handler: FieldHandler):
+        """Add a field to the output record."""
+        self.fields[key] = handler
+        for tag in handler.tags:
+            self._dispatch.setdefault(tag, []).append((key, handler))
+    
+    def extract(self, soup, url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return {key: value} for every registered field.
+        
+        url is accepted for parity with ExtractionSchema.extract(); the
+        handlers that resolve links get their base URL when created.
+        """
+        states = {key: handler.start() for key, handler in self.fields.items()}
+        dispatch = self._dispatch
+        
+        for element in soup.descendants:
+            # Text nodes have no name; only tags someone asked for are dispatched
+            handlers = dispatch.get(element.name)
+            if handlers:
+                for key, handler in handlers:
+                    handler.visit(element, states[key])
+        
+        return {key: handler.finish(states[key]) for key, handler in self.fields.items()}
+
+
+def page_data_fields() -> Dict[str, FieldHandler]:
+    """Fields of an AdvancedWebScraper page record."""
+    return {
+        'title': TitleField(),
+        'headings': HeadingsField(('h1', 'h2', 'h3')),
+        'paragraphs': ParagraphsField(),
+        'links': LinksField(),
+        'images': ImagesField(),
+        'forms': FormsField(),
+        'scripts': ScriptsField(),
+        'meta': MetaField()
+    }
+
+
+def metadata_fields() -> Dict[str, FieldHandler]:
+    """Fields of WebScraperPro.extract_metadata."""
+    return {
+        'title': TitleField(),
+        'description': MetaLookupField('name', 'description'),
+        'keywords': MetaLookupField('name', 'keywords'),
+        'author': MetaLookupField('name', 'author'),
+        'og_title': MetaLookupField('property', 'og:title'),
+        'og_description': MetaLookupField('property', 'og:description'),
+        'og_image': MetaLookupField('property', 'og:image')
+    }
+
+
+def content_fields(base_url: str) -> Dict[str, FieldHandler]:
+    """Fields of WebScraperPro.extract_content."""
+    return {
+        'headings': HeadingsField(('h1', 'h2', 'h3', 'h4', 'h5', 'h6')),
+        'paragraphs': ParagraphsField(),
+        'links': ResolvedLinksField(base_url),
+        'images': ResolvedImagesField(base_url),
+        'lists': ListsField()
+    }
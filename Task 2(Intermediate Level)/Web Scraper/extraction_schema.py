@@ -0,0 +1,441 @@
+"""
+Declarative Extraction Schemas for ShadowFox
+============================================
+Lets a site's fields be described in a JSON or YAML file instead of
+code. A schema maps output keys to selectors and post-processors:
+
+    name: books
+    fields:
+      title: h1                              # shorthand for {css: h1}
+      price: {css: p.price_color, post: [number]}
+      stock: {xpath: "//p[@class='instock availability']", post: [squash]}
+      cover: {css: "#product_gallery img", attr: src, post: [absolute_url]}
+      related:
+        css: article.product_pod
+        many: true
+        fields:
+          name: {css: h3 a, attr: title}
+          link: {css: h3 a, attr: href, post: [absolute_url]}
+
+Each field takes:
+
+- css or xpath: where the value is (nested fields use the language of
+  their parent; a nested field without a selector reads the parent element)
+- attr: attribute to read ('text' by default, 'html' for the markup)
+- many: every match as a list instead of the first match
+- post: post-processors applied in order to each value, as "name",
+  "name:argument" or {name: argument}; see POST_PROCESSORS
+- default: value when nothing matches (None, or [] for many)
+- fields: nested fields; the value becomes a record per matched element
+
+A schema is compiled once: CSS selectors by soupsieve (or handed to
+lexbor on the selectolax backend), XPath expressions by lxml, and
+post-processors resolved. Applying it runs one query per field, so a
+schema that asks for two fields costs two queries rather than a walk
+over every element of the page. ExtractionSchema.extract() has the same
+shape as PageExtractor.extract(), so a schema can stand in for the
+built-in page fields anywhere a PageExtractor is used.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import copy
+import functools
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+import soupsieve
+
+from parsers import SelectolaxDocument, SelectolaxElement
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    etree = None
+    lxml_html = None
+
+
+# What AdvancedWebScraper follows when a schema does not collect links itself
+LINKS_FIELD = {'css': 'a[href]', 'many': True, 'fields': {'text': {}, 'href': {'attr': 'href'}}}
+
+_FIELD_KEYS = frozenset(('css', 'xpath', 'attr', 'many', 'post', 'default', 'fields'))
+_NUMBER = re.compile(r'-?\d[\d,]*(?:\.\d+)?|-?\.\d+')
+_WHITESPACE = re.compile(r'\s+')
+# 'tag' and 'tag[attribute]': answered by BeautifulSoup's find_all() instead of soupsieve's matcher
+_SIMPLE_SELECTOR = re.compile(r'^\s*([a-zA-Z][\w-]*)(?:\[([\w-]+)\])?\s*$')
+
+
+class SchemaError(ValueError):
+    """A schema that cannot be compiled; the message names the offending field."""
+
+
+def _to_number(text: str) -> Union[int, float, None]:
+    """First number in text ('£1,299.50' -> 1299.5), or None."""
+    match = _NUMBER.search(text)
+    if match is None:
+        return None
+    number = match.group().replace(',', '')
+    return float(number) if '.' in number else int(number)
+
+
+def _to_type(kind: type) -> Callable[[Any], Any]:
+    def convert(value):
+        try:
+            return kind(value.strip() if isinstance(value, str) else value)
+        except (TypeError, ValueError):
+            return None
+    return convert
+
+
+def _regex(pattern: str) -> Callable[[Any], Any]:
+    """First capture group (or the whole match) of pattern, None if it does not match."""
+    compiled = re.compile(pattern, re.S)
+    
+    def search(value):
+        match = compiled.search(value)
+        if match is None:
+            return None
+        return match.group(1) if compiled.groups else match.group()
+    return search
+
+
+def _replace(arg: List[str]) -> Callable[[Any], Any]:
+    if not isinstance(arg, (list, tuple)) or len(arg) != 2:
+        raise SchemaError("replace takes [old, new]")
+    old, new = arg
+    return lambda value: value.replace(old, new)
+
+
+# name -> factory(argument) returning value -> value; absolute_url is handled per page
+POST_PROCESSORS: Dict[str, Callable[[Any], Callable[[Any], Any]]] = {
+    'strip': lambda chars: lambda value: value.strip(chars),
+    'lower': lambda _: str.lower,
+    'upper': lambda _: str.upper,
+    'squash': lambda _: lambda value: _WHITESPACE.sub(' ', value).strip(),
+    'int': lambda _: _to_type(int),
+    'float': lambda _: _to_type(float),
+    'number': lambda _: _to_number,
+    'regex': _regex,
+    'replace': _replace,
+    'split': lambda sep: lambda value: [part.strip() for part in value.split(sep) if part.strip()]
+}
+
+
+def register_post_processor(name: str, factory: Callable[[Any], Callable[[Any], Any]]):
+    """Make a post-processor available to schemas compiled from now on."""
+    POST_PROCESSORS[name] = factory
+
+
+class SchemaField:
+    """One compiled field: its query, what to read from the matches and how to clean it."""
+    
+    __slots__ = ('name', 'language', 'selector', 'query', 'find', 'attr', 'many', 'post', 'default', 'children')
+    
+    def __init__(self, name: str, language: Optional[str], selector: Optional[str], query,
+                 attr: str, many: bool, post: List[Any], default: Any, children: Optional[List['SchemaField']]):
+        self.name = name
+        self.language = language
+        self.selector = selector
+        self.query = query
+        self.find = None
+        simple = _SIMPLE_SELECTOR.match(selector) if language == 'css' else None
+        if simple:
+            tag, attribute = simple.groups()
+            self.find = (tag.lower(), {attribute: True} if attribute else {})
+        self.attr = attr
+        self.many = many
+        self.post = post
+        self.default = default
+        self.children = children
+    
+    def empty(self) -> Any:
+        """Value of the field when nothing matched."""
+        if self.default is not None:
+            return copy.deepcopy(self.default)
+        return [] if self.many else None
+
+
+def _compile_post(steps, path: str) -> List[Any]:
+    """Resolve post-processor specs into callables ('absolute_url' stays a marker)."""
+    if isinstance(steps, (str, dict)):
+        steps = [steps]
+    compiled = []
+    for index, step in enumerate(steps or ()):
+        if isinstance(step, dict):
+            if len(step) != 1:
+                raise SchemaError(f"{path}.post[{index}]: expected a single {{name: argument}}")
+            (name, arg), = step.items()
+        else:
+            name, _, arg = str(step).partition(':')
+            arg = arg or None
+        
+        if name == 'absolute_url':
+            compiled.append(name)
+            continue
+        factory = POST_PROCESSORS.get(name)
+        if factory is None:
+            raise SchemaError(f"{path}.post[{index}]: unknown post-processor {name!r}")
+        try:
+            compiled.append(factory(arg))
+        except (SchemaError, re.error, TypeError) as e:
+            raise SchemaError(f"{path}.post[{index}]: {e}") from None
+    return compiled
+
+
+def _compile_field(name: str, spec: Any, path: str, parent_language: Optional[str]) -> SchemaField:
+    """Compile one field spec (and its nested fields)."""
+    if isinstance(spec, str):
+        spec = {'css': spec}
+    if not isinstance(spec, dict):
+        raise SchemaError(f"{path}: expected a selector or a mapping, got {type(spec).__name__}")
+    unknown = set(spec) - _FIELD_KEYS
+    if unknown:
+        raise SchemaError(f"{path}: unknown keys {sorted(unknown)}")
+    if 'css' in spec and 'xpath' in spec:
+        raise SchemaError(f"{path}: give css or xpath, not both")
+    
+    language = 'css' if 'css' in spec else 'xpath' if 'xpath' in spec else None
+    selector = spec.get(language) if language else None
+    if language is None and parent_language is None:
+        raise SchemaError(f"{path}: top-level fields need a css or xpath selector")
+    if language and parent_language and language != parent_language:
+        raise SchemaError(f"{path}: nested fields must use their parent's selector language ({parent_language})")
+    
+    query = None
+    if language == 'css':
+        try:
+            query = soupsieve.compile(selector)
+        except Exception as e:
+            reason = str(e).splitlines()[0]
+            raise SchemaError(f"{path}: invalid CSS selector {selector!r}: {reason}") from None
+    elif language == 'xpath':
+        if etree is None:
+            raise SchemaError(f"{path}: XPath selectors need lxml (pip install lxml)")
+        try:
+            query = etree.XPath(selector)
+        except etree.XPathSyntaxError as e:
+            raise SchemaError(f"{path}: invalid XPath {selector!r}: {e}") from None
+    
+    children = None
+    if 'fields' in spec:
+        if 'attr' in spec or 'post' in spec:
+            raise SchemaError(f"{path}: a field with nested fields takes no attr or post")
+        if not isinstance(spec['fields'], dict) or not spec['fields']:
+            raise SchemaError(f"{path}.fields: expected a non-empty mapping")
+        children = [_compile_field(child, child_spec, f"{path}.{child}", language or parent_language)
+                    for child, child_spec in spec['fields'].items()]
+    
+    return SchemaField(
+        name=name,
+        language=language,
+        selector=selector,
+        query=query,
+        attr=spec.get('attr', 'text'),
+        many=bool(spec.get('many', False)),
+        post=_compile_post(spec.get('post'), path),
+        default=spec.get('default'),
+        children=children
+    )
+
+
+def _lxml_text(element) -> str:
+    """get_text(strip=True) of an lxml element."""
+    return ''.join(part.strip() for part in element.itertext())
+
+
+class ExtractionSchema:
+    """
+    A compiled schema; extract(document, url) returns {field: value}.
+    
+    Usage:
+        schema = load_schema('schemas/books.yaml')
+        record = schema.extract(parse_html(html), url)
+    
+    Works on every parser backend. Picklable (it is sent to the parse
+    processes as its spec and recompiled there).
+    """
+    
+    def __init__(self, spec: Dict[str, Any]):
+        """
+        Compile a schema.
+        
+        Args:
+            spec: {'name': ..., 'fields': {key: field spec}}
+        
+        Raises:
+            SchemaError: Malformed schema, bad selector or unknown post-processor
+        """
+        if not isinstance(spec, dict) or not isinstance(spec.get('fields'), dict) or not spec['fields']:
+            raise SchemaError("a schema needs a non-empty 'fields' mapping")
+        self.spec = spec
+        self.name = spec.get('name', 'schema')
+        self.fields = [_compile_field(key, field_spec, f"fields.{key}", None)
+                       for key, field_spec in spec['fields'].items()]
+        self._needs_lxml = any(field.language == 'xpath' for field in self.fields)
+    
+    def __getstate__(self):
+        return {'spec': self.spec}
+    
+    def __setstate__(self, state):
+        self.__init__(state['spec'])
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.spec['fields']
+    
+    def with_field(self, key: str, field_spec: Any) -> 'ExtractionSchema':
+        """This schema if it has `key`, otherwise a copy with the field appended."""
+        if key in self:
+            return self
+        return ExtractionSchema({**self.spec, 'fields': {**self.spec['fields'], key: field_spec}})
+    
+    def empty_record(self) -> Dict[str, Any]:
+        """The record of a page on which nothing matched."""
+        return {field.name: field.empty() for field in self.fields}
+    
+    def extract(self, document, url: Optional[str] = None, html: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compute the schema's fields for one parsed page.
+        
+        Args:
+            document: Tree from parse_html() (any backend)
+            url: Page URL, base of the absolute_url post-processor
+            html: The page's markup, if at hand; XPath fields otherwise
+                  serialize the tree to build their lxml document
+        """
+        lxml_root = None
+        if self._needs_lxml:
+            if html is None:
+                html = document.tree.html if isinstance(document, SelectolaxDocument) else str(document)
+            lxml_root = lxml_html.document_fromstring(html) if html.strip() else None
+        
+        lexbor = document if isinstance(document, SelectolaxDocument) else None
+        record = {}
+        for field in self.fields:
+            context = lxml_root if field.language == 'xpath' else document
+            record[field.name] = self._field(field, context, lexbor, url)
+        return record
+    
+    def _matches(self, field: SchemaField, context, lexbor: Optional[SelectolaxDocument]) -> List[Any]:
+        """Elements (or XPath strings) the field's query selects in context."""
+        if context is None:
+            return []
+        if field.language == 'xpath':
+            found = field.query(context)
+            if not isinstance(found, list):
+                # Scalar XPath results (count(), string(), ...)
+                return [] if found is None or found == '' else [found]
+            return found if field.many else found[:1]
+        
+        if lexbor is None:
+            if field.find is not None:
+                tag, attrs = field.find
+                if field.many:
+                    return context.find_all(tag, attrs=attrs)
+                match = context.find(tag, attrs=attrs)
+            elif field.many:
+                return field.query.select(context)
+            else:
+                match = field.query.select_one(context)
+            return [] if match is None else [match]
+        
+        node = context.node if isinstance(context, SelectolaxElement) else context.tree
+        if field.many:
+            return [lexbor.wrap(match) for match in node.css(field.selector)]
+        match = node.css_first(field.selector)
+        return [] if match is None else [lexbor.wrap(match)]
+    
+    def _field(self, field: SchemaField, context, lexbor: Optional[SelectolaxDocument], url: Optional[str]) -> Any:
+        """Value of one field within context (a document or a matched element)."""
+        matches = self._matches(field, context, lexbor) if field.selector else [context]
+        
+        values = []
+        for element in matches:
+            if field.children is not None:
+                value = {child.name: self._field(child, element, lexbor, url) for child in field.children}
+            else:
+                value = self._post(field, self._read(field, element, lexbor), url)
+            if value is not None:
+                values.append(value)
+        
+        if field.many:
+            return values if values else field.empty()
+        return values[0] if values else field.empty()
+    
+    @staticmethod
+    def _read(field: SchemaField, element, lexbor: Optional[SelectolaxDocument]) -> Any:
+        """Raw value of a matched element: its text, markup or an attribute."""
+        if etree is not None and isinstance(element, etree._Element):
+            if field.attr == 'text':
+                return _lxml_text(element)
+            if field.attr == 'html':
+                return lxml_html.tostring(element, encoding='unicode', with_tail=False)
+            return element.get(field.attr)
+        if isinstance(element, (str, int, float, bool)):
+            # XPath text(), @attribute and scalar results are values already
+            return str(element) if isinstance(element, str) else element
+        
+        if field.attr == 'text':
+            return element.get_text(strip=True)
+        if field.attr == 'html':
+            return element.node.html if lexbor is not None else str(element)
+        return element.get(field.attr)
+    
+    @staticmethod
+    def _post(field: SchemaField, value: Any, url: Optional[str]) -> Any:
+        """Run the post-processors; a step that yields None drops the value."""
+        for step in field.post:
+            if value is None:
+                break
+            if step == 'absolute_url':
+                value = urljoin(url, value) if url else value
+            else:
+                value = step(value)
+        return value
+    
+    def summary(self) -> str:
+        """One-line description for logs."""
+        languages = sorted({field.language for field in self.fields})
+        return f"schema '{self.name}': {len(self.fields)} fields ({', '.join(languages)})"
+
+
+def read_schema(path: Union[str, Path]) -> Dict[str, Any]:
+    """Parse a .json, .yaml or .yml schema file."""
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        if yaml is None:
+            raise SchemaError(f"{path}: YAML schemas need PyYAML (pip install pyyaml)")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_cached(path: str, mtime: float) -> ExtractionSchema:
+    return ExtractionSchema(read_schema(path))
+
+
+def load_schema(path: Union[str, Path]) -> ExtractionSchema:
+    """
+    Compile a schema file, reusing the compiled plan while the file is unchanged.
+    
+    Raises:
+        SchemaError: Malformed schema (the message starts with the file name)
+        OSError: The file cannot be read
+    """
+    path = Path(path).resolve()
+    try:
+        return _load_cached(str(path), path.stat().st_mtime)
+    except SchemaError as e:
+        if str(e).startswith(str(path)):
+            raise
+        raise SchemaError(f"{path}: {e}") from None
@@ -0,0 +1,187 @@
+"""
+Fetch Limits for ShadowFox
+==========================
+Guards page downloads against bodies the scrapers cannot use. Responses
+are requested with stream=True so only the headers have arrived when the
+checks run: a non-HTML Content-Type or a Content-Length above the limit
+is rejected before any of the body is read, and bodies without a length
+are read in chunks and abandoned as soon as they cross the limit. An
+optional HEAD request lets a crawl skip such URLs without opening a GET.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import threading
+from typing import Iterable, Mapping
+
+import requests
+
+
+# Reasons a response is rejected, as counted in FetchLimits.stats
+REJECT_REASONS = ('content_type', 'too_large')
+
+
+class ResponseRejected(Exception):
+    """A response was refused because of its type or size."""
+    
+    def __init__(self, url: str, reason: str, detail: str):
+        super().__init__(f"{url}: {detail}")
+        self.url = url
+        self.reason = reason
+        self.detail = detail
+
+
+class FetchLimits:
+    """
+    Content-Type and body size checks for streamed responses.
+    
+    Counters in `stats`:
+    - content_type:   rejected for a Content-Type outside allowed_types
+    - too_large:      rejected for a declared or streamed size above max_bytes
+    - head_requests:  HEAD requests sent before a GET
+    """
+    
+    def __init__(self, max_bytes: int = 10 * 1024 * 1024,
+                 allowed_types: Iterable[str] = ('text/html', 'application/xhtml+xml'),
+                 head_first: bool = False, chunk_size: int = 64 * 1024):
+        """
+        Initialize the limits.
+        
+        Args:
+            max_bytes: Largest body read, in bytes (0 disables the limit)
+            allowed_types: Accepted media types; responses without a Content-Type are accepted
+            head_first: Send a HEAD request and check its headers before every GET
+            chunk_size: Bytes read per chunk while streaming a body
+        """
+        self.max_bytes = max_bytes
+        self.allowed_types = tuple(media_type.lower() for media_type in allowed_types)
+        self.head_first = head_first
+        self.chunk_size = chunk_size
+        
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(REJECT_REASONS + ('head_requests',), 0)
+    
+    def record(self, key: str, amount: int = 1):
+        """Add amount to counter key."""
+        with self._lock:
+            self.stats[key] += amount
+    
+    def _reject(self, url: str, reason: str, detail: str) -> ResponseRejected:
+        self.record(reason)
+        return ResponseRejected(url, reason, detail)
+    
+    def check_headers(self, url: str, headers: Mapping[str, str]):
+        """
+        Check the response headers before any of the body is read.
+        
+        Raises:
+            ResponseRejected: Disallowed Content-Type or Content-Length above max_bytes
+        """
+        content_type = headers.get('Content-Type')
+        if content_type and self.allowed_types:
+            media_type = content_type.split(';', 1)[0].strip().lower()
+            if media_type not in self.allowed_types:
+                raise self._reject(url, 'content_type', f"Content-Type {media_type} is not HTML")
+        
+        length = headers.get('Content-Length')
+        if self.max_bytes and length and length.isdigit() and int(length) > self.max_bytes:
+            raise self._reject(url, 'too_large', f"Content-Length {int(length):,} exceeds {self.max_bytes:,} bytes")
+    
+    def _check_size(self, url: str, size: int):
+        if self.max_bytes and size > self.max_bytes:
+            raise self._reject(url, 'too_large', f"body exceeds {self.max_bytes:,} bytes")
+    
+    def get(self, session: requests.Session, url: str, **kwargs) -> requests.Response:
+        """
+        Send the optional HEAD check, then a streamed GET.
+        
+        Only the GET's headers have been read when this returns; call
+        read_body() to check them and read the body.
+        
+        Raises:
+            ResponseRejected: The HEAD response was rejected
+        """
+        if self.head_first:
+            self.record('head_requests')
+            head = session.head(url, **kwargs)
+            head.close()
+            if head.ok:
+                self.check_headers(url, head.headers)
+        
+        return session.get(url, stream=True, **kwargs)
+    
+    def read_body(self, response: requests.Response) -> bytes:
+        """
+        Check a streamed response and read its body up to max_bytes.
+        
+        The body is stored on the response, so response.content and
+        response.text work as usual afterwards. A rejected response is
+        closed without reading the rest of its body.
+        
+        Raises:
+            ResponseRejected: Disallowed type, or the body is too large
+        """
+        url = response.url
+        try:
+            self.check_headers(url, response.headers)
+            if response._content_consumed:
+                # Served from the HTTP cache, already in memory
+                self._check_size(url, len(response.content))
+                return response.content
+            
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(self.chunk_size):
+                size += len(chunk)
+                self._check_size(url, size)
+                chunks.append(chunk)
+        except ResponseRejected:
+            response.close()
+            raise
+        
+        response._content = b''.join(chunks)
+        response._content_consumed = True
+        if hasattr(response, 'cache_store'):
+            # Only bodies that passed the limits go into the HTTP cache
+            response.cache_store()
+        return response._content
+    
+    def check_cached(self, url: str, headers: Mapping[str, str], body: bytes):
+        """
+        The checks of read_body() for a body served from the HTTP cache.
+        
+        Raises:
+            ResponseRejected: Disallowed type, or the body is too large
+        """
+        self.check_headers(url, headers)
+        self._check_size(url, len(body))
+    
+    async def head_async(self, session, url: str, **kwargs):
+        """The optional HEAD check of get() for an aiohttp session."""
+        if not self.head_first:
+            return
+        self.record('head_requests')
+        async with session.head(url, **kwargs) as head:
+            if head.status < 400:
+                self.check_headers(url, head.headers)
+    
+    async def read_body_async(self, response) -> bytes:
+        """read_body() for an aiohttp response."""
+        url = str(response.url)
+        self.check_headers(url, response.headers)
+        
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            size += len(chunk)
+            if self.max_bytes and size > self.max_bytes:
+                response.close()
+                raise self._reject(url, 'too_large', f"body exceeds {self.max_bytes:,} bytes")
+            chunks.append(chunk)
+        return b''.join(chunks)
+    
+    def summary(self) -> str:
+        """One-line description of the counters for statistics output."""
+        return (f"{self.stats['content_type']} non-HTML, {self.stats['too_large']} too large, "
+                f"{self.stats['head_requests']} HEAD requests")
@@ -0,0 +1,404 @@
+"""
+URL Frontier Backends for ShadowFox
+===================================
+Memory-bounded frontier and seen-set backends for large crawls. URLs are
+deduplicated when they are enqueued, so the queue never holds the same
+URL twice, and the seen-set can be swapped for an approximate or
+disk-backed implementation when an exact in-memory set would not fit.
+
+Backends:
+- memory: exact in-memory set (crawl_state.VisitedSet) and deque
+- bloom:  scalable Bloom filter with a configurable false-positive rate
+- sqlite: SQLite seen-set plus a queue that spills to disk past a limit
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from collections import deque
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from crawl_state import VisitedSet
+
+
+FRONTIER_BACKENDS = ('memory', 'bloom', 'sqlite')
+
+
+def temporary_database(prefix: str) -> str:
+    """Create an empty temporary SQLite file and return its path."""
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix='.sqlite')
+    os.close(fd)
+    return path
+
+
+def remove_database(path: str):
+    """Delete an SQLite file together with its WAL/SHM side files."""
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
+
+
+def deque_memory_bytes(queue: Deque[Tuple[str, int]]) -> int:
+    """Approximate memory held by a deque of (url, depth) items."""
+    total = sys.getsizeof(queue)
+    for url, depth in queue:
+        total += sys.getsizeof((url, depth)) + sys.getsizeof(url)
+    return total
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a blake2b digest."""
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def add(self, item: str) -> bool:
+        """Set item's bits; return True if at least one bit was previously unset."""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+
+class BloomSeenSet:
+    """
+    Scalable Bloom filter seen-set.
+    
+    Starts with one filter sized for `capacity` URLs; whenever the newest
+    filter is full a larger one (with a tighter error rate) is added, so
+    the overall false-positive rate stays below `error_rate` regardless of
+    crawl size. A false positive means a never-seen URL is skipped.
+    """
+    
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001,
+                 growth: int = 2, tightening: float = 0.5):
+        """
+        Initialize the seen-set.
+        
+        Args:
+            capacity: Expected number of URLs in the first filter
+            error_rate: Target overall false-positive probability
+            growth: Capacity multiplier for each additional filter
+            tightening: Error-rate multiplier for each additional filter
+        """
+        self.growth = growth
+        self.tightening = tightening
+        self._filters: List[BloomFilter] = [BloomFilter(capacity, error_rate * (1 - tightening))]
+        self._lock = threading.Lock()
+    
+    def claim(self, url: str) -> bool:
+        """Atomically mark url as seen; return False if it (probably) was already."""
+        with self._lock:
+            if any(url in bloom for bloom in self._filters):
+                return False
+            
+            current = self._filters[-1]
+            if current.count >= current.capacity:
+                current = BloomFilter(current.capacity * self.growth,
+                                      current.error_rate * self.tightening)
+                self._filters.append(current)
+            current.add(url)
+            return True
+    
+    def add(self, url: str):
+        self.claim(url)
+    
+    def __contains__(self, url: str) -> bool:
+        return any(url in bloom for bloom in self._filters)
+    
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self._filters)
+    
+    def __iter__(self) -> Iterator[str]:
+        raise TypeError("A Bloom filter cannot enumerate its URLs")
+    
+    def memory_bytes(self) -> int:
+        return sum(len(bloom.bits) for bloom in self._filters)
+
+
+class SQLiteSeenSet:
+    """
+    Disk-backed exact seen-set.
+    
+    URLs live in a WITHOUT ROWID table keyed by the URL itself, so memory
+    use stays flat no matter how many URLs are recorded. Inserts are
+    committed in batches to keep the per-URL cost low.
+    """
+    
+    def __init__(self, path: Optional[str] = None, commit_every: int = 1000):
+        """
+        Initialize the seen-set.
+        
+        Args:
+            path: Database file (a temporary file if omitted)
+            commit_every: Number of inserts between commits
+        """
+        self._temporary = path is None
+        self.path = path or temporary_database('shadowfox_seen_')
+        self.commit_every = commit_every
+        
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._count = self._conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+    
+    def claim(self, url: str) -> bool:
+        """Atomically mark url as seen; return False if it already was."""
+        with self._lock:
+            cursor = self._conn.execute('INSERT OR IGNORE INTO seen (url) VALUES (?)', (url,))
+            if cursor.rowcount == 0:
+                return False
+            
+            self._count += 1
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+            return True
+    
+    def add(self, url: str):
+        self.claim(url)
+    
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM seen WHERE url = ?', (url,)).fetchone() is not None
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._conn.commit()
+        
+        # A separate connection reads a stable snapshot while claims continue
+        reader = sqlite3.connect(self.path)
+        try:
+            for (url,) in reader.execute('SELECT url FROM seen'):
+                yield url
+        finally:
+            reader.close()
+    
+    def memory_bytes(self) -> int:
+        """Bytes used on disk by the seen table."""
+        with self._lock:
+            page_size = self._conn.execute('PRAGMA page_size').fetchone()[0]
+            page_count = self._conn.execute('PRAGMA page_count').fetchone()[0]
+        return page_size * page_count
+    
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+        if self._temporary:
+            remove_database(self.path)
+
+
+class DiskSpillQueue:
+    """
+    FIFO queue of (url, depth) items that keeps at most `max_in_memory`
+    items in RAM and spills the rest to an SQLite table, preserving order.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_in_memory: int = 100_000):
+        """
+        Initialize the queue.
+        
+        Args:
+            path: Database file (a temporary file if omitted)
+            max_in_memory: Items kept in memory before spilling to disk
+        """
+        self._temporary = path is None
+        self.path = path or temporary_database('shadowfox_queue_')
+        self.max_in_memory = max(1, max_in_memory)
+        
+        self._head: Deque[Tuple[str, int]] = deque()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS queue '
+                           '(id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, depth INTEGER)')
+        self._spilled = self._conn.execute('SELECT COUNT(*) FROM queue').fetchone()[0]
+    
+    def append(self, item: Tuple[str, int]):
+        # Once anything is on disk, new items must queue behind it to stay FIFO
+        if not self._spilled and len(self._head) < self.max_in_memory:
+            self._head.append(item)
+            return
+        self._conn.execute('INSERT INTO queue (url, depth) VALUES (?, ?)', item)
+        self._spilled += 1
+    
+    def _refill(self):
+        """Move the oldest spilled items back into memory."""
+        rows = self._conn.execute('SELECT id, url, depth FROM queue ORDER BY id LIMIT ?',
+                                  (self.max_in_memory // 2 or 1,)).fetchall()
+        if not rows:
+            self._spilled = 0
+            return
+        self._conn.execute('DELETE FROM queue WHERE id <= ?', (rows[-1][0],))
+        self._spilled -= len(rows)
+        self._head.extend((url, depth) for _, url, depth in rows)
+    
+    def popleft(self) -> Tuple[str, int]:
+        if not self._head and self._spilled:
+            self._refill()
+        return self._head.popleft()
+    
+    def __len__(self) -> int:
+        return len(self._head) + self._spilled
+    
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        yield from list(self._head)
+        yield from ((url, depth) for url, depth in
+                    self._conn.execute('SELECT url, depth FROM queue ORDER BY id'))
+    
+    def memory_bytes(self) -> int:
+        return deque_memory_bytes(self._head)
+    
+    def close(self):
+        self._conn.close()
+        if self._temporary:
+            remove_database(self.path)
+
+
+class URLFrontier:
+    """
+    Crawl frontier that deduplicates at enqueue time.
+    
+    push() claims the URL in the seen-set and only queues it if the claim
+    succeeded, so the queue never holds duplicates and every URL is handed
+    out at most once. Exposes the deque subset (append/popleft/len) the
+    crawl schedulers use.
+    """
+    
+    def __init__(self, seen=None, queue=None):
+        """
+        Initialize the frontier.
+        
+        Args:
+            seen: Seen-set backend (exact in-memory set if omitted)
+            queue: FIFO queue backend (deque if omitted)
+        """
+        self.seen = seen if seen is not None else VisitedSet()
+        self.queue = queue if queue is not None else deque()
+    
+    def push(self, url: str, depth: int, lastmod: Optional[str] = None) -> bool:
+        """
+        Queue url unless it has been seen before; return True if queued.
+        
+        lastmod (the page's sitemap <lastmod>) is only used by frontiers
+        that order URLs by score, see priority.py.
+        """
+        if not self.seen.claim(url):
+            return False
+        self.queue.append((url, depth))
+        return True
+    
+    def requeue(self, item: Tuple[str, int]):
+        """Queue an item whose URL is already claimed (restoring a checkpoint)."""
+        self.queue.append(item)
+    
+    def append(self, item: Tuple[str, int]):
+        self.push(*item)
+    
+    def popleft(self) -> Tuple[str, int]:
+        return self.queue.popleft()
+    
+    def __len__(self) -> int:
+        return len(self.queue)
+    
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return iter(self.queue)
+    
+    def __contains__(self, url: str) -> bool:
+        return url in self.seen
+    
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the seen-set and the in-memory queue."""
+        queue_bytes = (self.queue.memory_bytes() if hasattr(self.queue, 'memory_bytes')
+                       else deque_memory_bytes(self.queue))
+        return self.seen.memory_bytes() + queue_bytes
+    
+    def bytes_per_url(self) -> float:
+        """Frontier bytes per URL seen so far."""
+        return self.memory_bytes() / max(len(self.seen), 1)
+    
+    def close(self):
+        """Release any files held by the backends."""
+        for backend in (self.seen, self.queue):
+            if hasattr(backend, 'close'):
+                backend.close()
+
+
+def create_seen_set(backend: str = 'memory', bloom_capacity: int = 1_000_000,
+                    bloom_error_rate: float = 0.001, directory: Optional[str] = None):
+    """
+    Build the seen-set of the named backend.
+    
+    Args:
+        backend: One of FRONTIER_BACKENDS
+        bloom_capacity: Initial Bloom filter capacity (bloom backend)
+        bloom_error_rate: Target false-positive rate (bloom backend)
+        directory: Where the SQLite file is created (a temporary file if omitted)
+    """
+    if backend == 'memory':
+        return VisitedSet()
+    if backend == 'bloom':
+        return BloomSeenSet(bloom_capacity, bloom_error_rate)
+    if backend == 'sqlite':
+        return SQLiteSeenSet(os.path.join(directory, 'frontier_seen.sqlite') if directory else None)
+    raise ValueError(f"Unknown frontier backend '{backend}', expected one of {FRONTIER_BACKENDS}")
+
+
+def create_frontier(backend: str = 'memory', bloom_capacity: int = 1_000_000,
+                    bloom_error_rate: float = 0.001, memory_limit: int = 100_000,
+                    directory: Optional[str] = None) -> URLFrontier:
+    """
+    Build a frontier for the named backend.
+    
+    Args:
+        backend: One of FRONTIER_BACKENDS
+        bloom_capacity: Initial Bloom filter capacity (bloom backend)
+        bloom_error_rate: Target false-positive rate (bloom backend)
+        memory_limit: Queue items kept in memory before spilling (bloom/sqlite backends)
+        directory: Where SQLite files are created (temporary files if omitted)
+    
+    Returns:
+        URLFrontier configured for the backend
+    """
+    seen = create_seen_set(backend, bloom_capacity, bloom_error_rate, directory)
+    if backend == 'memory':
+        return URLFrontier(seen, deque())
+    queue_path = os.path.join(directory, 'frontier_queue.sqlite') if directory else None
+    return URLFrontier(seen, DiskSpillQueue(queue_path, memory_limit))
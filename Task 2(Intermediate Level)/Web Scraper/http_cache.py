@@ -0,0 +1,322 @@
+"""
+HTTP Conditional Cache for ShadowFox
+====================================
+On-disk HTTP cache mounted under the requests.Session shared by
+WebScraperPro and AdvancedWebScraper, and consulted directly by the
+aiohttp fetch of AsyncWebScraper. Page bodies are stored together
+with their validators (ETag / Last-Modified); on the next crawl requests
+are sent with If-None-Match / If-Modified-Since and a 304 answer is
+served from disk instead of downloading the page again. Entries younger
+than the TTL are served without contacting the server at all, and the
+cache is kept under a size limit by evicting least recently used pages.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    status INTEGER,
+    headers TEXT,
+    body BLOB,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL,
+    accessed_at REAL,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+"""
+
+# Hop-by-hop or body-encoding headers that no longer describe the stored (decoded) body
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive')
+
+
+class CacheEntry:
+    """A stored response."""
+    
+    __slots__ = ('url', 'status', 'headers', 'body', 'etag', 'last_modified', 'stored_at')
+    
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes,
+                 etag: Optional[str], last_modified: Optional[str], stored_at: float):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers that revalidate this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    SQLite-backed response store with TTL freshness and size-based LRU eviction.
+    
+    Counters in `stats`:
+    - hits:         served from disk without a request (entry within TTL)
+    - revalidated:  server answered 304, body served from disk
+    - misses:       full download (no entry, changed page or no validators)
+    - bytes_saved:  body bytes that did not have to be downloaded
+    - evictions:    entries dropped to stay under max_bytes
+    
+    Lookups do not write: the access times that drive eviction are buffered
+    and written in one batch with the next store or close (or once
+    TOUCH_BATCH of them have piled up).
+    """
+    
+    TOUCH_BATCH = 1000
+    
+    def __init__(self, directory: Path, ttl: float = 0.0, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache.
+        
+        Args:
+            directory: Directory holding the cache database
+            ttl: Seconds an entry is served without revalidation (0 always revalidates)
+            max_bytes: Total body size kept before least recently used entries are evicted
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / 'http_cache.sqlite'
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        # url -> access time not yet written to the database
+        self._touched: Dict[str, float] = {}
+        
+        self.stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'bytes_saved': 0,
+            'evictions': 0
+        }
+    
+    def record(self, key: str, amount: int = 1):
+        """Add amount to counter key."""
+        with self._lock:
+            self.stats[key] += amount
+    
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+    
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the stored entry for url, marking it as recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, body, etag, last_modified, stored_at FROM entries WHERE url = ?',
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[url] = time.time()
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._flush_touches()
+                self._conn.commit()
+        
+        status, headers, body, etag, last_modified, stored_at = row
+        return CacheEntry(url, status, json.loads(headers), body, etag, last_modified, stored_at)
+    
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True if entry may be served without asking the server."""
+        return self.ttl > 0 and time.time() - entry.stored_at < self.ttl
+    
+    def storable(self, status: int, headers: Mapping[str, str]) -> bool:
+        """
+        True if a response may be stored: a 200 without no-store or Vary: *
+        that can be reused, either within the TTL or through its validators.
+        """
+        cache_control = headers.get('Cache-Control', '').lower()
+        return (status == 200
+                and 'no-store' not in cache_control
+                and headers.get('Vary', '').strip() != '*'
+                and bool(self.ttl > 0 or headers.get('ETag') or headers.get('Last-Modified')))
+    
+    def store(self, url: str, response: Response):
+        """Store a 200 requests response (body, headers and validators)."""
+        self.store_body(url, response.status_code, response.headers, response.content)
+    
+    def store_body(self, url: str, status: int, headers: Mapping[str, str], body: bytes):
+        """Store a downloaded body with its status and headers (for clients other than requests)."""
+        validators = (headers.get('ETag'), headers.get('Last-Modified'))
+        headers = {key: value for key, value in headers.items()
+                   if key.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+        
+        with self._lock:
+            self._flush_touches()
+            old = self._conn.execute('SELECT size FROM entries WHERE url = ?', (url,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries '
+                '(url, status, headers, body, etag, last_modified, stored_at, accessed_at, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(headers), body, *validators, now, now, len(body))
+            )
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+    
+    def refresh(self, entry: CacheEntry, not_modified):
+        """Restart an entry's TTL after a 304 (requests or aiohttp response), taking over any updated validators."""
+        entry.etag = not_modified.headers.get('ETag', entry.etag)
+        entry.last_modified = not_modified.headers.get('Last-Modified', entry.last_modified)
+        entry.stored_at = time.time()
+        
+        with self._lock:
+            self._touched.pop(entry.url, None)
+            self._conn.execute(
+                'UPDATE entries SET etag = ?, last_modified = ?, stored_at = ?, accessed_at = ? WHERE url = ?',
+                (entry.etag, entry.last_modified, entry.stored_at, entry.stored_at, entry.url)
+            )
+            self._conn.commit()
+    
+    def _flush_touches(self):
+        """Write the buffered access times (without committing). Caller holds the lock."""
+        if self._touched:
+            self._conn.executemany('UPDATE entries SET accessed_at = ? WHERE url = ?',
+                                   [(accessed, url) for url, accessed in self._touched.items()])
+            self._touched.clear()
+    
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes. Caller holds the lock."""
+        # Eviction order needs the reads since the last write
+        self._flush_touches()
+        while self._total_bytes > self.max_bytes:
+            victims = self._conn.execute(
+                'SELECT url, size FROM entries ORDER BY accessed_at LIMIT 64'
+            ).fetchall()
+            if not victims:
+                self._total_bytes = 0
+                return
+            for url, size in victims:
+                self._conn.execute('DELETE FROM entries WHERE url = ?', (url,))
+                self._total_bytes -= size
+                self.stats['evictions'] += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+    
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+            self._total_bytes = 0
+            self._touched.clear()
+    
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+    
+    def summary(self) -> str:
+        """One-line description of the cache counters for statistics output."""
+        return (f"{self.stats['hits']} hits, {self.stats['revalidated']} revalidated, "
+                f"{self.stats['misses']} misses, {self.stats['bytes_saved']:,} bytes saved")
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter that answers GET requests from an HTTPCache.
+    
+    Mount it on a requests.Session in place of the default adapter; the
+    scrapers' fetch code does not change. Responses served from disk carry
+    `from_cache = True` and `cache_status` ('hit' or 'revalidated').
+    Streamed responses are not stored until their body has been read and
+    their `cache_store()` is called.
+    """
+    
+    def __init__(self, cache: HTTPCache, **kwargs):
+        """
+        Initialize the adapter.
+        
+        Args:
+            cache: Response store
+            **kwargs: Passed to HTTPAdapter (pool_maxsize, max_retries, ...)
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+    
+    def _cached_response(self, request, entry: CacheEntry, cache_status: str) -> Response:
+        """Build a Response from a stored entry."""
+        response = Response()
+        response.status_code = entry.status
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(0)
+        response.from_cache = True
+        response.cache_status = cache_status
+        return response
+    
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+        
+        entry = self.cache.get(request.url)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                self.cache.record('hits')
+                self.cache.record('bytes_saved', len(entry.body))
+                return self._cached_response(request, entry, 'hit')
+            
+            request.headers.update(entry.conditional_headers())
+        
+        response = super().send(request, **kwargs)
+        
+        if response.status_code == 304 and entry is not None:
+            elapsed = response.elapsed
+            response.close()
+            self.cache.refresh(entry, response)
+            self.cache.record('revalidated')
+            self.cache.record('bytes_saved', len(entry.body))
+            
+            cached = self._cached_response(request, entry, 'revalidated')
+            cached.elapsed = elapsed
+            return cached
+        
+        self.cache.record('misses')
+        if self.cache.storable(response.status_code, response.headers):
+            if kwargs.get('stream'):
+                # The body has not been read yet; FetchLimits.read_body stores it once accepted
+                response.cache_store = lambda: self.cache.store(request.url, response)
+            else:
+                self.cache.store(request.url, response)
+        return response
@@ -0,0 +1,352 @@
+"""
+Local Test Site for ShadowFox
+=============================
+Self-contained HTTP/1.1 server that serves a synthetic, densely linked
+website on 127.0.0.1. Used to benchmark and stress the crawl engines
+without touching the network.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional, Sequence, Set
+
+
+class _TestHTTPServer(ThreadingHTTPServer):
+    """Threading server with a listen backlog deep enough for hundreds of clients."""
+    request_queue_size = 1024
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        # Crawlers abandoning an oversized download reset the connection on purpose
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+DEFAULT_LASTMOD = '2026-10-01'
+
+# Paragraphs are drawn from these words, so every page reads differently
+FILLER_WORDS = (
+    'shadowfox', 'crawler', 'frontier', 'parser', 'benchmark', 'synthetic', 'content', 'latency',
+    'request', 'response', 'header', 'session', 'thread', 'queue', 'budget', 'priority',
+    'sitemap', 'robots', 'cache', 'encoding', 'stream', 'record', 'export', 'page',
+    'link', 'anchor', 'domain', 'host', 'delay', 'retry', 'checkpoint', 'resume'
+)
+
+
+class LocalTestSite:
+    """
+    Synthetic website served from a background thread.
+    
+    Pages live at /page/<n> for n in [0, num_pages) and each links to
+    links_per_page other pages, so a crawl from /page/0 reaches the whole
+    site within a few levels. Every request is counted in `hits` and body
+    bytes sent in `bytes_sent`. With validators=True pages carry an ETag
+    and Last-Modified header and conditional requests get a 304. With
+    trap_pages > 0, page 0 also links to that many extension-less
+    downloads (/download/<k>, binary with a Content-Length) and endless
+    HTML streams (/stream/<k>, chunked), each trap_bytes long. robots_txt
+    is served at /robots.txt ('{base_url}' is filled in) and with
+    sitemap=True /sitemap.xml is an index of sitemaps listing every page,
+    with <lastmod> taken from `lastmods` (page -> date) or DEFAULT_LASTMOD.
+    With key_every > 0, every key_every-th page (except page 0) lives at
+    /product/<n> instead of /page/<n>. Every prefix in `mirrors` (such as
+    '/print') serves a near-duplicate copy of the whole site, entered from
+    a link on page 0.
+    
+    Between crawls the site can be edited for re-crawl tests: `revisions`
+    (page -> text) replaces a page's paragraphs, `removed` pages answer 404
+    and are no longer linked, and with volatile=True every page shows the
+    time it was rendered.
+    
+    For failure tests, `failures` (page -> count) makes a page answer its
+    next `count` requests with failure_status, and while `down` is set
+    every page does.
+    
+    Usage:
+        with LocalTestSite(num_pages=500, latency=0.05) as site:
+            scraper = AdvancedWebScraper(site.start_url, max_depth=5)
+    """
+    
+    def __init__(self, num_pages: int = 500, links_per_page: int = 10,
+                 latency: float = 0.0, paragraph_count: int = 5, validators: bool = False,
+                 trap_pages: int = 0, trap_bytes: int = 50 * 1024 * 1024,
+                 robots_txt: Optional[str] = None, sitemap: bool = False, sitemap_size: int = 1000,
+                 key_every: int = 0, mirrors: Sequence[str] = ()):
+        """
+        Initialize the test site.
+        
+        Args:
+            num_pages: Number of distinct pages served
+            links_per_page: Outgoing links on every page
+            latency: Artificial server delay per request in seconds
+            paragraph_count: Number of paragraphs on every page
+            validators: Send ETag/Last-Modified and answer conditional requests
+            trap_pages: Oversized non-HTML downloads and HTML streams linked from page 0
+            trap_bytes: Body size of every trap
+            robots_txt: Body of /robots.txt (404 if None)
+            sitemap: Serve a sitemap index at /sitemap.xml
+            sitemap_size: Pages listed per sitemap file
+            key_every: Serve every key_every-th page under /product/ (0 for none)
+            mirrors: Path prefixes that serve a printer-friendly copy of every page
+        """
+        self.num_pages = num_pages
+        self.links_per_page = links_per_page
+        self.latency = latency
+        self.paragraph_count = paragraph_count
+        self.validators = validators
+        self.trap_pages = trap_pages
+        self.trap_bytes = trap_bytes
+        self.robots_txt = robots_txt
+        self.sitemap = sitemap
+        self.sitemap_size = sitemap_size
+        self.key_every = key_every
+        self.mirrors = tuple(mirrors)
+        self.lastmods: Dict[int, str] = {}
+        self.revisions: Dict[int, str] = {}
+        self.removed: Set[int] = set()
+        self.volatile = False
+        self.failures: Dict[int, int] = {}
+        self.down = False
+        self.failure_status = 500
+        
+        self.hits: Counter = Counter()
+        self.bytes_sent = 0
+        self._hits_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    @property
+    def base_url(self) -> str:
+        """Root URL of the running site."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @property
+    def start_url(self) -> str:
+        """URL a crawl should start from."""
+        return f"{self.base_url}/page/0"
+    
+    def page_path(self, n: int) -> str:
+        """Path page n is served at."""
+        if self.key_every and n and n % self.key_every == 0:
+            return f"/product/{n}"
+        return f"/page/{n}"
+    
+    def paragraph_text(self, n: int, i: int) -> str:
+        """Text of paragraph i of page n: its revision, or filler that differs from page to page."""
+        if n in self.revisions:
+            return self.revisions[n]
+        return ' '.join(random.Random(n * 1000 + i).choices(FILLER_WORDS, k=8)).capitalize() + '.'
+    
+    def render_page(self, n: int, mirror: str = '') -> str:
+        """Render the HTML for page n, or its copy under the given mirror prefix."""
+        links = ''.join(
+            f'<li><a href="{mirror}{self.page_path(target)}">Page link {k}</a></li>'
+            for k, target in enumerate((n * 7 + k + 1) % self.num_pages for k in range(self.links_per_page))
+            if target not in self.removed
+        )
+        if n == 0 and not mirror:
+            links += ''.join(
+                f'<li><a href="/download/{k}">Download {k}</a></li><li><a href="/stream/{k}">Stream {k}</a></li>'
+                for k in range(self.trap_pages)
+            )
+            links += ''.join(f'<li><a href="{prefix}/page/0">Print view</a></li>' for prefix in self.mirrors)
+        paragraphs = ''.join(
+            f'<p>Paragraph {i} of page {n}: {self.paragraph_text(n, i)}</p>'
+            for i in range(self.paragraph_count)
+        )
+        if mirror:
+            paragraphs += '<p>You are reading the printer-friendly version of this page.</p>'
+        if self.volatile:
+            paragraphs += f'<p>Rendered at {time.time():.6f}</p>'
+        return (
+            '<!DOCTYPE html><html><head>'
+            f'<meta charset="utf-8"><title>Test Page {n}</title>'
+            f'<meta name="description" content="Synthetic test page {n}">'
+            '</head><body>'
+            f'<h1>Test Page {n}</h1><h2>Section</h2>{paragraphs}'
+            f'<ul>{links}</ul>'
+            f'<img src="/static/{n}.png" alt="Image {n}">'
+            '<form action="/search" method="get"></form>'
+            '<script src="/static/app.js"></script>'
+            '</body></html>'
+        )
+    
+    def render_sitemap(self, index: Optional[int] = None) -> str:
+        """Render the sitemap index, or sitemap file number `index`."""
+        xmlns = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+        if index is None:
+            files = range((self.num_pages + self.sitemap_size - 1) // self.sitemap_size)
+            entries = ''.join(f'<sitemap><loc>{self.base_url}/sitemap-{k}.xml</loc></sitemap>' for k in files)
+            return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {xmlns}>{entries}</sitemapindex>'
+        
+        pages = range(index * self.sitemap_size, min(self.num_pages, (index + 1) * self.sitemap_size))
+        entries = ''.join(
+            f'<url><loc>{self.base_url}{self.page_path(n)}</loc><lastmod>{self.lastmods.get(n, DEFAULT_LASTMOD)}</lastmod></url>'
+            for n in pages
+        )
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset {xmlns}>{entries}</urlset>'
+    
+    def record_hit(self, path: str, body_bytes: int = 0):
+        """Count a request for path."""
+        with self._hits_lock:
+            self.hits[path] += 1
+            self.bytes_sent += body_bytes
+    
+    def take_failure(self, n: int) -> bool:
+        """True if this request for page n should fail (consuming one of its failures)."""
+        if self.down:
+            return True
+        with self._hits_lock:
+            remaining = self.failures.get(n, 0)
+            if remaining <= 0:
+                return False
+            self.failures[n] = remaining - 1
+            return True
+    
+    def duplicate_hits(self) -> Dict[str, int]:
+        """Paths that were requested more than once."""
+        with self._hits_lock:
+            return {path: count for path, count in self.hits.items() if count > 1}
+    
+    def _make_handler(self):
+        """Build a request handler class bound to this site."""
+        site = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; with Nagle the body waits for a delayed ACK
+            disable_nagle_algorithm = True
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                self.serve(send_body=True)
+            
+            def do_HEAD(self):
+                self.serve(send_body=False)
+            
+            def serve(self, send_body: bool):
+                if site.latency:
+                    time.sleep(site.latency)
+                
+                try:
+                    n = int(self.path.rsplit('/', 1)[-1])
+                except ValueError:
+                    n = -1
+                
+                if self.path.startswith(('/download/', '/stream/')) and 0 <= n < site.trap_pages:
+                    self.serve_trap(send_body)
+                    return
+                
+                if self.path == '/robots.txt' and site.robots_txt is not None:
+                    self.serve_text(site.robots_txt.format(base_url=site.base_url), 'text/plain', send_body)
+                    return
+                
+                if site.sitemap and (self.path == '/sitemap.xml' or self.path.startswith('/sitemap-')):
+                    index = None
+                    if self.path != '/sitemap.xml':
+                        index = int(self.path[len('/sitemap-'):-len('.xml')])
+                    self.serve_text(site.render_sitemap(index), 'application/xml', send_body)
+                    return
+                
+                mirror = next((prefix for prefix in site.mirrors if self.path.startswith(prefix + '/')), '')
+                if not 0 <= n < site.num_pages or self.path != mirror + site.page_path(n) or n in site.removed:
+                    site.record_hit(self.path)
+                    self.send_error(404)
+                    return
+                
+                if site.take_failure(n):
+                    site.record_hit(self.path)
+                    self.send_error(site.failure_status)
+                    return
+                
+                etag = f'"page-{n}"'
+                if site.validators and self.headers.get('If-None-Match') == etag:
+                    site.record_hit(self.path)
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                
+                body = site.render_page(n, mirror).encode('utf-8')
+                site.record_hit(self.path, len(body) if send_body else 0)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                if site.validators:
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', 'Mon, 05 Oct 2026 00:00:00 GMT')
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+            
+            def serve_text(self, text: str, content_type: str, send_body: bool):
+                body = text.encode('utf-8')
+                site.record_hit(self.path, len(body) if send_body else 0)
+                self.send_response(200)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+            
+            def serve_trap(self, send_body: bool):
+                """Send trap_bytes of binary data or chunked HTML until the client hangs up."""
+                stream = self.path.startswith('/stream/')
+                self.send_response(200)
+                if stream:
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                else:
+                    self.send_header('Content-Type', 'application/octet-stream')
+                    self.send_header('Content-Length', str(site.trap_bytes))
+                self.end_headers()
+                
+                sent = 0
+                chunk = (b'<p>' + b'x' * 65529 + b'</p>') if stream else bytes(65536)
+                try:
+                    while send_body and sent < site.trap_bytes:
+                        data = chunk[:site.trap_bytes - sent]
+                        if stream:
+                            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                        else:
+                            self.wfile.write(data)
+                        sent += len(data)
+                    if send_body and stream:
+                        self.wfile.write(b'0\r\n\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+                finally:
+                    site.record_hit(self.path, sent)
+        
+        return Handler
+    
+    def start(self) -> 'LocalTestSite':
+        """Start serving on a free local port."""
+        self._server = _TestHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Shut the server down."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self) -> 'LocalTestSite':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
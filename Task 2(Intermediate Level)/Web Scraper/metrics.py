@@ -0,0 +1,342 @@
+"""
+Crawl Metrics for ShadowFox
+===========================
+Where the time of a crawl goes. Every page passes through the same
+stages (DNS lookup, connect, time to first byte, body download, parse,
+field extraction); each stage records its duration in a log-linear
+histogram (HDR style: 32 sub-buckets per power of two, about 3% relative
+error from a microsecond to an hour), so p50/p95/p99 cost a bucket
+increment per sample instead of a stored list. Queue depths, pages in
+flight and byte counters are read from the crawl only when a report is
+made.
+
+Reports are a periodic progress line, the final statistics, and a
+Prometheus text endpoint (MetricsServer) for live scraping.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import math
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Stages of a page fetch, in order. The requests-based engines resolve and
+# connect in one call, so their DNS time is part of 'connect'.
+STAGES = ('dns', 'connect', 'ttfb', 'download', 'parse', 'extract')
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _ThreadOwner:
+    """Placeholder kept in a thread's locals; it is freed when the thread exits."""
+    
+    __slots__ = ('__weakref__',)
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations in microseconds.
+    
+    Values below 64 µs get a bucket each; above that every power of two is
+    split into 32 equal buckets. Each thread records into its own bucket
+    array, so record() takes no lock; reports add the arrays up. When a
+    thread exits its array is folded into a shared total, so short-lived
+    thread pools do not leave an array behind each.
+    """
+    
+    SUB_BITS = 5
+    MAX_SECONDS = 3600
+    
+    def __init__(self):
+        self._linear = 2 << self.SUB_BITS
+        max_value = self.MAX_SECONDS * 1_000_000
+        self._size = (max_value.bit_length() - self.SUB_BITS + 1) << self.SUB_BITS
+        
+        self._lock = threading.Lock()
+        self._arrays: List[List[int]] = []
+        # Counts of the threads that have exited
+        self._retired = [0] * (self._size + 2)
+        self._local = threading.local()
+    
+    def _thread_counts(self) -> List[int]:
+        """The calling thread's array: bucket counts, then samples and the sum of microseconds."""
+        counts = [0] * (self._size + 2)
+        with self._lock:
+            self._arrays.append(counts)
+        self._local.counts = counts
+        # Freed with the thread's locals when it exits, which retires the array
+        self._local.owner = owner = _ThreadOwner()
+        weakref.finalize(owner, self._retire, counts).atexit = False
+        return counts
+    
+    def _retire(self, counts: List[int]):
+        """Fold an exited thread's array into the shared total."""
+        with self._lock:
+            for position, array in enumerate(self._arrays):
+                if array is counts:
+                    del self._arrays[position]
+                    break
+            self._retired = [a + b for a, b in zip(self._retired, counts)]
+    
+    def bucket_value(self, index: int) -> float:
+        """Midpoint of a bucket in microseconds."""
+        if index < self._linear:
+            return float(index)
+        shift = (index >> self.SUB_BITS) - 1
+        lower = (index - (shift << self.SUB_BITS)) << shift
+        return lower + ((1 << shift) - 1) / 2
+    
+    def record(self, seconds: float):
+        """Add one duration."""
+        value = int(seconds * 1_000_000)
+        if value < self._linear:
+            index = value if value > 0 else 0
+        else:
+            shift = value.bit_length() - self.SUB_BITS - 1
+            index = (shift << self.SUB_BITS) + (value >> shift)
+            if index >= self._size:
+                index = self._size - 1
+        try:
+            counts = self._local.counts
+        except AttributeError:
+            counts = self._thread_counts()
+        counts[index] += 1
+        counts[-2] += 1
+        counts[-1] += value
+    
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """Summed (bucket counts, samples, sum in seconds) of all threads."""
+        with self._lock:
+            arrays = list(self._arrays)
+            merged = self._retired
+        for counts in arrays:
+            merged = [a + b for a, b in zip(merged, counts)]
+        return merged[:-2], merged[-2], merged[-1] / 1_000_000
+    
+    def quantiles(self, quantiles=QUANTILES) -> List[float]:
+        """Durations in seconds at the given quantiles (0.0 while empty)."""
+        counts, samples, _ = self.snapshot()
+        return self.quantiles_of(counts, samples, quantiles)
+    
+    def quantiles_of(self, counts: List[int], samples: int, quantiles) -> List[float]:
+        """Quantiles of a snapshot(), so one snapshot serves several reports."""
+        found = [0.0] * len(quantiles)
+        if not samples:
+            return found
+        targets = sorted((max(1, math.ceil(q * samples)), position) for position, q in enumerate(quantiles))
+        next_target = seen = 0
+        for index, count in enumerate(counts):
+            if not count:
+                continue
+            seen += count
+            while next_target < len(targets) and seen >= targets[next_target][0]:
+                found[targets[next_target][1]] = self.bucket_value(index) / 1_000_000
+                next_target += 1
+            if next_target == len(targets):
+                break
+        return found
+
+
+class CrawlMetrics:
+    """
+    Stage histograms plus gauges and counters read on demand.
+    
+    observe() is the only call on the hot path. Gauges and counters are
+    registered as callables (queue lengths, stats counters) and are only
+    evaluated by render() and the progress line, so they cost nothing
+    while the crawl runs.
+    """
+    
+    def __init__(self, prefix: str = 'shadowfox', stages=STAGES):
+        """
+        Initialize the metrics.
+        
+        Args:
+            prefix: Prefix of every exported metric name
+            stages: Names of the timed stages
+        """
+        self.prefix = prefix
+        self.stages = {stage: LatencyHistogram() for stage in stages}
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._counters: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._local = threading.local()
+    
+    def observe(self, stage: str, seconds: float):
+        """Record a duration for a stage."""
+        self.stages[stage].record(seconds)
+    
+    def connected(self, seconds: float):
+        """Record a new connection; its time is also kept for take_connect()."""
+        self.stages['connect'].record(seconds)
+        self._local.connect = getattr(self._local, 'connect', 0.0) + seconds
+    
+    def take_connect(self) -> float:
+        """Connect time of the calling thread since the last call (to split it off a TTFB)."""
+        seconds = getattr(self._local, 'connect', 0.0)
+        self._local.connect = 0.0
+        return seconds
+    
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]):
+        """Register a value that goes up and down (queue depth, pages in flight)."""
+        self._gauges[name] = (help_text, read)
+    
+    def counter(self, name: str, help_text: str, read: Callable[[], float]):
+        """Register a value that only grows (pages, bytes); exported with a _total suffix."""
+        self._counters[name] = (help_text, read)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        prefix = self.prefix
+        lines = [
+            f'# HELP {prefix}_stage_seconds Duration of each stage of a page fetch',
+            f'# TYPE {prefix}_stage_seconds summary'
+        ]
+        for stage, histogram in self.stages.items():
+            counts, samples, total = histogram.snapshot()
+            for q, value in zip(QUANTILES, histogram.quantiles_of(counts, samples, QUANTILES)):
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {samples}')
+        
+        for name, (help_text, read) in self._counters.items():
+            lines.append(f'# HELP {prefix}_{name}_total {help_text}')
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            lines.append(f'{prefix}_{name}_total {read()}')
+        for name, (help_text, read) in self._gauges.items():
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {read()}')
+        return '\n'.join(lines) + '\n'
+    
+    def progress_summary(self) -> str:
+        """p95 of every stage with samples, for the progress line."""
+        parts = []
+        for stage, histogram in self.stages.items():
+            counts, samples, _ = histogram.snapshot()
+            if samples:
+                p95 = histogram.quantiles_of(counts, samples, (0.95,))[0]
+                parts.append(f"{stage} {format_duration(p95)}")
+        return 'p95 ' + ', '.join(parts) if parts else 'no stage timings yet'
+    
+    def stage_lines(self) -> List[str]:
+        """One line per stage with samples: p50/p95/p99, mean and count."""
+        lines = []
+        for stage, histogram in self.stages.items():
+            counts, samples, total = histogram.snapshot()
+            if not samples:
+                continue
+            p50, p95, p99 = histogram.quantiles_of(counts, samples, QUANTILES)
+            lines.append(f"{stage:<9} p50 {format_duration(p50):>8}  p95 {format_duration(p95):>8}  "
+                         f"p99 {format_duration(p99):>8}  mean {format_duration(total / samples):>8}  "
+                         f"({samples} samples)")
+        return lines
+
+
+def format_duration(seconds: float) -> str:
+    """Short human-readable duration (µs, ms or s)."""
+    if seconds < 0.001:
+        return f"{seconds * 1_000_000:.0f} µs"
+    if seconds < 1:
+        return f"{seconds * 1000:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+class _TimedConnect:
+    """Connection mixin that reports the time connect() takes (DNS, TCP and TLS)."""
+    
+    metrics: Optional[CrawlMetrics] = None
+    
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        self.metrics.connected(time.perf_counter() - started)
+
+
+def instrument_session(session, metrics: CrawlMetrics):
+    """
+    Time every new connection of a requests.Session.
+    
+    The adapters mounted for http:// and https:// get connection pools
+    whose connections report to metrics; requests themselves are unchanged.
+    """
+    connection_classes = {
+        'http': type('TimedHTTPConnection', (_TimedConnect, HTTPConnection), {'metrics': metrics}),
+        'https': type('TimedHTTPSConnection', (_TimedConnect, HTTPSConnection), {'metrics': metrics})
+    }
+    pool_classes = {
+        'http': type('TimedHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': connection_classes['http']}),
+        'https': type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': connection_classes['https']})
+    }
+    for prefix in ('http://', 'https://'):
+        session.get_adapter(prefix).poolmanager.pool_classes_by_scheme = pool_classes
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving CrawlMetrics.render() at /metrics.
+    
+    Runs on a daemon thread; point a Prometheus scrape job (or curl) at
+    http://127.0.0.1:PORT/metrics while the crawl is running.
+    """
+    
+    def __init__(self, metrics: CrawlMetrics, port: int, host: str = '127.0.0.1'):
+        """
+        Initialize the server (call start() to listen).
+        
+        Args:
+            metrics: Metrics to serve
+            port: TCP port (0 picks a free one)
+            host: Interface to bind
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+    
+    def start(self) -> 'MetricsServer':
+        """Bind the port and serve in the background."""
+        metrics = self.metrics
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving and release the port."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,171 @@
+"""
+Near-Duplicate Detection for ShadowFox
+======================================
+Finds pages of a crawl whose text is (almost) the same as a page crawled
+earlier under another URL: print views, trailing-slash and session-path
+variants, tag pages repeating their articles. Such pages are still
+recorded, but their links are not expanded, so a site full of mirrored
+paths does not multiply the frontier.
+
+Each page's paragraphs are reduced to a set of word shingles and a
+one-permutation MinHash signature; an LSH index over bands of the
+signature finds candidate matches in constant time, and candidates are
+accepted when their estimated Jaccard similarity reaches the threshold.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set
+
+
+_WORD = re.compile(r'\w+')
+_MASK = (1 << 64) - 1
+
+
+def shingles(texts: Iterable[str], size: int = 3) -> Set[int]:
+    """
+    Hashes of the word n-grams of the given texts.
+    
+    Python's string hashing is used, so values are only comparable within
+    one process; the index lives for one crawl.
+    """
+    words = _WORD.findall(' '.join(texts).lower())
+    return {hash(gram) & _MASK for gram in zip(*(words[i:] for i in range(size)))}
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of the pages crawled so far.
+    
+    Signatures use one-permutation hashing: the low bits of a shingle's
+    hash pick one of num_perm bins and the rest is the value kept if it is
+    the smallest in that bin. Bins left empty (short pages) are ignored
+    when signatures are compared.
+    
+    Counters in `stats`:
+    - checked:       pages fingerprinted
+    - too_short:     pages with fewer than min_shingles shingles, never matched
+    - duplicates:    pages found to be near-duplicates
+    - links_dropped: links of duplicate pages that were not queued
+    """
+    
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 8,
+                 shingle_size: int = 3, min_shingles: int = 30):
+        """
+        Initialize the index.
+        
+        Args:
+            threshold: Smallest estimated Jaccard similarity of a near-duplicate
+            num_perm: Signature length (a power of two)
+            bands: LSH bands; pages sharing any band are compared
+            shingle_size: Words per shingle
+            min_shingles: Pages with fewer shingles are never treated as duplicates
+        """
+        if num_perm & (num_perm - 1) or num_perm % bands:
+            raise ValueError("num_perm must be a power of two and a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self._shift = num_perm.bit_length() - 1
+        self._empty = 1 << (64 - self._shift)
+        
+        self._lock = threading.Lock()
+        self._urls: List[str] = []
+        self._signatures: List[array] = []
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._dropped: Set[str] = set()
+        self.stats = {'checked': 0, 'too_short': 0, 'duplicates': 0, 'links_dropped': 0}
+    
+    def signature(self, hashes: Iterable[int]) -> array:
+        """One-permutation MinHash signature of a set of shingle hashes."""
+        mask = self.num_perm - 1
+        shift = self._shift
+        mins = [self._empty] * self.num_perm
+        for value in hashes:
+            position = value & mask
+            value >>= shift
+            if value < mins[position]:
+                mins[position] = value
+        return array('Q', mins)
+    
+    def similarity(self, a: array, b: array) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        empty = self._empty
+        matches = compared = 0
+        for x, y in zip(a, b):
+            if x == empty and y == empty:
+                continue
+            compared += 1
+            matches += x == y
+        return matches / compared if compared else 0.0
+    
+    def _band_keys(self, signature: array) -> List[int]:
+        rows = self.rows
+        return [hash(tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+    
+    def check(self, url: str, texts: Iterable[str]) -> Optional[str]:
+        """
+        Look a page up and add it to the index if it is not a near-duplicate.
+        
+        Args:
+            url: Page URL
+            texts: The page's paragraph texts
+        
+        Returns:
+            URL of the earlier page this one duplicates, or None
+        """
+        hashes = shingles(texts, self.shingle_size)
+        if len(hashes) < self.min_shingles:
+            with self._lock:
+                self.stats['checked'] += 1
+                self.stats['too_short'] += 1
+            return None
+        
+        signature = self.signature(hashes)
+        keys = self._band_keys(signature)
+        
+        # Lookup and insert under one lock, so two copies crawled at once cannot both be kept
+        with self._lock:
+            self.stats['checked'] += 1
+            compared = set()
+            for band, key in enumerate(keys):
+                for candidate in self._buckets[band].get(key, ()):
+                    if candidate in compared:
+                        continue
+                    compared.add(candidate)
+                    if self.similarity(signature, self._signatures[candidate]) >= self.threshold:
+                        self.stats['duplicates'] += 1
+                        return self._urls[candidate]
+            
+            index = len(self._urls)
+            self._urls.append(url)
+            self._signatures.append(signature)
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(index)
+        return None
+    
+    def drop_links(self, links: Iterable[str]):
+        """Remember links of a duplicate page that were not queued."""
+        with self._lock:
+            before = len(self._dropped)
+            self._dropped.update(links)
+            self.stats['links_dropped'] += len(self._dropped) - before
+    
+    def pages_avoided(self, visited) -> int:
+        """Dropped links that were never crawled from anywhere else."""
+        with self._lock:
+            return sum(1 for url in self._dropped if url not in visited)
+    
+    def summary(self, visited, bytes_per_page: float) -> str:
+        """One-line description of the counters for statistics output."""
+        avoided = self.pages_avoided(visited)
+        return (f"{self.stats['duplicates']} of {self.stats['checked']} pages, "
+                f"{self.stats['links_dropped']} links not followed, {avoided} of them never fetched "
+                f"(~{avoided * bytes_per_page:,.0f} bytes)")
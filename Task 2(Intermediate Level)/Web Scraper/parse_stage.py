@@ -0,0 +1,147 @@
+"""
+Process-Pool Parse Stage for ShadowFox
+======================================
+Second stage of the crawl pipeline. I/O workers only fetch HTML; parsing
+and field extraction, which hold the GIL, run in a pool of worker
+processes so throughput scales with CPU cores instead of stalling once a
+handful of threads compete for the interpreter. A bounded number of pages
+may wait for the pool; fetchers block when it is full, which keeps
+memory flat when the network outpaces the CPUs.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from extraction import PageExtractor
+from extraction_schema import ExtractionSchema
+from parsers import parse_html
+
+
+# Per-process state installed by the pool initializer
+_backend: Optional[str] = None
+_extractor: Union[PageExtractor, ExtractionSchema, None] = None
+
+
+def _init_worker(backend: str, extractor: Union[PageExtractor, ExtractionSchema]):
+    """Pool initializer: keep the parser backend and field handlers (or schema) for every task."""
+    global _backend, _extractor
+    _backend = backend
+    _extractor = extractor
+
+
+def parse_and_extract(html: str, url: Optional[str] = None) -> Dict[str, Any]:
+    """Parse a page and run the extractor on it (executed in a worker process)."""
+    return _extractor.extract(parse_html(html, _backend), url)
+
+
+def timed_parse_and_extract(html: str, url: Optional[str] = None) -> Tuple[Dict[str, Any], float, float]:
+    """parse_and_extract that also returns the seconds spent parsing and extracting."""
+    started = time.perf_counter()
+    tree = parse_html(html, _backend)
+    parsed = time.perf_counter()
+    fields = _extractor.extract(tree, url)
+    return fields, parsed - started, time.perf_counter() - parsed
+
+
+class ParseStage:
+    """
+    Process pool that parses and extracts fetched pages.
+    
+    submit() hands a page to the pool and returns immediately unless
+    `backlog` pages are already waiting, in which case it blocks until one
+    finishes. Results are delivered to a callback on the pool's result
+    thread. With metrics, the workers time both steps and the durations
+    are recorded as the 'parse' and 'extract' stages.
+    """
+    
+    def __init__(self, processes: int, backlog: int, backend: str,
+                 extractor: Union[PageExtractor, ExtractionSchema], metrics=None):
+        """
+        Initialize the stage and start its worker processes.
+        
+        Args:
+            processes: Number of worker processes
+            backlog: Pages that may be queued or parsing before submit() blocks
+            backend: Parser backend name (see parsers.py)
+            extractor: PageExtractor or ExtractionSchema to run; must be picklable
+            metrics: CrawlMetrics receiving the parse and extract timings
+        """
+        self.processes = max(1, processes)
+        self.backlog = max(self.processes, backlog)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_init_worker,
+            initargs=(backend, extractor)
+        )
+        self._slots = threading.BoundedSemaphore(self.backlog)
+        self.metrics = metrics
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+    
+    @property
+    def pending(self) -> int:
+        """Pages queued or being parsed."""
+        return self._pending
+    
+    def _task(self):
+        return timed_parse_and_extract if self.metrics else parse_and_extract
+    
+    def _result(self, result) -> Dict[str, Any]:
+        """Fields of a task result, recording its timings."""
+        if not self.metrics:
+            return result
+        fields, parse_seconds, extract_seconds = result
+        self.metrics.observe('parse', parse_seconds)
+        self.metrics.observe('extract', extract_seconds)
+        return fields
+    
+    def _count(self, delta: int):
+        with self._pending_lock:
+            self._pending += delta
+    
+    def submit(self, html: str, callback: Callable[[Optional[Dict[str, Any]], Optional[BaseException]], None],
+               url: Optional[str] = None):
+        """
+        Queue a page for parsing, blocking while the backlog is full.
+        
+        Args:
+            html: Page markup
+            callback: Called as callback(fields, None) on success or
+                      callback(None, error) on failure
+            url: Page URL, passed on to the extractor
+        """
+        self._slots.acquire()
+        self._count(1)
+        try:
+            future = self.executor.submit(self._task(), html, url)
+        except BaseException:
+            self._count(-1)
+            self._slots.release()
+            raise
+        
+        def done(future: Future):
+            self._count(-1)
+            self._slots.release()
+            error = future.exception()
+            callback(None if error else self._result(future.result()), error)
+        
+        future.add_done_callback(done)
+    
+    async def extract_async(self, html: str, url: Optional[str] = None) -> Dict[str, Any]:
+        """Parse a page in the pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        self._count(1)
+        try:
+            return self._result(await loop.run_in_executor(self.executor, self._task(), html, url))
+        finally:
+            self._count(-1)
+    
+    def shutdown(self):
+        """Wait for queued pages and stop the worker processes."""
+        self.executor.shutdown(wait=True)
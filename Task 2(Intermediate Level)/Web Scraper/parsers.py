@@ -0,0 +1,182 @@
+"""
+HTML Parser Backends for ShadowFox
+==================================
+One entry point, parse_html(), for every place the scrapers turn a page
+into a tree. Backends, fastest first:
+
+- selectolax: lexbor, a C HTML5 parser (pip install selectolax)
+- lxml:       BeautifulSoup on top of libxml2 (pip install lxml)
+- html.parser: BeautifulSoup with the pure-Python standard library parser
+
+'auto' picks the fastest backend that is installed. The selectolax tree
+is wrapped in the small element interface the extraction field handlers
+use (name, get(), get_text(), parents, descendants), so every backend
+yields the same records; `python benchmark.py parsers` checks that.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+from typing import Dict, Iterator, List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+
+PARSER_BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+# Attributes BeautifulSoup returns as lists of whitespace-separated values
+MULTI_VALUED_ATTRIBUTES = ('class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey', 'dropzone')
+
+# Elements whose text BeautifulSoup leaves out of get_text()
+_NON_TEXT_PARENTS = ('script', 'style', 'template')
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    installed = {
+        'selectolax': LexborHTMLParser is not None,
+        'lxml': lxml is not None,
+        'html.parser': True
+    }
+    return [backend for backend in PARSER_BACKENDS if installed[backend]]
+
+
+def resolve_backend(backend: str = 'auto') -> str:
+    """
+    Turn a configured backend name into an installed backend.
+    
+    Raises:
+        ValueError: Unknown backend name
+        ImportError: Backend requested explicitly but not installed
+    """
+    if backend == 'auto':
+        return available_backends()[0]
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}', expected 'auto' or one of {PARSER_BACKENDS}")
+    if backend not in available_backends():
+        raise ImportError(f"Parser backend '{backend}' is not installed: pip install {backend}")
+    return backend
+
+
+def soup_backend(backend: str = 'auto') -> str:
+    """
+    The backend to use where callers expect a BeautifulSoup tree: backend
+    itself if it builds one, otherwise the fastest installed one that does.
+    """
+    backend = resolve_backend(backend)
+    if backend != 'selectolax':
+        return backend
+    return next(name for name in available_backends() if name != 'selectolax')
+
+
+def parse_html(markup: Union[str, bytes], backend: str = 'auto', encoding: Optional[str] = None):
+    """
+    Parse markup with the given backend.
+    
+    Args:
+        markup: Page text, or the raw response body
+        backend: Parser backend name or 'auto'
+        encoding: Encoding of a raw body (see charset.py); ignored for text
+    
+    Returns:
+        A BeautifulSoup tree, or a SelectolaxDocument for the selectolax backend
+    """
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        if isinstance(markup, bytes) and encoding not in (None, 'utf-8'):
+            # lexbor reads bytes as UTF-8
+            markup = markup.decode(encoding, errors='replace')
+        return SelectolaxDocument(markup)
+    if isinstance(markup, bytes) and encoding:
+        return BeautifulSoup(markup, backend, from_encoding=encoding)
+    return BeautifulSoup(markup, backend)
+
+
+class SelectolaxElement:
+    """BeautifulSoup-like view of one selectolax element node."""
+    
+    __slots__ = ('node', 'name', '_document', '_attrs')
+    
+    def __init__(self, node, document: 'SelectolaxDocument'):
+        self.node = node
+        self.name = node.tag
+        self._document = document
+        self._attrs = None
+    
+    @property
+    def attrs(self) -> Dict:
+        if self._attrs is None:
+            attrs = {}
+            for key, value in self.node.attributes.items():
+                # Valueless attributes are None in selectolax and '' in BeautifulSoup
+                value = '' if value is None else value
+                attrs[key] = value.split() if key in MULTI_VALUED_ATTRIBUTES else value
+            self._attrs = attrs
+        return self._attrs
+    
+    def get(self, key: str, default=None):
+        return self.attrs.get(key, default)
+    
+    def __getitem__(self, key: str):
+        return self.attrs[key]
+    
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        """Concatenated text of the element, as BeautifulSoup.get_text() computes it."""
+        parts = []
+        for node in self.node.traverse(include_text=True):
+            if node.tag != '-text' or node.parent.tag in _NON_TEXT_PARENTS:
+                continue
+            text = node.text_content
+            if strip:
+                text = text.strip()
+                if not text:
+                    continue
+            parts.append(text)
+        return separator.join(parts)
+    
+    @property
+    def parents(self) -> Iterator['SelectolaxElement']:
+        node = self.node.parent
+        while node is not None and node.is_element_node:
+            yield self._document.wrap(node)
+            node = node.parent
+
+
+class SelectolaxDocument:
+    """Parsed document exposing the tree interface the extractors walk."""
+    
+    def __init__(self, markup: str):
+        self.tree = LexborHTMLParser(markup)
+        # One wrapper per node, so elements keep their identity across lookups
+        self._elements: Dict[int, SelectolaxElement] = {}
+    
+    def wrap(self, node) -> SelectolaxElement:
+        element = self._elements.get(node.mem_id)
+        if element is None:
+            element = self._elements[node.mem_id] = SelectolaxElement(node, self)
+        return element
+    
+    @property
+    def descendants(self) -> Iterator[SelectolaxElement]:
+        """Every element in document order."""
+        root = self.tree.root
+        if root is None:
+            return
+        for node in root.traverse(include_text=False):
+            if node.is_element_node:
+                yield self.wrap(node)
+    
+    @property
+    def title(self) -> Optional[SelectolaxElement]:
+        node = self.tree.css_first('title')
+        return self.wrap(node) if node is not None else None
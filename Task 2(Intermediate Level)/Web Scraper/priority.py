@@ -0,0 +1,492 @@
+"""
+Best-First Crawl Frontier for ShadowFox
+=======================================
+Priority-ordered alternative to the FIFO frontier in frontier.py. Every
+URL is scored when it is queued and the best score is crawled first, so a
+crawl with a page budget (max_pages) spends it on the pages that matter
+instead of on whatever a breadth-first walk happens to reach first.
+
+Scores are a weighted sum of pluggable components (URL patterns, depth,
+in-link count, sitemap freshness) rounded to integer buckets. Each bucket
+is a FIFO deque and a small heap orders the non-empty buckets, so push and
+pop stay O(1) plus O(log buckets) however many URLs are queued. In-links
+are counted in a fixed-size Count-Min sketch rather than a per-URL dict,
+and the disk backends spill the lowest-priority URLs to SQLite past a
+memory limit.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import heapq
+import math
+import os
+import sqlite3
+import sys
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from frontier import URLFrontier, create_seen_set, remove_database, temporary_database
+
+
+FRONTIER_ORDERS = ('priority', 'fifo')
+
+# URL substring -> score bonus (the best matching pattern counts)
+DEFAULT_PATTERNS = {'contact': 3.0, 'about': 3.0, 'service': 2.0, 'product': 2.0, 'blog': 1.0}
+
+# Scoring component -> weight (0 disables the component)
+DEFAULT_WEIGHTS = {'pattern': 1.0, 'depth': 1.0, 'inlinks': 1.0, 'freshness': 2.0}
+
+
+class URLCandidate(NamedTuple):
+    """What the scoring components know about a URL when it is queued."""
+    url: str
+    depth: int
+    inlinks: int
+    lastmod: Optional[str]
+
+
+class PatternScore:
+    """Bonus of the best pattern found in the lower-cased URL (0 if none match)."""
+    
+    def __init__(self, patterns: Dict[str, float]):
+        self.patterns = [(pattern.lower(), bonus) for pattern, bonus in patterns.items()]
+    
+    def match(self, url: str) -> Optional[str]:
+        """The best pattern contained in url, or None."""
+        url = url.lower()
+        best = None
+        for pattern, bonus in self.patterns:
+            if pattern in url and (best is None or bonus > best[1]):
+                best = (pattern, bonus)
+        return best[0] if best else None
+    
+    def __call__(self, candidate: URLCandidate) -> float:
+        url = candidate.url.lower()
+        best = None
+        for pattern, bonus in self.patterns:
+            if (best is None or bonus > best) and pattern in url:
+                best = bonus
+        return best or 0.0
+
+
+def depth_score(candidate: URLCandidate) -> float:
+    """Shallower pages first: minus one per link level."""
+    return -candidate.depth
+
+
+def inlink_score(candidate: URLCandidate) -> float:
+    """Pages many others link to first, on a log scale."""
+    return math.log2(1 + candidate.inlinks)
+
+
+class FreshnessScore:
+    """1.0 for a page modified now, halving every `half_life_days` (0 without a lastmod)."""
+    
+    def __init__(self, half_life_days: float = 30.0):
+        self.half_life = half_life_days * 86400
+    
+    def __call__(self, candidate: URLCandidate) -> float:
+        if not candidate.lastmod:
+            return 0.0
+        try:
+            modified = datetime.strptime(candidate.lastmod, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+        except ValueError:
+            return 0.0
+        age = max(0.0, (datetime.now(timezone.utc) - modified).total_seconds())
+        return 0.5 ** (age / self.half_life)
+
+
+class URLScorer:
+    """
+    Weighted sum of scoring components, rounded to an integer priority.
+    
+    Usage:
+        scorer = default_scorer()
+        scorer.register('short', lambda c: -len(c.url) / 100, weight=0.5)
+        priority = scorer.score(URLCandidate(url, depth, inlinks, lastmod))
+    """
+    
+    def __init__(self, components: Optional[Dict[str, Tuple[Callable[[URLCandidate], float], float]]] = None,
+                 resolution: int = 10):
+        """
+        Initialize the scorer.
+        
+        Args:
+            components: Name -> (function of a URLCandidate, weight)
+            resolution: Priority buckets per score point; scores closer than
+                        1/resolution share a bucket and keep FIFO order
+        """
+        self.resolution = resolution
+        self.components: Dict[str, Tuple[Callable[[URLCandidate], float], float]] = {}
+        for name, (function, weight) in (components or {}).items():
+            self.register(name, function, weight)
+    
+    def register(self, name: str, function: Callable[[URLCandidate], float], weight: float = 1.0):
+        """Add or replace a scoring component; a weight of 0 removes it."""
+        if weight:
+            self.components[name] = (function, weight)
+        else:
+            self.components.pop(name, None)
+    
+    def score(self, candidate: URLCandidate) -> int:
+        """Priority of a candidate; higher is crawled first."""
+        total = 0.0
+        for function, weight in self.components.values():
+            total += weight * function(candidate)
+        return round(total * self.resolution)
+    
+    def describe(self) -> str:
+        """Component names and weights for statistics output."""
+        return ', '.join(f"{name} x{weight:g}" for name, (_, weight) in self.components.items()) or 'none'
+
+
+def default_scorer(patterns: Optional[Dict[str, float]] = None,
+                   weights: Optional[Dict[str, float]] = None) -> URLScorer:
+    """Scorer with the built-in components, weighted by `weights`."""
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    functions = {
+        'pattern': PatternScore(DEFAULT_PATTERNS if patterns is None else patterns),
+        'depth': depth_score,
+        'inlinks': inlink_score,
+        'freshness': FreshnessScore()
+    }
+    return URLScorer({name: (function, weights.get(name, 0.0)) for name, function in functions.items()})
+
+
+class InlinkCounter:
+    """
+    Count-Min sketch of how often each URL was linked to.
+    
+    Memory is fixed (rows x width 16-bit counters) however many URLs are
+    counted; estimates never undercount and conservative updates keep the
+    overcount small. Counters saturate at 65535.
+    """
+    
+    def __init__(self, width: int = 1 << 20, rows: int = 4):
+        """
+        Initialize the sketch.
+        
+        Args:
+            width: Counters per row
+            rows: Independent hash rows (more rows, fewer overcounts)
+        """
+        self.width = max(1, width)
+        self.rows = max(1, rows)
+        self._counts = array('H', bytes(2 * self.width * self.rows))
+    
+    def _cells(self, url: str) -> List[int]:
+        # Double hashing from the two halves of the (cached) str hash; it is only
+        # stable per process, which is all an in-memory sketch needs
+        h1 = hash(url) & 0xFFFFFFFFFFFFFFFF
+        h2 = (h1 >> 32) | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.rows)]
+    
+    def __getitem__(self, url: str) -> int:
+        return min(self._counts[cell] for cell in self._cells(url))
+    
+    def add(self, url: str) -> int:
+        """Count one more link to url and return its new estimate."""
+        counts = self._counts
+        cells = self._cells(url)
+        values = [counts[cell] for cell in cells]
+        estimate = min(values)
+        if estimate == 0xFFFF:
+            return estimate
+        for cell, value in zip(cells, values):
+            # Conservative update: only the counters holding the minimum grow
+            if value == estimate:
+                counts[cell] = value + 1
+        return estimate + 1
+    
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._counts)
+
+
+class BucketQueue:
+    """
+    Max-priority queue of (url, depth) items with integer priorities.
+    
+    Items of equal priority come out in FIFO order. A queued URL can be
+    moved to a better priority with improve(); its old entry stays in its
+    bucket and is skipped when it surfaces.
+    """
+    
+    def __init__(self):
+        self._buckets: Dict[int, Deque[str]] = {}
+        self._heap: List[int] = []  # negated priorities of the buckets
+        self._queued: Dict[str, Tuple[int, int]] = {}  # url -> (priority, depth)
+    
+    def push(self, item: Tuple[str, int], priority: int):
+        url, depth = item
+        self._queued[url] = (priority, depth)
+        bucket = self._buckets.get(priority)
+        if bucket is None:
+            bucket = self._buckets[priority] = deque()
+            heapq.heappush(self._heap, -priority)
+        bucket.append(url)
+    
+    def improve(self, url: str, depth: int, priority: int) -> bool:
+        """Raise a queued URL's priority and/or lower its depth; return True if anything changed."""
+        entry = self._queued.get(url)
+        if entry is None:
+            return False
+        old_priority, old_depth = entry
+        if priority > old_priority:
+            self.push((url, min(depth, old_depth)), priority)
+            return True
+        if depth < old_depth:
+            self._queued[url] = (old_priority, depth)
+            return True
+        return False
+    
+    def top_priority(self) -> Optional[int]:
+        """Priority of the next item, discarding emptied buckets and stale entries on the way."""
+        while self._heap:
+            priority = -self._heap[0]
+            bucket = self._buckets.get(priority)
+            while bucket:
+                entry = self._queued.get(bucket[0])
+                if entry is not None and entry[0] == priority:
+                    return priority
+                bucket.popleft()
+            heapq.heappop(self._heap)
+            if bucket is not None:
+                del self._buckets[priority]
+        return None
+    
+    def pop(self) -> Tuple[Tuple[str, int], int]:
+        """Remove the best item; return (item, priority)."""
+        priority = self.top_priority()
+        if priority is None:
+            raise IndexError('pop from an empty priority queue')
+        url = self._buckets[priority].popleft()
+        _, depth = self._queued.pop(url)
+        return (url, depth), priority
+    
+    def lowest_priority(self) -> Optional[int]:
+        return min(self._buckets) if self._buckets else None
+    
+    def pop_lowest(self) -> Tuple[Tuple[str, int], int]:
+        """Remove the newest item of the lowest priority; return (item, priority)."""
+        while self._buckets:
+            priority = min(self._buckets)
+            bucket = self._buckets[priority]
+            while bucket:
+                url = bucket.pop()
+                entry = self._queued.get(url)
+                if entry is not None and entry[0] == priority:
+                    del self._queued[url]
+                    if not bucket:
+                        del self._buckets[priority]
+                    return (url, entry[1]), priority
+            # Its heap entry is dropped by top_priority() when it surfaces
+            del self._buckets[priority]
+        raise IndexError('pop from an empty priority queue')
+    
+    def __len__(self) -> int:
+        return len(self._queued)
+    
+    def __contains__(self, url: str) -> bool:
+        return url in self._queued
+    
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return ((url, depth) for url, (_, depth) in list(self._queued.items()))
+    
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the buckets and the URL index."""
+        total = sys.getsizeof(self._queued) + sys.getsizeof(self._buckets) + sys.getsizeof(self._heap)
+        for url, entry in self._queued.items():
+            total += sys.getsizeof(url) + sys.getsizeof(entry)
+        for bucket in self._buckets.values():
+            total += sys.getsizeof(bucket)
+        return total
+
+
+class DiskSpillPriorityQueue:
+    """
+    BucketQueue that keeps at most `max_in_memory` items in RAM and spills
+    the lowest-priority ones to an SQLite table, refilling from disk
+    whenever the disk holds a better priority than memory.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_in_memory: int = 100_000):
+        """
+        Initialize the queue.
+        
+        Args:
+            path: Database file (a temporary file if omitted)
+            max_in_memory: Items kept in memory before spilling to disk
+        """
+        self._temporary = path is None
+        self.path = path or temporary_database('shadowfox_priority_')
+        self.max_in_memory = max(1, max_in_memory)
+        
+        self._memory = BucketQueue()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS queue '
+                           '(url TEXT PRIMARY KEY, priority INTEGER, depth INTEGER, seq INTEGER)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS queue_order ON queue (priority DESC, seq)')
+        self._spilled = self._conn.execute('SELECT COUNT(*) FROM queue').fetchone()[0]
+        self._seq = self._conn.execute('SELECT COALESCE(MAX(seq), 0) FROM queue').fetchone()[0]
+        self._disk_top = self._query_top()
+    
+    def _query_top(self) -> Optional[int]:
+        return self._conn.execute('SELECT MAX(priority) FROM queue').fetchone()[0]
+    
+    def _spill(self, item: Tuple[str, int], priority: int):
+        self._seq += 1
+        self._conn.execute('INSERT INTO queue (url, priority, depth, seq) VALUES (?, ?, ?, ?)',
+                           (item[0], priority, item[1], self._seq))
+        self._spilled += 1
+        if self._disk_top is None or priority > self._disk_top:
+            self._disk_top = priority
+    
+    def push(self, item: Tuple[str, int], priority: int):
+        if len(self._memory) < self.max_in_memory:
+            self._memory.push(item, priority)
+            return
+        # Memory is full: whichever is worse, the new item or memory's lowest, goes to disk
+        if priority > self._memory.lowest_priority():
+            self._spill(*self._memory.pop_lowest())
+            self._memory.push(item, priority)
+        else:
+            self._spill(item, priority)
+    
+    def improve(self, url: str, depth: int, priority: int) -> bool:
+        """BucketQueue.improve() for items in memory or on disk."""
+        if url in self._memory:
+            return self._memory.improve(url, depth, priority)
+        if not self._spilled:
+            return False
+        cursor = self._conn.execute(
+            'UPDATE queue SET priority = MAX(priority, ?), depth = MIN(depth, ?) '
+            'WHERE url = ? AND (priority < ? OR depth > ?)',
+            (priority, depth, url, priority, depth)
+        )
+        if not cursor.rowcount:
+            return False
+        if priority > self._disk_top:
+            self._disk_top = priority
+        return True
+    
+    def _refill(self):
+        """Move the best spilled items back into memory."""
+        rows = self._conn.execute('SELECT url, priority, depth FROM queue ORDER BY priority DESC, seq LIMIT ?',
+                                  (self.max_in_memory // 2 or 1,)).fetchall()
+        self._conn.executemany('DELETE FROM queue WHERE url = ?', ((url,) for url, _, _ in rows))
+        self._spilled -= len(rows)
+        for url, priority, depth in rows:
+            self._memory.push((url, depth), priority)
+        self._disk_top = self._query_top() if self._spilled else None
+    
+    def pop(self) -> Tuple[Tuple[str, int], int]:
+        if self._spilled:
+            top = self._memory.top_priority()
+            if top is None or self._disk_top > top:
+                self._refill()
+        return self._memory.pop()
+    
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+    
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        yield from self._memory
+        yield from self._conn.execute('SELECT url, depth FROM queue ORDER BY priority DESC, seq')
+    
+    def memory_bytes(self) -> int:
+        return self._memory.memory_bytes()
+    
+    def close(self):
+        self._conn.close()
+        if self._temporary:
+            remove_database(self.path)
+
+
+class PriorityFrontier(URLFrontier):
+    """
+    URLFrontier that hands out the best-scored URL first.
+    
+    Every push with depth > 0 is a discovered link and is counted as an
+    in-link. A link to a URL that is still queued can move it up: to a
+    better priority when its score has grown (more in-links), or to a
+    smaller depth when a shorter path was found.
+    """
+    
+    def __init__(self, seen=None, queue=None, scorer: Optional[URLScorer] = None,
+                 inlinks: Optional[InlinkCounter] = None):
+        """
+        Initialize the frontier.
+        
+        Args:
+            seen: Seen-set backend (exact in-memory set if omitted)
+            queue: BucketQueue or DiskSpillPriorityQueue (BucketQueue if omitted)
+            scorer: URL scorer (default_scorer() if omitted)
+            inlinks: In-link sketch (a 1M-wide InlinkCounter if omitted)
+        """
+        super().__init__(seen, queue if queue is not None else BucketQueue())
+        self.scorer = scorer or default_scorer()
+        self.inlinks = inlinks if inlinks is not None else InlinkCounter()
+        self.stats = {'improved': 0}
+    
+    def push(self, url: str, depth: int, lastmod: Optional[str] = None) -> bool:
+        """Queue url at its score unless it has been seen before; return True if queued."""
+        # The start URL and sitemap seeds (depth 0) are not links from other pages
+        inlinks = self.inlinks.add(url) if depth > 0 else 0
+        priority = self.scorer.score(URLCandidate(url, depth, inlinks, lastmod))
+        
+        if self.seen.claim(url):
+            self.queue.push((url, depth), priority)
+            return True
+        
+        if depth > 0 and self.queue.improve(url, depth, priority):
+            self.stats['improved'] += 1
+        return False
+    
+    def requeue(self, item: Tuple[str, int]):
+        url, depth = item
+        self.queue.push(item, self.scorer.score(URLCandidate(url, depth, self.inlinks[url], None)))
+    
+    def pop_scored(self) -> Tuple[Tuple[str, int], int]:
+        """Remove the best item; return (item, priority)."""
+        return self.queue.pop()
+    
+    def popleft(self) -> Tuple[str, int]:
+        return self.queue.pop()[0]
+    
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the seen-set, the in-memory queue and the in-link sketch."""
+        return super().memory_bytes() + self.inlinks.memory_bytes()
+
+
+def create_priority_frontier(backend: str = 'memory', scorer: Optional[URLScorer] = None,
+                             bloom_capacity: int = 1_000_000, bloom_error_rate: float = 0.001,
+                             memory_limit: int = 100_000, sketch_width: int = 1 << 20,
+                             directory: Optional[str] = None) -> PriorityFrontier:
+    """
+    Build a best-first frontier for the named backend.
+    
+    Args:
+        backend: One of frontier.FRONTIER_BACKENDS
+        scorer: URL scorer (default_scorer() if omitted)
+        bloom_capacity: Initial Bloom filter capacity (bloom backend)
+        bloom_error_rate: Target false-positive rate (bloom backend)
+        memory_limit: Queue items kept in memory before spilling (bloom/sqlite backends)
+        sketch_width: Counters per row of the in-link sketch
+        directory: Where SQLite files are created (temporary files if omitted)
+    
+    Returns:
+        PriorityFrontier configured for the backend
+    """
+    seen = create_seen_set(backend, bloom_capacity, bloom_error_rate, directory)
+    if backend == 'memory':
+        queue = BucketQueue()
+    else:
+        queue = DiskSpillPriorityQueue(os.path.join(directory, 'frontier_priority.sqlite') if directory else None,
+                                       memory_limit)
+    return PriorityFrontier(seen, queue, scorer, InlinkCounter(sketch_width))
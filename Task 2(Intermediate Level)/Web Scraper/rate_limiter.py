@@ -0,0 +1,425 @@
+"""
+Per-Host Rate Limiting for ShadowFox
+====================================
+Politeness subsystem shared by WebScraperPro and AdvancedWebScraper.
+Every host gets its own token bucket whose refill rate adapts to the
+latency the host is showing, and 429/503 responses (with or without a
+Retry-After header) pause the host instead of the worker thread. An
+optional CircuitBreaker (retry_policy.py) holds failing hosts the same way.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import heapq
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into a number of seconds.
+    
+    Args:
+        value: Header value, either delta-seconds or an HTTP-date
+    
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        """Add the tokens earned since the last update."""
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+    
+    def try_consume(self, now: float) -> float:
+        """
+        Take one token if available.
+        
+        Returns:
+            0.0 if a token was consumed, otherwise seconds until one is available
+        """
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class HostState:
+    """Politeness state of a single host."""
+    
+    def __init__(self, delay: float, burst: float):
+        self.delay = delay
+        self.bucket = TokenBucket(1.0 / delay, burst) if delay > 0 else None
+        self.blocked_until = 0.0
+        self.latency = None
+        self.throttled = 0
+        self.min_delay = 0.0
+
+
+class HostRateLimiter:
+    """
+    Thread-safe per-host politeness controller.
+    
+    Features:
+    - Token bucket per host (steady rate plus optional burst)
+    - Retry-After and 429/503 handling that pauses only the affected host
+    - Adaptive delay driven by an EWMA of observed response latency
+    - Hosts whose circuit breaker is open are held like throttled ones
+    - Non-blocking try_acquire() for schedulers, blocking acquire() for simple loops
+    """
+    
+    def __init__(self, delay: float = 1.0, burst: float = 1.0, adaptive: bool = True,
+                 max_delay: float = 60.0, target_concurrency: float = 1.0, breaker=None):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            delay: Minimum seconds between requests to one host (0 disables limiting)
+            burst: Number of requests a host may receive back to back
+            adaptive: Slow down hosts whose latency exceeds the configured delay
+            max_delay: Upper bound for adaptive and throttle-induced delays
+            target_concurrency: Average requests per host the adaptive delay aims for
+            breaker: CircuitBreaker consulted before a host's slot is handed out
+        """
+        self.base_delay = max(0.0, delay)
+        self.burst = max(1.0, burst)
+        self.adaptive = adaptive
+        self.max_delay = max(max_delay, self.base_delay)
+        self.target_concurrency = max(target_concurrency, 0.1)
+        self.breaker = breaker
+        
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            'throttled_responses': 0,
+            'host_waits': 0
+        }
+    
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Return the host key used for rate limiting."""
+        return urlparse(url).netloc.lower()
+    
+    def _state(self, host: str) -> HostState:
+        """Return (creating if needed) the state for host. Caller holds the lock."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(self.base_delay, self.burst)
+            self._hosts[host] = state
+        return state
+    
+    def _set_delay(self, state: HostState, delay: float):
+        """Change a host's delay and its bucket's refill rate. Caller holds the lock."""
+        state.delay = min(self.max_delay, max(self.base_delay, state.min_delay, delay))
+        if state.delay <= 0:
+            state.bucket = None
+        elif state.bucket is None:
+            state.bucket = TokenBucket(1.0 / state.delay, self.burst)
+        else:
+            state.bucket.rate = 1.0 / state.delay
+    
+    def try_acquire(self, url: str) -> float:
+        """
+        Reserve a request slot for url's host without blocking.
+        
+        Returns:
+            0.0 if the request may be sent now, otherwise seconds to wait
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(self.host_of(url))
+            if state.blocked_until > now:
+                return state.blocked_until - now
+            wait = state.bucket.try_consume(now) if state.bucket is not None else 0.0
+            if wait > 0 or self.breaker is None:
+                return wait
+            
+            wait = self.breaker.try_dispatch(url, now)
+            if wait > 0 and state.bucket is not None:
+                # The host is open: the slot was not used
+                state.bucket.tokens += 1.0
+            return wait
+    
+    def acquire(self, url: str):
+        """Block the calling thread until a request to url's host is allowed."""
+        while True:
+            wait = self.try_acquire(url)
+            if wait <= 0:
+                return
+            self.stats['host_waits'] += 1
+            time.sleep(wait)
+    
+    def record_response(self, url: str, status_code: Optional[int], latency: Optional[float] = None,
+                        retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Feed a response back into the host's politeness state.
+        
+        Args:
+            url: URL that was requested
+            status_code: HTTP status code (None for transport errors)
+            latency: Seconds until the response headers arrived
+            retry_after: Raw Retry-After header value, if any
+        
+        Returns:
+            Seconds the host is paused for, if the response was a throttle signal
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(self.host_of(url))
+            
+            if status_code in THROTTLE_STATUS_CODES:
+                self.stats['throttled_responses'] += 1
+                state.throttled += 1
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = max(state.delay, 1.0) * (2 ** min(state.throttled, 6))
+                pause = min(pause, self.max_delay)
+                state.blocked_until = max(state.blocked_until, now + pause)
+                self._set_delay(state, max(state.delay * 2, self.base_delay, 0.5))
+                return pause
+            
+            state.throttled = 0
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            
+            target = max(self.base_delay, state.min_delay)
+            if self.adaptive and state.latency is not None:
+                target = max(target, state.latency / self.target_concurrency)
+            if state.delay != target:
+                # Move halfway towards the target, so throttle penalties also decay
+                delay = (state.delay + target) / 2.0
+                self._set_delay(state, target if abs(delay - target) < 0.001 else delay)
+            return None
+    
+    def set_min_delay(self, host: str, delay: float):
+        """Never send requests to host faster than every `delay` seconds (robots.txt Crawl-delay)."""
+        with self._lock:
+            state = self._state(host.lower())
+            state.min_delay = min(max(0.0, delay), self.max_delay)
+            self._set_delay(state, max(state.delay, state.min_delay))
+    
+    def host_delay(self, host: str) -> float:
+        """Current delay between requests for host."""
+        with self._lock:
+            return self._state(host.lower()).delay
+
+
+class PoliteFrontier:
+    """
+    Host-aware view over a crawl frontier.
+    
+    URLs whose host has no token yet are parked in a per-host queue instead
+    of blocking a worker, so workers keep fetching other eligible hosts
+    while any single host is being throttled. A parked host releases its
+    best-scored URL first when the frontier is a PriorityFrontier, and its
+    oldest otherwise. URLs whose fetch is to be retried are held back with
+    defer() until their backoff has passed. Callers must serialize access
+    (the crawl schedulers call it under their own lock).
+    
+    At most max_parked_per_host URLs of a host are parked in memory. A
+    frontier URL whose host is full is set aside in that host's overflow
+    and draining goes on, so other hosts keep being served. Overflow URLs
+    move up into the parked queue as their host releases URLs. Only once
+    max_overflow URLs in all are set aside does draining stop; the rest of
+    the frontier stays where it is (on disk for the sqlite and bloom
+    backends) until a full host has released a URL.
+    """
+    
+    def __init__(self, frontier: Deque[Tuple[str, int]], limiter: HostRateLimiter,
+                 skip: Callable[[str], bool] = lambda url: False, max_parked_per_host: int = 1000,
+                 max_overflow: Optional[int] = None):
+        """
+        Initialize the polite frontier.
+        
+        Args:
+            frontier: Shared queue of (url, depth) items (deque, URLFrontier or PriorityFrontier)
+            limiter: Rate limiter deciding when each host is eligible
+            skip: Predicate for items to drop on sight (e.g. already visited)
+            max_parked_per_host: URLs of one host held in memory while it is throttled
+            max_overflow: URLs of full hosts set aside to reach other hosts (10 * max_parked_per_host if omitted)
+        """
+        self.frontier = frontier
+        self.limiter = limiter
+        self.skip = skip
+        self.max_parked_per_host = max(1, max_parked_per_host)
+        self.max_overflow = max(1, max_overflow if max_overflow is not None else 10 * self.max_parked_per_host)
+        
+        # host -> heap of (-priority, arrival, item)
+        self._parked: Dict[str, List[Tuple[int, int, Tuple[str, int]]]] = {}
+        self._ready_heap: List[Tuple[float, str]] = []
+        # (ready time, arrival, item) of URLs waiting out a retry backoff
+        self._deferred: List[Tuple[float, int, Tuple[str, int]]] = []
+        self._parked_count = 0
+        # host -> (item, priority) taken from the frontier while the host had no room to park them
+        self._overflow: Dict[str, Deque[Tuple[Tuple[str, int], int]]] = {}
+        self._overflow_count = 0
+        self._arrivals = 0
+        self._scored = hasattr(frontier, 'pop_scored')
+    
+    def __len__(self) -> int:
+        return len(self.frontier) + self._parked_count + len(self._deferred) + self._overflow_count
+    
+    @property
+    def blocked(self) -> bool:
+        """True while draining is stopped because the overflow of full hosts is at its limit."""
+        return self._overflow_count >= self.max_overflow
+    
+    def _pop_frontier(self) -> Tuple[Tuple[str, int], int]:
+        """Next (item, priority) of the frontier; FIFO frontiers give every item priority 0."""
+        if self._scored:
+            return self.frontier.pop_scored()
+        return self.frontier.popleft(), 0
+    
+    def _hold(self, queue: List[Tuple[int, int, Tuple[str, int]]], item: Tuple[str, int], priority: int):
+        self._arrivals += 1
+        heapq.heappush(queue, (-priority, self._arrivals, item))
+        self._parked_count += 1
+    
+    def _park(self, host: str, item: Tuple[str, int], priority: int, wait: float, now: float):
+        """Hold an item until its host is eligible again."""
+        queue = self._parked.get(host)
+        if queue is None:
+            queue = self._parked[host] = []
+            heapq.heappush(self._ready_heap, (now + wait, host))
+        self._hold(queue, item, priority)
+    
+    def _refill(self, host: str, queue: List[Tuple[int, int, Tuple[str, int]]]):
+        """Move a host's overflow into its parked queue as far as there is room."""
+        overflow = self._overflow.get(host)
+        while overflow and len(queue) < self.max_parked_per_host:
+            item, priority = overflow.popleft()
+            self._overflow_count -= 1
+            self._hold(queue, item, priority)
+        if overflow is not None and not overflow:
+            del self._overflow[host]
+    
+    def defer(self, item: Tuple[str, int], delay: float):
+        """Queue an item again once delay seconds have passed (a retry after a failed fetch)."""
+        self._arrivals += 1
+        heapq.heappush(self._deferred, (time.monotonic() + delay, self._arrivals, item))
+    
+    def _admit(self, item: Tuple[str, int], priority: int, now: float) -> bool:
+        """True if item may be fetched now; otherwise it is parked behind its host."""
+        url = item[0]
+        host = self.limiter.host_of(url)
+        if host in self._parked:
+            # Wait behind the host's parked items, in priority (or arrival) order
+            self._hold(self._parked[host], item, priority)
+            return False
+        
+        wait = self.limiter.try_acquire(url)
+        if wait > 0:
+            self._park(host, item, priority, wait, now)
+            return False
+        return True
+    
+    def pop_ready(self, fresh: bool = True) -> Tuple[Optional[Tuple[str, int]], Optional[float]]:
+        """
+        Take the next item whose host may be fetched now.
+        
+        Args:
+            fresh: Also hand out URLs that have not been fetched yet (False
+                once the page budget is spent: only retries remain)
+        
+        Returns:
+            (item, None) when an item is ready, (None, seconds) when items are
+            parked and the earliest host becomes eligible in `seconds`, or
+            (None, None) when nothing is queued at all
+        """
+        now = time.monotonic()
+        
+        # Retries whose backoff is over go first; a retry of a throttled host waits for its slot
+        while self._deferred and self._deferred[0][0] <= now:
+            _, arrival, item = self._deferred[0]
+            wait = self.limiter.try_acquire(item[0])
+            if wait > 0:
+                heapq.heapreplace(self._deferred, (now + wait, arrival, item))
+                continue
+            heapq.heappop(self._deferred)
+            return item, None
+        
+        if not fresh:
+            return None, (max(0.0, self._deferred[0][0] - now) if self._deferred else None)
+        
+        # Then parked hosts whose next slot has arrived
+        while self._ready_heap and self._ready_heap[0][0] <= now:
+            _, host = heapq.heappop(self._ready_heap)
+            queue = self._parked[host]
+            while queue and self.skip(queue[0][2][0]):
+                heapq.heappop(queue)
+                self._parked_count -= 1
+                self._refill(host, queue)
+            if not queue:
+                del self._parked[host]
+                continue
+            
+            wait = self.limiter.try_acquire(queue[0][2][0])
+            if wait > 0:
+                heapq.heappush(self._ready_heap, (now + wait, host))
+                continue
+            
+            item = heapq.heappop(queue)[2]
+            self._parked_count -= 1
+            self._refill(host, queue)
+            if queue:
+                heapq.heappush(self._ready_heap, (now, host))
+            else:
+                del self._parked[host]
+            return item, None
+        
+        while self.frontier and not self.blocked:
+            item, priority = self._pop_frontier()
+            if self.skip(item[0]):
+                continue
+            
+            host = self.limiter.host_of(item[0])
+            parked = self._parked.get(host)
+            if parked is not None and len(parked) >= self.max_parked_per_host:
+                # Set aside behind the full host and keep draining for the other hosts
+                self._overflow.setdefault(host, deque()).append((item, priority))
+                self._overflow_count += 1
+                continue
+            if self._admit(item, priority, now):
+                return item, None
+        
+        due = [heap[0][0] for heap in (self._ready_heap, self._deferred) if heap]
+        if due:
+            return None, max(0.0, min(due) - now)
+        return None, None
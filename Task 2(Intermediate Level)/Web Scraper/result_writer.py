@@ -0,0 +1,373 @@
+"""
+Streaming Result Writer for ShadowFox
+=====================================
+Writes crawl records to NDJSON (one JSON object per line) from a
+background thread while the crawl is running, so memory use no longer
+grows with the size of the crawl and there is no big write at the end.
+Output can be gzip or zstd compressed, buffering is bounded (producers
+block when the writer falls behind) and fsync behaviour is configurable.
+The classic pretty-printed JSON envelope can be rebuilt from the NDJSON
+file afterwards without loading it into memory.
+
+zstd compression requires the optional dependency: pip install zstandard
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+FSYNC_POLICIES = ('never', 'interval', 'always')
+
+_STOP = object()
+
+
+def ndjson_path(base: Path, compression: Optional[str] = None) -> Path:
+    """Return base with the .ndjson (and compression) suffix applied."""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression '{compression}', expected one of {list(COMPRESSION_SUFFIXES)}")
+    return base.with_name(base.name + '.ndjson' + COMPRESSION_SUFFIXES[compression])
+
+
+def _compression_of(path: Path) -> Optional[str]:
+    """Infer the compression from a file name."""
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if suffix and path.name.endswith(suffix):
+            return compression
+    return None
+
+
+def open_ndjson_output(path: Path, compression: Optional[str] = None):
+    """
+    Open path for binary writing with optional compression.
+    
+    Returns:
+        (stream, raw_file) - write to stream, fsync raw_file
+    """
+    raw = open(path, 'wb', buffering=1024 * 1024)
+    if compression is None:
+        return raw, raw
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6), raw
+    if compression == 'zstd':
+        if zstandard is None:
+            raw.close()
+            raise ImportError("zstd compression requires zstandard: pip install zstandard")
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False), raw
+    raw.close()
+    raise ValueError(f"Unknown compression '{compression}'")
+
+
+def iter_ndjson(path: Path, partial: bool = False) -> Iterator[Dict]:
+    """
+    Yield the records of an NDJSON file (compression inferred from its name).
+    
+    With partial=True the file may still be open for writing (see
+    NDJSONWriter.flush): a compressed stream that has no end marker yet
+    ends the iteration instead of raising.
+    """
+    path = Path(path)
+    compression = _compression_of(path)
+    
+    if compression == 'gzip':
+        stream = gzip.open(path, 'rt', encoding='utf-8')
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("Reading .zst files requires zstandard: pip install zstandard")
+        import io
+        stream = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')),
+                                  encoding='utf-8')
+    else:
+        stream = open(path, 'r', encoding='utf-8')
+    
+    truncated = (EOFError, zstandard.ZstdError) if zstandard else (EOFError,)
+    with stream:
+        try:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        except truncated:
+            if not partial:
+                raise
+
+
+def _indented(value: Any, level: int) -> str:
+    """json.dumps(value, indent=2) re-indented to sit `level` spaces deep."""
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + ' ' * level)
+
+
+def write_json_envelope(source: Path, destination: Path, header: Dict[str, Any],
+                        data_key: str = 'data'):
+    """
+    Rebuild a pretty-printed JSON document from an NDJSON file.
+    
+    The output matches json.dump({**header, data_key: records}, indent=2)
+    but is produced one record at a time, so it runs in constant memory.
+    
+    Args:
+        source: NDJSON file with the records
+        destination: JSON file to write
+        header: Top-level keys written before the record list
+        data_key: Key holding the record list
+    """
+    with open(destination, 'w', encoding='utf-8') as out:
+        out.write('{')
+        for key, value in header.items():
+            out.write(f'\n  {json.dumps(key)}: {_indented(value, 2)},')
+        out.write(f'\n  {json.dumps(data_key)}: [')
+        
+        first = True
+        for record in iter_ndjson(source):
+            out.write('\n    ' if first else ',\n    ')
+            out.write(_indented(record, 4))
+            first = False
+        
+        out.write('\n  ]\n}' if not first else ']\n}')
+
+
+class NDJSONWriter:
+    """
+    Background-thread NDJSON writer with bounded buffering.
+    
+    write() hands a record to the writer thread through a bounded queue;
+    when the disk falls behind, producers block instead of buffering
+    without limit. The thread serializes records in batches. write(),
+    flush() and close() may be called from any thread.
+    
+    fsync policies:
+    - never:    leave durability to the OS
+    - interval: flush and fsync at most every `fsync_interval` seconds
+    - always:   flush and fsync after every batch
+    """
+    
+    def __init__(self, path: Path, compression: Optional[str] = None, max_pending: int = 1000,
+                 fsync: str = 'interval', fsync_interval: float = 5.0, batch_size: int = 256):
+        """
+        Initialize the writer and start its thread.
+        
+        Args:
+            path: Output file
+            compression: None, 'gzip' or 'zstd'
+            max_pending: Records that may wait in memory before write() blocks
+            fsync: One of FSYNC_POLICIES
+            fsync_interval: Seconds between fsyncs for the 'interval' policy
+            batch_size: Maximum records serialized per write
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}', expected one of {FSYNC_POLICIES}")
+        
+        self.path = Path(path)
+        self.compression = compression
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.batch_size = max(1, batch_size)
+        
+        self._stream, self._raw = open_ndjson_output(self.path, compression)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        # Orders write() and flush() against close(), so nothing is queued behind the stop marker
+        self._lock = threading.Lock()
+        self._closed = False
+        self._last_sync = time.monotonic()
+        
+        self.records_written = 0
+        self.bytes_written = 0
+        self.error: Optional[BaseException] = None
+        
+        self._thread = threading.Thread(target=self._run, name='ndjson-writer', daemon=True)
+        self._thread.start()
+    
+    def write(self, record: Dict):
+        """Queue a record for writing, blocking while the buffer is full."""
+        with self._lock:
+            if self._closed:
+                raise ValueError("write() on a closed NDJSONWriter")
+            if self.error:
+                raise RuntimeError(f"NDJSON writer failed: {self.error}") from self.error
+            self._queue.put(record)
+    
+    def flush(self):
+        """Block until every record written so far is in the file (readable, not necessarily on disk)."""
+        done = threading.Event()
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.put(done)
+        done.wait()
+    
+    @property
+    def pending(self) -> int:
+        """Records waiting for the writer thread."""
+        return self._queue.qsize()
+    
+    @property
+    def full(self) -> bool:
+        """True while write() would block."""
+        return self._queue.full()
+    
+    def _flush_stream(self):
+        """Push buffered (and compressed) bytes to the OS."""
+        if self.compression == 'gzip':
+            self._stream.flush(zlib.Z_SYNC_FLUSH)
+        elif self.compression == 'zstd':
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        self._raw.flush()
+    
+    def _sync(self):
+        """Push buffered bytes to the OS and then to disk."""
+        self._flush_stream()
+        os.fsync(self._raw.fileno())
+        self._last_sync = time.monotonic()
+    
+    def _write_batch(self, batch: List[Dict]):
+        """Serialize and write one batch of records (skipped once the writer has failed)."""
+        if self.error or not batch:
+            return
+        try:
+            data = ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n'
+                           for record in batch).encode('utf-8')
+            self._stream.write(data)
+            self.records_written += len(batch)
+            self.bytes_written += len(data)
+            
+            if self.fsync == 'always' or (
+                    self.fsync == 'interval' and time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+        except Exception as e:
+            # Keep draining so producers never block forever; write() reports the error
+            self.error = e
+    
+    def _run(self):
+        """Writer thread: drain the queue in batches until the stop marker arrives."""
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            # Markers may sit anywhere in the drained items; records before one are written first
+            batch = []
+            for item in items:
+                if item is _STOP:
+                    self._write_batch(batch)
+                    return
+                if isinstance(item, threading.Event):
+                    self._write_batch(batch)
+                    batch = []
+                    try:
+                        if not self.error:
+                            self._flush_stream()
+                    except Exception as e:
+                        self.error = e
+                    finally:
+                        item.set()
+                    continue
+                batch.append(item)
+            self._write_batch(batch)
+    
+    def close(self):
+        """Write everything still queued, sync and close the file (idempotent)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+        
+        try:
+            if self.fsync != 'never' and not self.error:
+                self._sync()
+        finally:
+            self._stream.close()
+            if self._raw is not self._stream:
+                self._raw.close()
+
+
+class StreamingResultSink:
+    """
+    ResultSink replacement that streams records to an NDJSON writer.
+    
+    Only a count is kept in memory. When a checkpoint journal needs the
+    records (see checkpoint.CrawlCheckpoint.flush), the ones it has not
+    stored yet are retained until it calls discard_before(). A second,
+    columnar writer (columnar_writer.ColumnarWriter) may receive the same
+    records.
+    """
+    
+    def __init__(self, writer: NDJSONWriter, retain: bool = False, columnar=None):
+        """
+        Initialize the sink.
+        
+        Args:
+            writer: Writer receiving every record
+            retain: Keep records until a checkpoint has stored them
+            columnar: Optional ColumnarWriter that also receives every record
+        """
+        self.writer = writer
+        self.retain = retain
+        self.columnar = columnar
+        
+        self._lock = threading.Lock()
+        self._count = 0
+        self._retained: List[Dict] = []
+        self._retained_from = 0
+    
+    def append(self, record: Dict):
+        """Stream one page record."""
+        with self._lock:
+            self._count += 1
+            if self.retain:
+                self._retained.append(record)
+        self.writer.write(record)
+        if self.columnar:
+            self.columnar.write(record)
+    
+    def since(self, index: int) -> List[Dict]:
+        """Return retained records after the first `index` ones."""
+        with self._lock:
+            return self._retained[max(0, index - self._retained_from):]
+    
+    def discard_before(self, index: int):
+        """Drop retained records that a checkpoint has already stored."""
+        with self._lock:
+            drop = index - self._retained_from
+            if drop > 0:
+                del self._retained[:drop]
+                self._retained_from = index
+    
+    def snapshot(self) -> List[Dict]:
+        """Read back every record written so far (pending writes are flushed; the stream stays open)."""
+        return list(self)
+    
+    def close(self):
+        self.writer.close()
+        if self.columnar:
+            self.columnar.close()
+    
+    @property
+    def full(self) -> bool:
+        """True while append() would block on a writer's full buffer."""
+        return self.writer.full or bool(self.columnar and self.columnar.full)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self) -> Iterator[Dict]:
+        self.writer.flush()
+        return iter_ndjson(self.writer.path, partial=True)
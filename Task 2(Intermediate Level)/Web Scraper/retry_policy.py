@@ -0,0 +1,234 @@
+"""
+Retry Policy and Circuit Breaker for ShadowFox
+==============================================
+Failure handling shared by WebScraperPro and the crawl engines. A
+RetryPolicy decides whether a failed fetch is worth another attempt
+(server errors, throttling, dropped connections and timeouts are; 404s
+and rejected bodies are not) and how long to back off: exponential,
+with full jitter so workers that failed together do not retry together.
+
+A CircuitBreaker watches consecutive failures per host. Once a host
+fails failure_threshold times in a row it is "open": nothing is sent to
+it for a cooldown, after which a single probe request decides whether it
+closes again or stays open for twice as long. Plugged into a
+HostRateLimiter, an open host looks like a rate-limited one, so the
+crawl schedulers park its URLs and keep fetching other hosts.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional, Sequence
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+RETRY_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+# Transport failures that say nothing about the page itself
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError
+)
+if aiohttp is not None:
+    RETRY_EXCEPTIONS += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+
+class RetryLater(Exception):
+    """A fetch failed but may succeed later; the URL should be queued again after `delay` seconds."""
+    
+    def __init__(self, url: str, delay: float, attempt: int):
+        super().__init__(f"attempt {attempt} of {url} failed, retrying in {delay:.1f}s")
+        self.url = url
+        self.delay = delay
+        self.attempt = attempt
+
+
+class RetryPolicy:
+    """
+    Which failures to retry, how often, and how long to wait in between.
+    
+    The n-th retry waits a random time between 0 and
+    min(max_delay, base_delay * 2 ** (n - 1)) seconds ("full jitter"),
+    but never less than a Retry-After the server asked for.
+    """
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 jitter: bool = True, retry_statuses: Sequence[int] = RETRY_STATUS_CODES):
+        """
+        Initialize the policy.
+        
+        Args:
+            max_attempts: Attempts per URL, including the first (1 disables retries)
+            base_delay: Backoff ceiling of the first retry in seconds
+            max_delay: Upper bound for any backoff
+            jitter: Randomize each backoff between 0 and its ceiling
+            retry_statuses: HTTP status codes worth another attempt
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(max_delay, self.base_delay)
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+    
+    def is_retryable(self, status_code: Optional[int] = None, error: Optional[BaseException] = None) -> bool:
+        """True if a response with status_code, or a fetch that raised error, may succeed on retry."""
+        if status_code is not None:
+            return status_code in self.retry_statuses
+        return isinstance(error, RETRY_EXCEPTIONS)
+    
+    def should_retry(self, attempt: int, status_code: Optional[int] = None,
+                     error: Optional[BaseException] = None) -> bool:
+        """True if attempt number `attempt` failed in a retryable way and attempts are left."""
+        return attempt < self.max_attempts and self.is_retryable(status_code, error)
+    
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1 for the first)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** min(attempt - 1, 30)))
+        delay = random.uniform(0.0, ceiling) if self.jitter else ceiling
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class BreakerState:
+    """Failure state of a single host."""
+    
+    def __init__(self):
+        self.failures = 0
+        self.opened_until = 0.0
+        self.cooldown = 0.0
+        self.probing_until = 0.0
+
+
+class CircuitBreaker:
+    """
+    Thread-safe per-host circuit breaker.
+    
+    closed -> open after failure_threshold consecutive failures; open ->
+    half-open when the cooldown has passed, letting one probe through;
+    the probe's success closes the host, its failure reopens it with the
+    cooldown doubled (up to max_cooldown).
+    """
+    
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 600.0):
+        """
+        Initialize the breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open a host
+            cooldown: Seconds an opened host receives no requests
+            max_cooldown: Upper bound for the cooldown of a host that keeps failing
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = max(0.0, cooldown)
+        self.max_cooldown = max(max_cooldown, self.cooldown)
+        
+        self._hosts: Dict[str, BreakerState] = {}
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            'opened': 0,
+            'probes': 0,
+            'held': 0
+        }
+    
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Return the host key (same as HostRateLimiter.host_of)."""
+        return urlparse(url).netloc.lower()
+    
+    def _state(self, host: str) -> BreakerState:
+        """Return (creating if needed) the state for host. Caller holds the lock."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = BreakerState()
+        return state
+    
+    def open_for(self, url: str) -> float:
+        """Seconds url's host stays open (0.0 when requests may be sent); does not claim a probe."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._hosts.get(self.host_of(url))
+            if state is None:
+                return 0.0
+            return max(0.0, state.opened_until - now, state.probing_until - now)
+    
+    def try_dispatch(self, url: str, now: Optional[float] = None) -> float:
+        """
+        Ask to send a request to url's host.
+        
+        Returns:
+            0.0 if the request may go out (claiming the probe of a half-open
+            host), otherwise seconds until the host may be asked again
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._hosts.get(self.host_of(url))
+            if state is None or state.failures < self.failure_threshold:
+                return 0.0
+            wait = max(state.opened_until - now, state.probing_until - now)
+            if wait > 0:
+                self.stats['held'] += 1
+                return wait
+            # Half-open: one probe; the others wait for its outcome (or its time to run out)
+            state.probing_until = now + max(state.cooldown, 1.0)
+            self.stats['probes'] += 1
+            return 0.0
+    
+    def record_success(self, url: str):
+        """The host answered; close it."""
+        with self._lock:
+            state = self._hosts.get(self.host_of(url))
+            if state is not None:
+                state.failures = 0
+                state.cooldown = 0.0
+                state.opened_until = state.probing_until = 0.0
+    
+    def record_failure(self, url: str) -> Optional[float]:
+        """
+        The host failed (server error, timeout, connection refused).
+        
+        Returns:
+            The cooldown in seconds if this failure opened the host
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(self.host_of(url))
+            state.failures += 1
+            if state.failures < self.failure_threshold:
+                return None
+            if state.opened_until > now:
+                # Requests sent before the host opened are still coming back
+                return None
+            
+            state.cooldown = min(self.max_cooldown, state.cooldown * 2) if state.cooldown else self.cooldown
+            state.opened_until = now + state.cooldown
+            state.probing_until = 0.0
+            self.stats['opened'] += 1
+            return state.cooldown
+    
+    def open_hosts(self) -> int:
+        """Number of hosts currently open."""
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for state in self._hosts.values() if state.opened_until > now)
+    
+    def summary(self) -> str:
+        """One-line summary for the statistics output."""
+        return (f"{self.stats['opened']} times opened, {self.stats['probes']} probes, "
+                f"{self.stats['held']} dispatches held")
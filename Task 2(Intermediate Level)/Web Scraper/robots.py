@@ -0,0 +1,229 @@
+"""
+robots.txt Support for ShadowFox
+================================
+Fetches, parses and caches robots.txt once per host for
+AdvancedWebScraper. Rules are compiled when the file is parsed, so the
+per-URL check is a handful of regex matches; matching follows RFC 9309
+(the most specific rule wins, Allow wins ties, `*` and `$` wildcards).
+Crawl-delay is handed to the rate limiter and Sitemap lines are kept for
+frontier seeding (see sitemap.py).
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+
+# RFC 9309: crawlers must parse at least 500 KiB; anything after that is ignored
+MAX_ROBOTS_BYTES = 500 * 1024
+
+
+def compile_rule(pattern: str) -> re.Pattern:
+    """Turn a robots.txt path pattern into a regex anchored at the start of the path."""
+    anchored = pattern.endswith('$')
+    if anchored:
+        pattern = pattern[:-1]
+    regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+    return re.compile(regex + ('$' if anchored else ''))
+
+
+class RobotsRules:
+    """The rules of one robots.txt that apply to our user agent."""
+    
+    def __init__(self, rules: Optional[List[Tuple[str, bool]]] = None,
+                 crawl_delay: Optional[float] = None, sitemaps: Optional[List[str]] = None,
+                 disallow_all: bool = False):
+        """
+        Initialize the rules.
+        
+        Args:
+            rules: (path pattern, allowed) pairs of the matching group
+            crawl_delay: Seconds between requests requested by the host
+            sitemaps: Sitemap URLs listed in the file
+            disallow_all: Refuse every path (robots.txt unreachable, see RFC 9309)
+        """
+        self.crawl_delay = crawl_delay
+        self.sitemaps = sitemaps or []
+        self.disallow_all = disallow_all
+        # Longest pattern first, Allow before Disallow: the first match decides
+        self._rules = sorted(
+            ((len(pattern), allowed, compile_rule(pattern)) for pattern, allowed in (rules or []) if pattern),
+            key=lambda rule: (-rule[0], not rule[1])
+        )
+    
+    def allowed(self, url: str) -> bool:
+        """True if url may be fetched."""
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if path == '/robots.txt':
+            return True
+        if self.disallow_all:
+            return False
+        if parsed.query:
+            path += '?' + parsed.query
+        
+        for _, allowed, regex in self._rules:
+            if regex.match(path):
+                return allowed
+        return True
+
+
+def parse_robots(text: str, user_agent: str) -> RobotsRules:
+    """
+    Parse robots.txt and keep the group for user_agent.
+    
+    The group naming user_agent is used if there is one, otherwise the `*`
+    group; repeated groups for the same agent are merged.
+    """
+    agent = user_agent.lower()
+    groups: Dict[str, Dict] = {}
+    sitemaps = []
+    current: List[str] = []
+    in_rules = False
+    
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        key, value = (part.strip() for part in line.split(':', 1))
+        key = key.lower()
+        
+        if key == 'sitemap':
+            # Sitemap lines belong to no group
+            if value:
+                sitemaps.append(value)
+        elif key == 'user-agent':
+            if in_rules:
+                current, in_rules = [], False
+            name = value.lower()
+            current.append(name)
+            groups.setdefault(name, {'rules': [], 'crawl_delay': None})
+        elif key in ('allow', 'disallow', 'crawl-delay') and current:
+            in_rules = True
+            for name in current:
+                if key == 'crawl-delay':
+                    try:
+                        groups[name]['crawl_delay'] = float(value)
+                    except ValueError:
+                        pass
+                else:
+                    groups[name]['rules'].append((value, key == 'allow'))
+    
+    group = groups.get(agent) or groups.get('*') or {'rules': [], 'crawl_delay': None}
+    return RobotsRules(group['rules'], group['crawl_delay'], sitemaps)
+
+
+class RobotsCache:
+    """
+    Thread-safe per-host cache of parsed robots.txt files.
+    
+    Each host's file is fetched at most once per `ttl`, even when many
+    workers reach the host at the same time. A 4xx answer allows
+    everything; a 5xx answer or network error disallows the host for
+    `error_ttl` seconds, as RFC 9309 requires.
+    
+    Counters in `stats`:
+    - fetched:  robots.txt files requested
+    - blocked:  URLs refused by the rules
+    - errors:   hosts whose robots.txt could not be retrieved
+    """
+    
+    def __init__(self, session: requests.Session, user_agent: str, ttl: float = 86400.0,
+                 error_ttl: float = 300.0, timeout: float = 15.0, rate_limiter=None):
+        """
+        Initialize the cache.
+        
+        Args:
+            session: Session used to fetch robots.txt
+            user_agent: Product token matched against User-agent lines
+            ttl: Seconds a fetched file stays valid
+            error_ttl: Seconds an unreachable host stays disallowed
+            timeout: Request timeout in seconds
+            rate_limiter: HostRateLimiter that receives each host's Crawl-delay
+        """
+        self.session = session
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        
+        self._entries: Dict[str, Tuple[RobotsRules, float]] = {}
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.stats = {'fetched': 0, 'blocked': 0, 'errors': 0}
+    
+    def record(self, key: str, amount: int = 1):
+        """Add amount to counter key."""
+        with self._lock:
+            self.stats[key] += amount
+    
+    @staticmethod
+    def origin(url: str) -> str:
+        """scheme://host[:port] of url; robots.txt applies per origin."""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+    
+    def peek(self, url: str) -> Optional[RobotsRules]:
+        """Cached, unexpired rules for url's host, without fetching."""
+        entry = self._entries.get(self.origin(url))
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+    
+    def rules_for(self, url: str) -> RobotsRules:
+        """Rules for url's host, fetching robots.txt if it is not cached."""
+        rules = self.peek(url)
+        if rules is not None:
+            return rules
+        
+        origin = self.origin(url)
+        with self._lock:
+            host_lock = self._host_locks.setdefault(origin, threading.Lock())
+        with host_lock:
+            # Another worker may have fetched it while we waited
+            rules = self.peek(url)
+            if rules is None:
+                rules, ttl = self._fetch(origin)
+                self._entries[origin] = (rules, time.monotonic() + ttl)
+                if self.rate_limiter is not None and rules.crawl_delay:
+                    self.rate_limiter.set_min_delay(urlparse(origin).netloc, rules.crawl_delay)
+            return rules
+    
+    def _fetch(self, origin: str) -> Tuple[RobotsRules, float]:
+        """Download and parse origin's robots.txt; return the rules and how long to keep them."""
+        self.record('fetched')
+        try:
+            response = self.session.get(f"{origin}/robots.txt", timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            self.record('errors')
+            return RobotsRules(disallow_all=True), self.error_ttl
+        
+        if response.status_code >= 500:
+            self.record('errors')
+            return RobotsRules(disallow_all=True), self.error_ttl
+        if response.status_code >= 400:
+            # No robots.txt: everything is allowed
+            return RobotsRules(), self.ttl
+        
+        text = response.content[:MAX_ROBOTS_BYTES].decode('utf-8', errors='replace')
+        return parse_robots(text, self.user_agent), self.ttl
+    
+    def allowed(self, url: str) -> bool:
+        """True if url may be fetched; refusals are counted."""
+        if self.rules_for(url).allowed(url):
+            return True
+        self.record('blocked')
+        return False
+    
+    def summary(self) -> str:
+        """One-line description of the counters for statistics output."""
+        return (f"{self.stats['fetched']} fetched, {self.stats['blocked']} URLs blocked, "
+                f"{self.stats['errors']} unreachable")
@@ -0,0 +1,207 @@
+"""
+Sitemap Seeding for ShadowFox
+=============================
+Reads sitemap.xml files and sitemap indexes so AdvancedWebScraper can
+queue a site's pages up front instead of discovering them one link level
+at a time. Sitemaps are parsed incrementally while they download
+(gzip-compressed ones included) and every parsed element is released at
+once, so a 50,000-URL file or an index of hundreds of them is read in
+flat memory.
+
+SitemapState remembers the <lastmod> of every page that was crawled, so
+incremental runs can skip pages the sitemap reports as unchanged.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import gzip
+import io
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+import requests
+
+
+class SitemapEntry(NamedTuple):
+    """One <url> of a sitemap."""
+    url: str
+    lastmod: Optional[str]
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize a W3C datetime (2026-10-01, 2026-10-01T12:00:00+02:00, ...)
+    to 'YYYY-MM-DDTHH:MM:SSZ' in UTC, so values compare as strings.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _local_name(tag: str) -> str:
+    """Tag name without its XML namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _open_stream(response: requests.Response):
+    """Readable stream over a response body, gunzipping .xml.gz files."""
+    response.raw.decode_content = True
+    # Keep the raw stream readable at EOF; the buffered reader and gzip probe read past it
+    response.raw.auto_close = False
+    stream = io.BufferedReader(response.raw)
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def parse_sitemap(stream) -> Iterator[tuple]:
+    """
+    Parse a sitemap or sitemap index incrementally.
+    
+    Yields:
+        ('url', SitemapEntry) for pages and ('sitemap', url) for index entries
+    """
+    root = None
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            continue
+        
+        name = _local_name(element.tag)
+        if name not in ('url', 'sitemap'):
+            continue
+        
+        fields = {_local_name(child.tag): (child.text or '').strip() for child in element}
+        if fields.get('loc'):
+            if name == 'url':
+                yield 'url', SitemapEntry(fields['loc'], parse_lastmod(fields.get('lastmod')))
+            else:
+                yield 'sitemap', fields['loc']
+        # Drop everything parsed so far; only the current element was needed
+        root.clear()
+
+
+def iter_sitemaps(session: requests.Session, urls: Iterable[str], timeout: float = 15.0,
+                  max_urls: int = 0, logger=None) -> Iterator[SitemapEntry]:
+    """
+    Yield the pages of the given sitemaps, following sitemap indexes.
+    
+    Args:
+        session: Session used for the downloads
+        urls: Sitemap or sitemap index URLs
+        timeout: Request timeout in seconds
+        max_urls: Stop after this many pages (0 for no limit)
+        logger: Receives a warning for every sitemap that cannot be read
+    """
+    pending: List[str] = list(urls)
+    seen = set(pending)
+    count = 0
+    
+    while pending:
+        sitemap_url = pending.pop(0)
+        try:
+            with session.get(sitemap_url, timeout=timeout, stream=True) as response:
+                if response.status_code != 200:
+                    continue
+                for kind, value in parse_sitemap(_open_stream(response)):
+                    if kind == 'sitemap':
+                        if value not in seen:
+                            seen.add(value)
+                            pending.append(value)
+                        continue
+                    yield value
+                    count += 1
+                    if max_urls and count >= max_urls:
+                        return
+        except (requests.exceptions.RequestException, ET.ParseError, OSError, EOFError) as e:
+            if logger:
+                logger.warning(f"Could not read sitemap {sitemap_url}: {e}")
+
+
+class SitemapState:
+    """
+    Per-target record of sitemap <lastmod> values, kept across runs.
+    
+    A page counts as unchanged if the sitemap's lastmod is not newer than
+    the lastmod it had when it was last crawled successfully.
+    """
+    
+    def __init__(self, path: Path, batch_size: int = 1000):
+        """
+        Initialize the state.
+        
+        Args:
+            path: SQLite file holding the state
+            batch_size: Rows buffered before they are written
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, lastmod TEXT, crawled_lastmod TEXT)'
+        )
+        self._conn.commit()
+        self._seen: List[tuple] = []
+        self._crawled: List[tuple] = []
+    
+    def unchanged(self, url: str, lastmod: Optional[str]) -> bool:
+        """True if url was crawled at or after the given lastmod."""
+        if lastmod is None:
+            return False
+        with self._lock:
+            row = self._conn.execute('SELECT crawled_lastmod FROM urls WHERE url = ?', (url,)).fetchone()
+        return row is not None and row[0] is not None and lastmod <= row[0]
+    
+    def record_seen(self, url: str, lastmod: Optional[str]):
+        """Remember the lastmod the sitemap currently reports for url."""
+        with self._lock:
+            self._seen.append((url, lastmod))
+            if len(self._seen) >= self.batch_size:
+                self._flush()
+    
+    def mark_crawled(self, url: str):
+        """Record that url was crawled at its current sitemap lastmod."""
+        with self._lock:
+            self._crawled.append((url,))
+            if len(self._crawled) >= self.batch_size:
+                self._flush()
+    
+    def _flush(self):
+        """Write buffered rows. Caller holds the lock."""
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO urls (url, lastmod) VALUES (?, ?) '
+                'ON CONFLICT(url) DO UPDATE SET lastmod = excluded.lastmod',
+                self._seen
+            )
+            self._conn.executemany('UPDATE urls SET crawled_lastmod = lastmod WHERE url = ?', self._crawled)
+        self._seen, self._crawled = [], []
+    
+    def flush(self):
+        """Write everything buffered so far."""
+        with self._lock:
+            self._flush()
+    
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
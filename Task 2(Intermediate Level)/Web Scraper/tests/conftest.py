@@ -0,0 +1,41 @@
+"""
+Test configuration for the ShadowFox scrapers: the modules live one
+directory up and import each other by name.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def crawl_config(tmp_path, monkeypatch):
+    """
+    AdvancedScraperConfig with its defaults (checkpoints, robots.txt and
+    sitemap seeding included), minus politeness delays and console
+    progress; output goes to a scratch directory.
+    """
+    from advanced_scraper import AdvancedScraperConfig
+    
+    monkeypatch.setattr(AdvancedScraperConfig, 'OUTPUT_DIR', tmp_path)
+    monkeypatch.setattr(AdvancedScraperConfig, 'DEFAULT_DELAY', 0)
+    monkeypatch.setattr(AdvancedScraperConfig, 'ADAPTIVE_DELAY', False)
+    monkeypatch.setattr(AdvancedScraperConfig, 'PROGRESS_INTERVAL', 0)
+    return AdvancedScraperConfig
+
+
+@pytest.fixture
+def scraper_config(tmp_path, monkeypatch):
+    """ScraperConfig without politeness delays, writing to a scratch directory."""
+    from app import ScraperConfig
+    
+    monkeypatch.setattr(ScraperConfig, 'OUTPUT_DIR', tmp_path)
+    monkeypatch.setattr(ScraperConfig, 'DEFAULT_DELAY', 0)
+    monkeypatch.setattr(ScraperConfig, 'ADAPTIVE_DELAY', False)
+    return ScraperConfig
@@ -0,0 +1,91 @@
+"""
+Tests that the asyncio engine keeps blocking work off its event loop.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import asyncio
+import threading
+import time
+
+import aiohttp
+
+from async_crawler import AsyncWebScraper
+from local_test_server import LocalTestSite
+
+
+class FullSink(list):
+    """Result sink whose writer buffer is full; remembers the thread of every append."""
+    
+    full = True
+    
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+    
+    def append(self, record):
+        self.threads.append(threading.current_thread())
+        super().append(record)
+
+
+def test_record_hand_off_leaves_the_loop_while_the_writer_is_full(crawl_config):
+    scraper = AsyncWebScraper('http://127.0.0.1:9/', max_depth=1)
+    try:
+        scraper.found_data = sink = FullSink()
+        record = {'url': 'http://127.0.0.1:9/', 'links': ['/a', '/b']}
+        
+        links = asyncio.run(scraper.store_page_async(record))
+        
+        assert sink == [record]
+        assert sink.threads[0] is not threading.main_thread()
+        assert sorted(links) == ['http://127.0.0.1:9/a', 'http://127.0.0.1:9/b']
+    finally:
+        scraper.found_data = []
+        scraper.close()
+
+
+def test_due_checkpoint_is_flushed_off_the_loop(crawl_config, monkeypatch):
+    monkeypatch.setattr(crawl_config, 'CHECKPOINT_INTERVAL', 0.001)
+    scraper = AsyncWebScraper('http://127.0.0.1:9/', max_depth=1)
+    try:
+        threads = []
+        flush = scraper.checkpoint.flush
+        monkeypatch.setattr(scraper.checkpoint, 'flush',
+                            lambda *args, **kwargs: threads.append(threading.current_thread()) or flush(*args, **kwargs))
+        
+        time.sleep(0.01)
+        asyncio.run(scraper.checkpoint_async())
+        
+        assert len(threads) == 1
+        assert threads[0] is not threading.main_thread()
+        assert scraper.checkpoint.flushes == 1
+    finally:
+        scraper.close()
+
+
+def test_response_time_excludes_the_head_request(crawl_config, monkeypatch):
+    monkeypatch.setattr(crawl_config, 'HEAD_BEFORE_GET', True)
+    with LocalTestSite(num_pages=1) as site:
+        scraper = AsyncWebScraper(site.start_url, max_depth=1)
+        try:
+            latencies = []
+            record_response = scraper.rate_limiter.record_response
+            monkeypatch.setattr(scraper.rate_limiter, 'record_response',
+                                lambda url, status, latency=None, retry_after=None:
+                                latencies.append(latency) or record_response(url, status, latency, retry_after))
+            head_async = scraper.fetch_limits.head_async
+            
+            async def slow_head(session, url, **kwargs):
+                await asyncio.sleep(0.5)
+                await head_async(session, url, **kwargs)
+            monkeypatch.setattr(scraper.fetch_limits, 'head_async', slow_head)
+            
+            async def fetch():
+                async with aiohttp.ClientSession() as session:
+                    return await scraper.fetch_html_async(session, site.start_url)
+            
+            assert asyncio.run(fetch())
+            assert len(latencies) == 1 and latencies[0] < 0.4
+        finally:
+            scraper.close()
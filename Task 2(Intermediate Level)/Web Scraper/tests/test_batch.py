@@ -0,0 +1,67 @@
+"""
+Tests for WebScraperPro.scrape_many.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import time
+
+from app import WebScraperPro
+from local_test_server import LocalTestSite
+
+
+def test_backing_off_host_does_not_hold_up_other_hosts(scraper_config):
+    with LocalTestSite(num_pages=4) as failing, LocalTestSite(num_pages=20) as healthy:
+        failing.failures = {n: 1 for n in range(4)}
+        urls = ([f"{failing.base_url}/page/{n}" for n in range(4)]
+                + [f"{healthy.base_url}/page/{n}" for n in range(20)])
+        scraper = WebScraperPro(healthy.base_url)
+        scraper.retry_policy.backoff = lambda attempt, retry_after=None: 2.0
+        
+        started = time.monotonic()
+        finished = {}
+        for page in scraper.scrape_many(urls, concurrency=2):
+            assert 'error' not in page
+            finished[page['url']] = time.monotonic() - started
+        
+        assert len(finished) == 24
+        assert scraper.stats['retries'] == 4
+        # Both threads would otherwise sleep through the first host's backoffs
+        healthy_done = max(t for url, t in finished.items() if url.startswith(healthy.base_url))
+        failing_done = min(t for url, t in finished.items() if url.startswith(failing.base_url))
+        assert healthy_done < failing_done
+        assert healthy_done < 1.5
+
+
+def test_throttled_host_does_not_hold_up_other_hosts(scraper_config, monkeypatch):
+    monkeypatch.setattr(scraper_config, 'DEFAULT_DELAY', 0.5)
+    with LocalTestSite(num_pages=6) as slow, LocalTestSite(num_pages=6) as other:
+        urls = ([f"{slow.base_url}/page/{n}" for n in range(6)]
+                + [f"{other.base_url}/page/{n}" for n in range(6)])
+        scraper = WebScraperPro(other.base_url)
+        
+        started = time.monotonic()
+        finished = {page['url']: time.monotonic() - started for page in scraper.scrape_many(urls, concurrency=2)}
+        
+        assert len(finished) == 12
+        # Pages of one host are 0.5 s apart; the second host's first page must not wait for the first host
+        assert min(t for url, t in finished.items() if url.startswith(other.base_url)) < 1.0
+        assert scraper.stats['failed_requests'] == 0
+
+
+def test_full_host_does_not_stop_reading_urls(scraper_config, monkeypatch):
+    monkeypatch.setattr(scraper_config, 'DEFAULT_DELAY', 0.5)
+    monkeypatch.setattr(scraper_config, 'MAX_PARKED_PER_HOST', 2)
+    with LocalTestSite(num_pages=8) as slow, LocalTestSite(num_pages=4) as other:
+        # More pages of the first host than it may park
+        urls = ([f"{slow.base_url}/page/{n}" for n in range(8)]
+                + [f"{other.base_url}/page/{n}" for n in range(4)])
+        scraper = WebScraperPro(other.base_url)
+        
+        started = time.monotonic()
+        pages = scraper.scrape_many(urls, concurrency=2)
+        first_other = next(time.monotonic() - started for page in pages if page['url'].startswith(other.base_url))
+        pages.close()
+        
+        assert first_other < 1.0
@@ -0,0 +1,75 @@
+"""
+Checkpoint and resume tests for AdvancedWebScraper, run with the default
+checkpointing, robots.txt and sitemap seeding.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from advanced_scraper import AdvancedWebScraper
+from local_test_server import LocalTestSite
+
+ROBOTS_TXT = "User-agent: *\nDisallow: /private/\nSitemap: {base_url}/sitemap.xml\n"
+
+
+def page_hits(site):
+    # Copied first: the server thread keeps counting
+    return {path: count for path, count in dict(site.hits).items() if path.startswith('/page/')}
+
+
+def interrupt_after(site, pages: int):
+    """Send SIGINT to the test process (Ctrl+C) once the site has served `pages` pages."""
+    def watch():
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if sum(page_hits(site).values()) >= pages:
+                os.kill(os.getpid(), signal.SIGINT)
+                return
+            time.sleep(0.005)
+    
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    return watcher
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite', 'bloom'])
+def test_interrupted_crawl_resumes_from_its_checkpoint(crawl_config, backend):
+    with LocalTestSite(num_pages=300, latency=0.01, robots_txt=ROBOTS_TXT, sitemap=True, sitemap_size=100) as site:
+        first = AdvancedWebScraper(site.start_url, max_depth=50, max_threads=4, frontier_backend=backend)
+        interrupt_after(site, 100)
+        first.start_crawling()
+        crawled = len(first.found_data)
+        assert 100 <= crawled < 300
+        
+        second = AdvancedWebScraper(site.start_url, max_depth=50, max_threads=4, frontier_backend=backend,
+                                    resume=True)
+        # Records, seen set and frontier come back from the checkpoint
+        assert len(second.found_data) == crawled
+        assert len(second.to_visit) > 0
+        second.start_crawling()
+        
+        urls = [page['url'] for page in second.found_data]
+        assert len(urls) == len(set(urls)) == 300
+        assert second.stats['urls_crawled'] == 300
+        # No page was downloaded again by the resumed run
+        assert {path: count for path, count in page_hits(site).items() if count > 1} == {}
+        assert site.hits['/sitemap.xml'] == 1
+
+
+def test_resuming_a_finished_crawl_fetches_nothing_again(crawl_config):
+    with LocalTestSite(num_pages=40, robots_txt=ROBOTS_TXT, sitemap=True) as site:
+        AdvancedWebScraper(site.start_url, max_depth=50, max_threads=4).start_crawling()
+        pages = page_hits(site)
+        
+        second = AdvancedWebScraper(site.start_url, max_depth=50, max_threads=4, resume=True)
+        assert len(second.found_data) == 40
+        second.start_crawling()
+        assert len(second.found_data) == 40
+        assert page_hits(site) == pages
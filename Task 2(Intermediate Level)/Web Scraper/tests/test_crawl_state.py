@@ -0,0 +1,41 @@
+"""
+Exactly-once stress test of the threaded crawl state, run with the
+default checkpointing, robots.txt and sitemap seeding.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import pytest
+
+from advanced_scraper import AdvancedWebScraper
+from local_test_server import LocalTestSite
+
+ROBOTS_TXT = "User-agent: *\nDisallow: /private/\nSitemap: {base_url}/sitemap.xml\n"
+
+
+def page_hits(site):
+    return {path: count for path, count in site.hits.items() if path.startswith('/page/')}
+
+
+@pytest.mark.parametrize('checkpoint_interval', [None, 0.05], ids=['default-checkpoints', 'frequent-checkpoints'])
+def test_every_url_is_fetched_exactly_once(crawl_config, monkeypatch, checkpoint_interval):
+    if checkpoint_interval is not None:
+        # Checkpoints written while 64 workers are claiming URLs
+        monkeypatch.setattr(crawl_config, 'CHECKPOINT_INTERVAL', checkpoint_interval)
+    
+    with LocalTestSite(num_pages=600, links_per_page=25, latency=0.002,
+                       robots_txt=ROBOTS_TXT, sitemap=True, sitemap_size=200) as site:
+        scraper = AdvancedWebScraper(site.start_url, max_depth=600, max_threads=64)
+        scraper.start_crawling()
+        
+        hits = page_hits(site)
+        assert len(hits) == 600
+        assert {path: count for path, count in hits.items() if count > 1} == {}
+        assert scraper.stats['urls_crawled'] == sum(hits.values())
+        assert len(scraper.visited_urls) == 600
+        assert len(scraper.found_data) == scraper.stats['data_extracted'] == 600
+        assert len({page['url'] for page in scraper.found_data}) == 600
+        # robots.txt and the sitemap index were fetched once, not once per worker
+        assert site.hits['/robots.txt'] == 1
+        assert site.hits['/sitemap.xml'] == 1
@@ -0,0 +1,64 @@
+"""
+Tests for the HTTP cache in the asyncio engine.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import time
+
+from async_crawler import AsyncWebScraper
+from http_cache import HTTPCache
+from local_test_server import LocalTestSite
+
+
+def crawl(site):
+    scraper = AsyncWebScraper(site.start_url, max_depth=40, max_concurrency=8)
+    scraper.run_crawl()
+    return scraper
+
+
+def test_recrawl_revalidates_with_conditional_requests(crawl_config):
+    with LocalTestSite(num_pages=30, validators=True) as site:
+        first = crawl(site)
+        assert first.http_cache.stats['misses'] >= 30
+        assert first.http_cache.stats['revalidated'] == 0
+        sent = site.bytes_sent
+        
+        second = crawl(site)
+        # Every page answered 304 and came from disk, with the same results
+        assert second.http_cache.stats['revalidated'] == 30
+        assert second.http_cache.stats['bytes_saved'] > 0
+        assert site.bytes_sent == sent
+        assert len(second.found_data) == len(first.found_data) == 30
+        assert sorted(page['url'] for page in second.found_data) == sorted(page['url'] for page in first.found_data)
+
+
+def test_fresh_entries_are_served_without_a_request(crawl_config, monkeypatch):
+    monkeypatch.setattr(crawl_config, 'HTTP_CACHE_TTL', 3600)
+    with LocalTestSite(num_pages=20) as site:
+        crawl(site)
+        requested = sum(count for path, count in site.hits.items() if path.startswith('/page/'))
+        
+        second = crawl(site)
+        assert second.http_cache.stats['hits'] == 20
+        assert sum(count for path, count in site.hits.items() if path.startswith('/page/')) == requested
+        assert len(second.found_data) == 20
+
+
+def test_lookups_do_not_write_but_still_order_eviction(tmp_path):
+    cache = HTTPCache(tmp_path, max_bytes=300)
+    for name in 'abc':
+        cache.store_body(f"https://x.test/{name}", 200, {'ETag': '"1"'}, b'x' * 100)
+        time.sleep(0.01)
+    
+    writes = cache._conn.total_changes
+    assert cache.get("https://x.test/a") is not None
+    assert cache._conn.total_changes == writes
+    
+    # The buffered lookup made a the most recently used, so b goes first
+    cache.store_body("https://x.test/d", 200, {'ETag': '"1"'}, b'x' * 100)
+    assert cache.get("https://x.test/b") is None
+    assert cache.get("https://x.test/a") is not None
+    assert cache.stats['evictions'] == 1
+    cache.close()
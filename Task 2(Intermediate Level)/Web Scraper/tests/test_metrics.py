@@ -0,0 +1,28 @@
+"""
+Tests for the stage histograms of metrics.py.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import LatencyHistogram
+
+
+def test_exited_threads_are_folded_into_the_total():
+    histogram = LatencyHistogram()
+    # One pool per batch, as scrape_many creates them
+    for _ in range(25):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: histogram.record(0.002), range(20)))
+    
+    counts, samples, total = histogram.snapshot()
+    assert samples == 500
+    assert abs(total - 1.0) < 1e-6
+    assert all(abs(value - 0.002) < 0.0001 for value in histogram.quantiles())
+    assert len(histogram._arrays) == 0
+    
+    histogram.record(0.5)
+    assert histogram.snapshot()[1] == 501
+    assert len(histogram._arrays) == 1
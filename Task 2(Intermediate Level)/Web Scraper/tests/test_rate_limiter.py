@@ -0,0 +1,115 @@
+"""
+Tests for the host rate limiter and the polite frontier.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import time
+
+import pytest
+
+from frontier import create_frontier
+from rate_limiter import HostRateLimiter, PoliteFrontier
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite', 'bloom'])
+def test_throttled_host_does_not_drain_frontier(backend):
+    frontier = create_frontier(backend, memory_limit=1000)
+    try:
+        for n in range(50_000):
+            frontier.push(f"https://slow.example/page/{n}", 1)
+        polite = PoliteFrontier(frontier, HostRateLimiter(delay=1.0), max_parked_per_host=100)
+        
+        item, wait = polite.pop_ready()
+        assert item == ("https://slow.example/page/0", 1)
+        item, wait = polite.pop_ready()
+        assert item is None and wait > 0
+        
+        # Only the host's parking quota and as many overflow URLs left the frontier
+        assert polite._parked_count == 100
+        assert polite.blocked
+        assert len(frontier) == 50_000 - 1 - 100 - 1000
+        assert len(polite) == 50_000 - 1
+    finally:
+        frontier.close()
+
+
+def test_other_hosts_are_served_while_one_is_throttled():
+    frontier = create_frontier('memory')
+    for n in range(10):
+        frontier.push(f"https://slow.example/page/{n}", 1)
+        frontier.push(f"https://fast.example/page/{n}", 1)
+    polite = PoliteFrontier(frontier, HostRateLimiter(delay=60.0), max_parked_per_host=3)
+    
+    hosts = []
+    while True:
+        item, wait = polite.pop_ready()
+        if item is None:
+            break
+        hosts.append(item[0].split('/')[2])
+    
+    # One URL per host gets a token; the rest wait, with at most 3 parked per host
+    assert hosts == ['slow.example', 'fast.example']
+    assert polite._parked_count <= 2 * 3
+    assert len(polite) == 18
+
+
+def test_full_host_does_not_stop_other_hosts():
+    frontier = create_frontier('memory')
+    for host in ('a.test', 'b.test'):
+        for n in range(5):
+            frontier.push(f"https://{host}/page/{n}", 1)
+    polite = PoliteFrontier(frontier, HostRateLimiter(delay=10, adaptive=False), max_parked_per_host=2)
+    
+    served = []
+    while True:
+        item, wait = polite.pop_ready()
+        if item is None:
+            break
+        served.append(item[0])
+    
+    # a.test is throttled with its quota parked, but b.test behind it still gets its token
+    assert served == ["https://a.test/page/0", "https://b.test/page/0"]
+    assert not polite.blocked
+    assert wait == pytest.approx(10, abs=1)
+    assert len(polite) == 8
+
+
+def test_blocked_url_is_released_once_its_host_has_room():
+    frontier = create_frontier('memory')
+    for n in range(5):
+        frontier.push(f"https://slow.example/page/{n}", 1)
+    polite = PoliteFrontier(frontier, HostRateLimiter(delay=0.05, adaptive=False), max_parked_per_host=1)
+    
+    seen = []
+    while len(seen) < 5:
+        item, wait = polite.pop_ready()
+        if item is None:
+            assert wait is not None
+            time.sleep(wait)
+            continue
+        seen.append(item[0])
+    
+    assert seen == [f"https://slow.example/page/{n}" for n in range(5)]
+    assert polite.pop_ready() == (None, None)
+
+
+def test_overflow_keeps_the_host_order():
+    frontier = create_frontier('memory')
+    for n in range(6):
+        frontier.push(f"https://slow.example/page/{n}", 1)
+        frontier.push(f"https://fast.example/page/{n}", 1)
+    polite = PoliteFrontier(frontier, HostRateLimiter(delay=0.02, adaptive=False), max_parked_per_host=1)
+    
+    seen = []
+    while len(seen) < 12:
+        item, wait = polite.pop_ready()
+        if item is None:
+            time.sleep(wait)
+            continue
+        seen.append(item[0])
+    
+    for host in ('slow.example', 'fast.example'):
+        assert [url for url in seen if host in url] == [f"https://{host}/page/{n}" for n in range(6)]
+    assert polite.pop_ready() == (None, None)
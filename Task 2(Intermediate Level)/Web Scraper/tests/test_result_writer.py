@@ -0,0 +1,89 @@
+"""
+Tests for the streaming NDJSON and columnar result writers.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import threading
+
+import pytest
+
+import result_writer
+from columnar_writer import ColumnarWriter
+from result_writer import NDJSONWriter, StreamingResultSink, iter_ndjson, ndjson_path
+
+
+def test_records_behind_the_stop_marker_do_not_leak_or_hang(tmp_path):
+    writer = NDJSONWriter(tmp_path / 'results.ndjson', batch_size=16)
+    writer.write({'n': 0})
+    # What the write/close race used to produce: a record drained after the stop marker
+    writer._queue.put(result_writer._STOP)
+    writer._queue.put({'n': 1})
+    writer._thread.join(timeout=5)
+    assert not writer._thread.is_alive()
+    
+    writer.close()
+    assert list(iter_ndjson(writer.path)) == [{'n': 0}]
+
+
+def test_concurrent_writes_and_close(tmp_path):
+    writer = NDJSONWriter(tmp_path / 'results.ndjson', max_pending=8, batch_size=4)
+    accepted = []
+    
+    def produce(worker):
+        for n in range(2000):
+            try:
+                writer.write({'worker': worker, 'n': n})
+            except ValueError:
+                return
+            accepted.append((worker, n))
+    
+    producers = [threading.Thread(target=produce, args=(worker,)) for worker in range(8)]
+    for thread in producers:
+        thread.start()
+    while len(accepted) < 500:
+        pass
+    
+    closer = threading.Thread(target=writer.close)
+    closer.start()
+    closer.join(timeout=10)
+    for thread in producers:
+        thread.join(timeout=10)
+    assert not closer.is_alive()
+    
+    records = list(iter_ndjson(writer.path))
+    assert len(records) == len(accepted) == writer.records_written
+    assert all(set(record) == {'worker', 'n'} for record in records)
+    with pytest.raises(ValueError):
+        writer.write({'late': True})
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_snapshot_leaves_the_stream_open(tmp_path, compression):
+    sink = StreamingResultSink(NDJSONWriter(ndjson_path(tmp_path / 'results', compression), compression))
+    sink.append({'url': 'https://example.com/a'})
+    assert sink.snapshot() == [{'url': 'https://example.com/a'}]
+    
+    sink.append({'url': 'https://example.com/b'})
+    assert [record['url'] for record in sink] == ['https://example.com/a', 'https://example.com/b']
+    sink.close()
+    assert len(list(iter_ndjson(sink.writer.path))) == 2
+
+
+def test_failed_columnar_writer_still_finishes_the_file(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    writer = ColumnarWriter(tmp_path / 'results.parquet', row_group_size=1)
+    append = writer.file.append
+    
+    def failing_append(record):
+        if record['n'] == 1:
+            raise OSError('disk full')
+        append(record)
+    
+    writer.file.append = failing_append
+    writer.write({'n': 0})
+    writer.write({'n': 1})
+    writer.close()
+    assert isinstance(writer.error, OSError)
+    assert pq.read_table(writer.path).to_pylist() == [{'n': 0}]
@@ -0,0 +1,50 @@
+"""
+Tests for retried fetches in both crawl engines.
+
+ShadowFox - LEARN • CREATE • LEAD
+Website: https://www.shadowfox.org.in/
+"""
+
+import pytest
+
+from advanced_scraper import AdvancedWebScraper
+from async_crawler import AsyncWebScraper
+from local_test_server import LocalTestSite
+
+
+def create(engine, url, **kwargs):
+    workers = {'max_concurrency': 4} if engine is AsyncWebScraper else {'max_threads': 4}
+    return engine(url, max_depth=60, **workers, **kwargs)
+
+
+@pytest.fixture
+def fast_retries(crawl_config, monkeypatch):
+    monkeypatch.setattr(crawl_config, 'RETRY_BASE_DELAY', 0.01)
+    monkeypatch.setattr(crawl_config, 'MAX_RETRIES', 3)
+    # Every page failing at first would otherwise open the host's circuit for its cooldown
+    monkeypatch.setattr(crawl_config, 'CIRCUIT_BREAKER', False)
+    return crawl_config
+
+
+@pytest.mark.parametrize('engine', [AdvancedWebScraper, AsyncWebScraper])
+def test_retried_pages_are_crawled_once(fast_retries, engine):
+    with LocalTestSite(num_pages=60) as site:
+        site.failures = {n: 2 for n in range(1, 60, 5)}
+        scraper = create(engine, site.start_url)
+        scraper.run_crawl()
+        
+        assert scraper.stats['retries'] == 2 * 12
+        assert scraper.stats['urls_crawled'] == 60
+        assert len(scraper.found_data) == 60
+        assert scraper.stats['errors'] == 0
+
+
+@pytest.mark.parametrize('engine', [AdvancedWebScraper, AsyncWebScraper])
+def test_retries_do_not_use_up_the_page_budget(fast_retries, engine):
+    with LocalTestSite(num_pages=60) as site:
+        site.failures = {n: 2 for n in range(60)}
+        scraper = create(engine, site.start_url, max_pages=20)
+        scraper.run_crawl()
+        
+        assert scraper.stats['urls_crawled'] == 20
+        assert len(scraper.found_data) == 20